@@ -1,17 +1,18 @@
 from decimal import Decimal
 from itertools import product
 from logging import INFO, basicConfig, getLogger
-from typing import List, NamedTuple
+from typing import Callable, List, NamedTuple, Optional
 
 import numpy as np
 import pandas as pd
-from deprecated import deprecated
 
 from strategies.entry_buy_random import EntryBuyRandom
 from strategies.exit_sell_in_n_bars import ExitSellInNBars
 from strategies.exit_sell_with_target_profit import ExitSellWithTargetProfit
+from tmtrader.batch_back_test_trader import BatchBTTrader
 from tmtrader.entity.trade import Trade
-from tmtrader.trader import create_trader
+from tmtrader.indicator.indicator_cache import IndicatorCache
+from tmtrader.trader import create_batch_trader
 from tmtrader.usecase.strategy import Strategy
 
 basicConfig(level=INFO)
@@ -35,20 +36,29 @@ class StrategyEvaluator:
     def __init__(self,
                  f_path: str,
                  product_config_file: str,
-                 strategies: List[Strategy]):
+                 create_strategies: Callable[[], List[Strategy]],
+                 cache_dir: Optional[str] = None,
+                 indicator_cache: Optional[IndicatorCache] = None):
+        """
+        :param create_strategies: returns a new set of strategies, called
+            once per trader so that the traders do not share their states
+        """
         self.__f_path = f_path
         self.__p_conf_file = product_config_file
-        self.__strategies = strategies
+        self.__create_strategies = create_strategies
+        self.__cache_dir = cache_dir
+        if indicator_cache is None:
+            indicator_cache = IndicatorCache()
+        self.__indicator_cache = indicator_cache
         self.__results: List[TradeResult] = list()
 
     def run(self, times: int = 10):
-        self.__results = []
-        for i in range(times):
-            # FIXME: do not create trader every time
-            #        define a method to clear all data in trader to reuse
-            trader = self.__create_trader()
-            trader.start()
+        # the repetitions are run together in a single pass over the data
+        batch = self.__create_batch_trader(times)
+        batch.start()
 
+        self.__results = []
+        for trader in batch.traders:
             max_prof_in1 = trader.max_winning_trade().pl if \
                 trader.max_winning_trade() else 0
             max_loss_in1 = trader.max_losing_trade().pl if \
@@ -65,8 +75,6 @@ class StrategyEvaluator:
                             max_loss_in1,
                             trader.trade_history())
             )
-            print(f'\r{i + 1:06d} / {times:06d}', end='')
-        print()  # line feed
 
     @property
     def results(self):
@@ -98,25 +106,31 @@ class StrategyEvaluator:
         )
         return df
 
-    @deprecated
-    def __create_trader(self):
-        trader = create_trader(self.__f_path, self.__p_conf_file)
-        trader.add_strategy(self.__strategies)
-        return trader
+    def __create_batch_trader(self, times: int) -> BatchBTTrader:
+        batch = create_batch_trader(self.__f_path, self.__p_conf_file, times,
+                                    cache_dir=self.__cache_dir,
+                                    precompute_indicators=True,
+                                    indicator_cache=self.__indicator_cache)
+        for trader in batch.traders:
+            trader.add_strategy(self.__create_strategies())
+        return batch
 
 
 def eval_random_strategy(prob: float,
                          target_prof: float,
-                         exit_in_n_bars: int):
-    entry_buy1 = EntryBuyRandom(prob=prob)
-    exit_sell1 = ExitSellWithTargetProfit(target_profit=target_prof)
-    exit_sell2 = ExitSellInNBars(n_bars=exit_in_n_bars)
+                         exit_in_n_bars: int,
+                         indicator_cache: Optional[IndicatorCache] = None):
+    def create_strategies() -> List[Strategy]:
+        entry_buy1 = EntryBuyRandom(prob=prob)
+        exit_sell1 = ExitSellWithTargetProfit(target_profit=target_prof)
+        exit_sell2 = ExitSellInNBars(n_bars=exit_in_n_bars)
+        return [entry_buy1, exit_sell1, exit_sell2]
 
     evaluator = StrategyEvaluator('data/e-mini-sp500-daily-compact.csv',
                                   'tmtrader/config/product_config.json',
-                                  [entry_buy1,
-                                   exit_sell1,
-                                   exit_sell2])
+                                  create_strategies,
+                                  cache_dir='data/.tmtrader_cache',
+                                  indicator_cache=indicator_cache)
 
     evaluator.run(30)
 
@@ -132,8 +146,11 @@ def main():
     exit_in_n_barss = range(10, 201, 10)
     search_params = product(entry_probs, target_profits, exit_in_n_barss)
     df = pd.DataFrame()
+    # indicators are shared by every grid point on the same data
+    indicator_cache = IndicatorCache(cache_dir='data/.tmtrader_cache')
     for i, (prob, target_prof, n_bars) in enumerate(search_params):
-        df_tmp = eval_random_strategy(prob, target_prof, n_bars)
+        df_tmp = eval_random_strategy(prob, target_prof, n_bars,
+                                      indicator_cache)
         df_tmp['sid'] = i
         df_tmp['entry_prob'] = prob
         df_tmp['target_prof'] = target_prof
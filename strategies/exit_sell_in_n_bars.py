@@ -4,7 +4,7 @@ from typing import Optional
 from tmtrader.entity.order import Order, SellMarketOrder
 from tmtrader.entity.position import PositionsRefForClient
 from tmtrader.entity.price import PriceSequence
-from tmtrader.usecase.strategy import Strategy
+from tmtrader.usecase.strategy import Schedule, Strategy
 
 logger = getLogger(__name__)
 
@@ -12,6 +12,8 @@ N_BARS = 5
 
 
 class ExitSellInNBars(Strategy):
+    schedule = Schedule(when_flat=False)
+
     def __init__(self, n_bars: Optional[int] = None):
         self.__n_bars = n_bars if n_bars else N_BARS
 
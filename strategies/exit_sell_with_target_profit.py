@@ -4,11 +4,13 @@ from typing import Optional
 from tmtrader.entity.order import Order, SellMarketOrder
 from tmtrader.entity.position import PositionsRefForClient
 from tmtrader.entity.price import PriceSequence
-from tmtrader.usecase.strategy import Strategy
+from tmtrader.usecase.strategy import Schedule, Strategy
 
 logger = getLogger(__name__)
 
 class ExitSellWithTargetProfit(Strategy):
+    schedule = Schedule(when_flat=False)
+
     def __init__(self, target_profit: float):
         self.__target_profit = target_profit
 
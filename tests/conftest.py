@@ -0,0 +1,18 @@
+from pathlib import Path
+
+import pytest
+
+from tests.price_data import write_price_csv
+
+PRODUCT_CONFIG = Path(__file__).parents[1] / 'tmtrader' / 'config' \
+    / 'product_config.json'
+
+
+@pytest.fixture
+def price_csv(tmp_path) -> str:
+    return write_price_csv(tmp_path / 'prices.csv', 300)
+
+
+@pytest.fixture
+def product_config() -> str:
+    return str(PRODUCT_CONFIG)
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def write_price_csv(path: Path, n_bars: int, time_step: float = 1.,
+                    seed: int = 0) -> str:
+    """Writes a random walk of `n_bars` bars every `time_step` to `path`."""
+    rng = np.random.default_rng(seed)
+    close = 4000 + np.cumsum(rng.normal(0, 5, n_bars))
+    open_ = close + rng.normal(0, 2, n_bars)
+    high = np.maximum(open_, close) + rng.random(n_bars) * 5
+    low = np.minimum(open_, close) - rng.random(n_bars) * 5
+    pd.DataFrame({'Open': open_.round(2), 'High': high.round(2),
+                  'Low': low.round(2), 'Close': close.round(2),
+                  'Vol': rng.integers(100, 1000, n_bars),
+                  'Time': np.arange(n_bars) * time_step}) \
+        .to_csv(path, index=False)
+    return str(path)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tmtrader.exchange_for_backtest.bar_aggregator import TimeframeAggregator
+from tmtrader.trader import create_trader
+from tmtrader.usecase.strategy import Strategy
+
+
+def _resample(df: pd.DataFrame, period: float) -> np.ndarray:
+    grouped = df.groupby(np.floor(df['Time'] / period))
+    bars = pd.DataFrame({'Open': grouped['Open'].first(),
+                         'High': grouped['High'].max(),
+                         'Low': grouped['Low'].min(),
+                         'Close': grouped['Close'].last(),
+                         'Vol': grouped['Vol'].sum()})
+    bars['Time'] = bars.index * period
+    return bars.to_numpy()
+
+
+def _aggregate(df: pd.DataFrame, aggregator: TimeframeAggregator
+               ) -> np.ndarray:
+    bars = []
+    for row in df[['Open', 'High', 'Low', 'Close', 'Vol', 'Time']]\
+            .itertuples(index=False):
+        aggregator.update(*row)
+        if aggregator.is_new_bar:
+            b = aggregator.bars
+            bars.append([b.open[0], b.high[0], b.low[0], b.close[0],
+                         b.vol[0], b.time[0]])
+    return np.array(bars)
+
+
+@pytest.mark.parametrize('period', [2., 5., 7.])
+def test_aggregated_bars_equal_resampled_bars(price_csv, period):
+    df = pd.read_csv(price_csv)
+    # the forming bar at the end of the data is not completed
+    n_rows = len(df) - len(df) % int(period)
+    expected = _resample(df.iloc[:n_rows], period)
+
+    bars = _aggregate(df, TimeframeAggregator(period, n_bars=len(df)))
+    np.testing.assert_allclose(bars, expected)
+
+
+def test_gap_closes_the_forming_bar(price_csv):
+    df = pd.read_csv(price_csv).iloc[:20]
+    # the bars from time 7 to 12 are missing
+    df = df[(df['Time'] < 7) | (df['Time'] > 12)]
+
+    bars = _aggregate(df, TimeframeAggregator(5., base_period=1.))
+    np.testing.assert_allclose(bars, _resample(df, 5.))
+    assert list(bars[:, 5]) == [0., 5., 10., 15.]
+
+
+class _Record(Strategy):
+    def __init__(self):
+        self.closes = []
+
+    def execute(self, d, p):
+        if d.is_new_bar(5.):
+            self.closes.append((float(d.time[0]),
+                                float(d.timeframe(5.).close[0])))
+
+
+def test_timeframe_bars_are_fed_with_the_last_base_bar(price_csv,
+                                                       product_config):
+    trader = create_trader(price_csv, product_config, timeframes=[5.])
+    recorder = _Record()
+    trader.add_strategy(recorder)
+    trader.start()
+
+    close = pd.read_csv(price_csv)['Close'].to_numpy()
+    assert recorder.closes == [(float(t), close[t])
+                               for t in range(4, len(close), 5)]
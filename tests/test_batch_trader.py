@@ -0,0 +1,67 @@
+import pytest
+
+from random_strategy_001 import StrategyEvaluator
+from strategies.exit_sell_in_n_bars import ExitSellInNBars
+from tmtrader.entity.order import BuyMarketOrder
+from tmtrader.trader import create_batch_trader, create_trader
+from tmtrader.usecase.strategy import Strategy
+
+
+class _EveryNthBar(Strategy):
+    """enters on every `n`-th bar it sees, so it keeps a state"""
+
+    def __init__(self, n: int):
+        self.__n = n
+        self.n_calls = 0
+
+    def execute(self, d, p):
+        self.n_calls += 1
+        if self.n_calls % self.__n == 0 and not p.has_positions():
+            return BuyMarketOrder(d.time[0], 0, 1, 1)
+
+
+def _strategies():
+    return [_EveryNthBar(7), ExitSellInNBars(3)]
+
+
+def test_batch_traders_do_not_share_strategy_states(price_csv,
+                                                    product_config):
+    single = create_trader(price_csv, product_config)
+    single.add_strategy(_strategies())
+    single.start()
+
+    batch = create_batch_trader(price_csv, product_config, 3)
+    for trader in batch.traders:
+        trader.add_strategy(_strategies())
+    batch.start()
+
+    assert single.trade_history()
+    for trader in batch.traders:
+        assert trader.trade_history() == single.trade_history()
+
+
+def test_batch_rejects_a_strategy_added_to_several_traders(price_csv,
+                                                           product_config):
+    batch = create_batch_trader(price_csv, product_config, 2)
+    shared = _strategies()
+    for trader in batch.traders:
+        trader.add_strategy(shared)
+    with pytest.raises(ValueError):
+        batch.start()
+
+
+def test_evaluator_creates_strategies_for_each_trader(price_csv,
+                                                      product_config):
+    created = []
+
+    def create_strategies():
+        strategies = _strategies()
+        created.append(strategies[0])
+        return strategies
+
+    evaluator = StrategyEvaluator(price_csv, product_config,
+                                  create_strategies)
+    evaluator.run(3)
+
+    assert len({id(s) for s in created}) == 3
+    assert len({r.n_trades for r in evaluator.results}) == 1
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from tmtrader.entity.order import BuyMarketOrder, Bracket, SellMarketOrder
+from tmtrader.trader import create_trader
+from tmtrader.usecase.strategy import Strategy
+
+
+class _EnterOnce(Strategy):
+    def __init__(self, bracket: Bracket, is_buy: bool = True):
+        self.__bracket = bracket
+        self.__is_buy = is_buy
+
+    def execute(self, d, p):
+        if d.time[0] == 2:
+            order_class = BuyMarketOrder if self.__is_buy else SellMarketOrder
+            return order_class(d.time[0], 0, 1, 0).attach_bracket(
+                self.__bracket)
+
+
+def _write_bars(path, wide_bar: int) -> str:
+    """Writes flat bars at 100, except the one at `wide_bar` ranging from 90
+    to 110."""
+    times = list(range(8))
+    pd.DataFrame({'Open': 100., 'Close': 100., 'Vol': 1, 'Time': times,
+                  'High': [110. if t == wide_bar else 100. for t in times],
+                  'Low': [90. if t == wide_bar else 100. for t in times]}) \
+        [['Open', 'High', 'Low', 'Close', 'Vol', 'Time']] \
+        .to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize('is_buy', [True, False])
+@pytest.mark.parametrize('tick_prices', [False, True])
+@pytest.mark.parametrize('distance', [Decimal(5), 5.])
+def test_stop_is_filled_when_a_bar_reaches_target_and_stop(
+        tmp_path, product_config, is_buy, tick_prices, distance):
+    prices = _write_bars(tmp_path / 'prices.csv', wide_bar=4)
+    trader = create_trader(prices, product_config, tick_prices=tick_prices)
+    trader.add_strategy(_EnterOnce(Bracket(distance, distance), is_buy))
+    trader.start()
+
+    trades = trader.trade_history()
+    assert len(trades) == 1
+    assert trades[0].entry == (2, Decimal(100))
+    assert trades[0].exit.timestamp == 4
+    assert trades[0].exit.price == (Decimal(95) if is_buy else Decimal(105))
+    assert trades[0].pl == Decimal(-5)
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import pandas as pd
+
+from tmtrader.config.product_config import ProductConfig
+from tmtrader.entity.price import Bar
+from tmtrader.exchange_for_backtest.decimal_bar_table import DecimalBarTable
+from tmtrader.usecase.round_price import RoundPrice
+
+
+def _rounder() -> RoundPrice:
+    return RoundPrice(ProductConfig(1, {'default': {}, 'products': [
+        {'id': 1, 'name': 'a', 'min_frac': 25, 'n_float_digits': 2}]}))
+
+
+def test_bars_are_rounded_to_the_tick_grid(price_csv):
+    columns = [c.to_numpy() for _, c in pd.read_csv(price_csv).items()]
+    rounder = _rounder()
+    table = DecimalBarTable.from_prices(*columns, rounder)
+
+    for idx in [0, 1, 1, 150, 299]:
+        prices = [rounder.round2fraction(Decimal(float(c[idx]))) for c in
+                  columns[:4]]
+        vol_time = (int(columns[4][idx]), int(columns[5][idx]))
+        assert table.bar(idx) == Bar(*prices, *vol_time)
+        assert table.tick_bar(idx) == Bar(
+            *[rounder.decimal2ticks(p) for p in prices], *vol_time)
+
+
+def test_a_range_of_rows_is_rounded_like_the_whole_table(price_csv):
+    columns = [c.to_numpy() for _, c in pd.read_csv(price_csv).items()]
+    rounder = _rounder()
+    whole = DecimalBarTable.from_prices(*columns, rounder)
+    part = DecimalBarTable.from_prices(*columns, rounder, 100, 200)
+
+    assert (part.ticks[100:200] == whole.ticks[100:200]).all()
+    assert part.bar(100) == whole.bar(100)
+    assert part.tick_bar(199) == whole.tick_bar(199)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from strategies.entry_buy_random import EntryBuyRandom
+from strategies.exit_sell_in_n_bars import ExitSellInNBars
+from tmtrader.entity.order import BuyMarketOrder
+from tmtrader.indicator.indicator import ATR, EMA, RSI, SMA, VWAP, \
+    Bollinger, RollingHigh, RollingLow
+from tmtrader.indicator.registry import IndicatorRegistry
+from tmtrader.indicator.vectorized import compute
+from tmtrader.trader import create_trader
+from tmtrader.usecase.strategy import Strategy
+
+
+def _window_mean_std(x: np.ndarray, period: int):
+    windows = np.lib.stride_tricks.sliding_window_view(x, period)
+    return windows.mean(axis=1), windows.std(axis=1)
+
+
+def test_bollinger_keeps_precision_on_long_series():
+    rng = np.random.default_rng(0)
+    period = 20
+    close = 4000 + np.cumsum(rng.normal(0, 1, 50_000))
+    columns = [close, close, close, close, np.ones(len(close))]
+    indicator = Bollinger(period).create()
+    incremental = np.array([indicator.update(*bar) for bar in
+                            zip(*columns)]).T
+    vectorized = compute(Bollinger(period), columns)
+
+    mean, std = _window_mean_std(close, period)
+    for values in [incremental, vectorized]:
+        assert np.isnan(values[:, :period - 1]).all()
+        np.testing.assert_allclose(values[0, period - 1:], mean,
+                                   rtol=0, atol=1e-9)
+        np.testing.assert_allclose(values[1, period - 1:], mean + 2 * std,
+                                   rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('spec', [
+    SMA(20), EMA(20), ATR(14), RSI(14), RollingHigh(50), RollingLow(50),
+    VWAP(), VWAP(30), Bollinger(20)])
+def test_vectorized_indicators_equal_incremental_ones_on_long_series(spec):
+    rng = np.random.default_rng(0)
+    n_bars = 100_000
+    close = 4000 + np.cumsum(rng.normal(0, 1, n_bars))
+    high = close + rng.random(n_bars)
+    low = close - rng.random(n_bars)
+    vol = rng.integers(1, 1000, n_bars).astype(float)
+    columns = [close, high, low, close, vol]
+    indicator = spec.create()
+    incremental = np.array([indicator.update(*bar) for bar in
+                            zip(*columns)]).T
+    vectorized = compute(spec, columns)
+
+    np.testing.assert_array_equal(np.isnan(vectorized), np.isnan(incremental))
+    np.testing.assert_allclose(vectorized, incremental, rtol=1e-12, atol=0)
+
+
+def test_registry_drops_an_indicator_after_its_last_release():
+    registry = IndicatorRegistry()
+    registry.register(SMA(5))
+    registry.register(SMA(5), 3)
+    registry.release(SMA(5))
+    assert registry.registered(SMA(5))
+    registry.release(SMA(5))
+    assert not registry.registered(SMA(5))
+    # releasing an unregistered spec does nothing
+    registry.release(SMA(5))
+    assert registry.len == 0
+
+
+class _EntryWithIndicator(EntryBuyRandom):
+    indicators = (SMA(5),)
+
+
+@pytest.mark.parametrize('jump_ahead', [False, True])
+def test_removed_strategy_does_not_keep_its_indicators(
+        price_csv, product_config, jump_ahead):
+    trader = create_trader(price_csv, product_config, jump_ahead=jump_ahead)
+    removed = _EntryWithIndicator(1.)
+    trader.add_strategy([removed, EntryBuyRandom(1.), ExitSellInNBars(3)])
+    trader.remove_strategy(removed)
+    assert trader.cl.strategy_proc.indicators.len == 0
+    trader.start()
+    assert trader.trade_history()
+
+
+class _EntryAboveEMA(Strategy):
+    indicators = (EMA(20),)
+
+    def execute(self, d, p):
+        if not p.has_positions() and d.close[0] > d.indicator(EMA(20))[0]:
+            return BuyMarketOrder(d.time[0], 0, 1, 1)
+
+
+@pytest.mark.parametrize('start', [None, 100])
+def test_incremental_indicators_are_warmed_up_before_start(
+        price_csv, product_config, start):
+    trades = []
+    for precompute in [False, True]:
+        trader = create_trader(price_csv, product_config, start=start,
+                               precompute_indicators=precompute)
+        trader.add_strategy([_EntryAboveEMA(), ExitSellInNBars(3)])
+        trader.start()
+        trades.append(trader.trade_history())
+
+    assert trades[0]
+    assert trades[0] == trades[1]
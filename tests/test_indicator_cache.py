@@ -0,0 +1,55 @@
+import numpy as np
+
+from tmtrader.indicator.indicator import SMA
+from tmtrader.indicator.indicator_cache import IndicatorCache
+
+
+class _Compute:
+    def __init__(self, n_values: int):
+        self.__n_values = n_values
+        self.n_calls = 0
+
+    def __call__(self) -> np.ndarray:
+        self.n_calls += 1
+        return np.arange(self.__n_values, dtype=float)[None, :]
+
+
+def test_least_recently_used_values_are_evicted():
+    # room for two arrays of 8 float64
+    cache = IndicatorCache(max_bytes=128)
+    compute = _Compute(8)
+    cache.get('data', SMA(1), compute)
+    cache.get('data', SMA(2), compute)
+    cache.get('data', SMA(1), compute)
+    assert compute.n_calls == 2
+
+    cache.get('data', SMA(3), compute)
+    assert cache.n_bytes == 128
+    # SMA(2) was the least recently used
+    cache.get('data', SMA(1), compute)
+    assert compute.n_calls == 3
+    cache.get('data', SMA(2), compute)
+    assert compute.n_calls == 4
+
+
+def test_values_larger_than_the_cache_are_not_kept():
+    cache = IndicatorCache(max_bytes=64)
+    compute = _Compute(9)
+    values = cache.get('data', SMA(1), compute)
+    cache.get('data', SMA(1), compute)
+    assert compute.n_calls == 2
+    assert cache.n_bytes == 0
+    assert not values.flags.writeable
+
+
+def test_stored_values_are_reused_by_other_caches(tmp_path):
+    compute = _Compute(8)
+    stored = IndicatorCache(cache_dir=tmp_path).get('data', SMA(5), compute)
+
+    other = IndicatorCache(cache_dir=tmp_path)
+    np.testing.assert_array_equal(other.get('data', SMA(5), compute), stored)
+    assert compute.n_calls == 1
+    # the values of other price data are not reused
+    other.get('other data', SMA(5), compute)
+    assert compute.n_calls == 2
+    assert not list(tmp_path.rglob('*.tmp.npy'))
@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from strategies.entry_buy_random import EntryBuyRandom
+from tmtrader.entity.order import Bracket, BuyLimitOrder, TimeInForce, \
+    TimeInForceType
+from tmtrader.trader import create_trader
+from tmtrader.usecase.price_feed import PriceObserver
+from tmtrader.usecase.strategy import Schedule, Strategy
+
+
+class _CountBars(PriceObserver):
+    def __init__(self):
+        self.n_bars = 0
+
+    def notify_price_update(self, price_ref):
+        self.n_bars += 1
+
+
+class _EntryLimit(Strategy):
+    """buys 1 below the close every 4 bars while flat"""
+    schedule = Schedule(when_in_position=False, every_n_bars=4)
+
+    def __init__(self, time_in_force: TimeInForce, bracket: Bracket):
+        self.__time_in_force = time_in_force
+        self.__bracket = bracket
+
+    def execute(self, d, p):
+        price = Decimal(round(float(d.close[0]) * 4)) / 4 - 1
+        return BuyLimitOrder(d.time[0], 0, 1, price, 0) \
+            .set_time_in_force(self.__time_in_force) \
+            .attach_bracket(self.__bracket)
+
+
+def _run(price_csv, product_config, strategy, jump_ahead, **kwargs):
+    trader = create_trader(price_csv, product_config, jump_ahead=jump_ahead,
+                           **kwargs)
+    trader.add_strategy(strategy())
+    counter = _CountBars()
+    trader.ex.price_stream.add_price_observer(counter)
+    np.random.seed(0)
+    trader.start()
+    return trader.trade_history(), counter.n_bars
+
+
+@pytest.mark.parametrize('time_in_force', [
+    TimeInForce(),
+    TimeInForce(TimeInForceType.N_BARS, n_bars=3),
+    TimeInForce(TimeInForceType.GTD, expire_time=150.),
+    TimeInForce(TimeInForceType.DAY, session_period=50.)])
+@pytest.mark.parametrize('tick_prices', [False, True])
+def test_jump_ahead_trades_like_the_full_run(price_csv, product_config,
+                                             time_in_force, tick_prices):
+    def strategy():
+        return _EntryLimit(time_in_force, Bracket(
+            Decimal(8), Decimal(8), exit_in_n_bars=30))
+
+    full, n_full = _run(price_csv, product_config, strategy, False,
+                        tick_prices=tick_prices)
+    jumped, n_jumped = _run(price_csv, product_config, strategy, True,
+                            tick_prices=tick_prices)
+
+    assert full
+    assert jumped == full
+    assert n_jumped < n_full
+
+
+def test_jump_ahead_skips_the_bars_in_position_of_entry_buy_random(
+        price_csv, product_config):
+    def strategy():
+        return EntryBuyRandom(0.3, Bracket(Decimal(10), Decimal(10)))
+
+    full, n_full = _run(price_csv, product_config, strategy, False)
+    jumped, n_jumped = _run(price_csv, product_config, strategy, True)
+
+    assert full
+    assert jumped == full
+    assert n_jumped < n_full
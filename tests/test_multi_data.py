@@ -0,0 +1,53 @@
+import json
+
+from strategies.entry_buy_random import EntryBuyRandom
+from strategies.exit_sell_in_n_bars import ExitSellInNBars
+from tests.price_data import write_price_csv
+from tmtrader.entity.order import BuyMarketOrder, SellMarketOrder
+from tmtrader.trader import create_trader
+from tmtrader.usecase.strategy import Strategy
+
+
+class _TradeSecondProduct(Strategy):
+    """buys the second product at time 13 and sells it at time 17"""
+
+    def execute(self, d, p):
+        if d.time[0] == 13:
+            return BuyMarketOrder(d.time[0], 1, 1, 0)
+        if d.time[0] == 17:
+            return SellMarketOrder(d.time[0], 1, 1, 0)
+
+
+def test_orders_wait_for_a_bar_of_their_product(tmp_path):
+    primary = write_price_csv(tmp_path / 'a.csv', 50)
+    # bars only every 10 time units
+    sparse = write_price_csv(tmp_path / 'b.csv', 5, time_step=10., seed=1)
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'default': {}, 'products': [
+        {'id': 1, 'name': 'a', 'min_frac': 25, 'n_float_digits': 2},
+        {'id': 2, 'name': 'b', 'min_frac': 1, 'n_float_digits': 2}]}))
+
+    trader = create_trader([primary, sparse], str(config))
+    trader.add_strategy(_TradeSecondProduct())
+    trader.start()
+
+    trades = trader.trade_history()
+    assert len(trades) == 1
+    # both orders are filled on the next bar of the second product, not on
+    # the one before they were sent
+    assert trades[0].entry.timestamp == 20
+    assert trades[0].exit.timestamp == 20
+
+
+def test_single_file_feeds_the_bars_of_the_single_data_feeder(
+        price_csv, product_config):
+    trades = []
+    for file_paths in [price_csv, [price_csv]]:
+        trader = create_trader(file_paths, product_config, start=100,
+                               chunk_size=64)
+        trader.add_strategy([EntryBuyRandom(1.), ExitSellInNBars(3)])
+        trader.start()
+        trades.append(trader.trade_history())
+
+    assert trades[0]
+    assert trades[0] == trades[1]
@@ -0,0 +1,227 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from tmtrader.entity.order import BuyLimitOrder, BuyMarketOrder, \
+    BuyStopOrder, OrderReplacement, OrderStatus, SellLimitOrder, \
+    SellStopOrder, TimeInForce, TimeInForceType
+from tmtrader.entity.price import Bar
+from tmtrader.exchange_for_backtest.back_test_broker import BackTestBroker
+from tmtrader.exchange_for_backtest.order_book import OrderBook
+from tmtrader.exchange_for_backtest.usecase.close_order import \
+    OrderCloseObserver
+from tmtrader.usecase.time_ref import SimulatedTimeRef
+
+
+def _limit(price, product_id=0, is_buy=True):
+    order_class = BuyLimitOrder if is_buy else SellLimitOrder
+    return order_class(0, product_id, 1, Decimal(price), 0)
+
+
+class TestOrderBook:
+    def test_pops_orders_within_the_range_in_the_order_added(self):
+        book = OrderBook()
+        orders = [_limit(103), _limit(95), _limit(100, is_buy=False),
+                  _limit(110, is_buy=False), _limit(99)]
+        [book.add(o) for o in orders]
+
+        touched = book.pop_touched({0: (Decimal(95), Decimal(103))})
+
+        # the bounds are included
+        assert touched == [orders[0], orders[1], orders[2], orders[4]]
+        assert len(book) == 1
+        assert book.prices() == [Decimal(110)]
+        assert book.pop_touched({0: (Decimal(95), Decimal(103))}) == []
+
+    def test_keeps_orders_outside_the_range_or_of_other_products(self):
+        book = OrderBook()
+        orders = [_limit(90), _limit(100, product_id=1),
+                  _limit(111, is_buy=False)]
+        [book.add(o) for o in orders]
+
+        assert book.pop_touched({0: (Decimal(95), Decimal(110))}) == []
+        assert len(book) == 3
+        assert book.product_ids == {0, 1}
+
+    def test_orders_of_the_same_price_are_kept_apart(self):
+        book = OrderBook()
+        orders = [_limit(100) for _ in range(3)]
+        [book.add(o) for o in orders]
+
+        assert book.remove(orders[1])
+        assert book.pop_touched({0: (Decimal(100), Decimal(100))}) == \
+            [orders[0], orders[2]]
+
+    def test_removes_an_order(self):
+        book = OrderBook()
+        kept, removed = _limit(100), _limit(101)
+        book.add(kept)
+        book.add(removed)
+
+        assert book.remove(removed)
+        assert not book.remove(removed)
+        assert not book.remove(_limit(101))
+        assert book.pop_touched({0: (Decimal(0), Decimal(1000))}) == [kept]
+        assert len(book) == 0
+        assert book.product_ids == set()
+
+    def test_matches_a_linear_scan(self):
+        rng = np.random.default_rng(0)
+        book = OrderBook()
+        orders = [_limit(int(p), product_id=int(i), is_buy=bool(b))
+                  for p, i, b in zip(rng.integers(90, 111, 300),
+                                     rng.integers(0, 2, 300),
+                                     rng.integers(0, 2, 300))]
+        [book.add(o) for o in orders]
+        for low in range(88, 110, 3):
+            ranges = {0: (Decimal(low), Decimal(low + 2)),
+                      1: (Decimal(low + 1), Decimal(low + 4))}
+            expected = [o for o in orders if o.product_id in ranges
+                        and ranges[o.product_id][0] <= o.price
+                        <= ranges[o.product_id][1]]
+            assert book.pop_touched(ranges) == expected
+            orders = [o for o in orders if o not in expected]
+        assert len(book) == len(orders)
+
+
+class _Stream:
+    """price stream of a single product whose latest bar is set by tests"""
+
+    def __init__(self):
+        self.bar = None
+
+    def get_latest_bar_decimal(self, product_id=None) -> Bar:
+        return self.bar
+
+    def has_latest_bar(self, product_id=None) -> bool:
+        return True
+
+
+class _Times:
+    def __init__(self, time_):
+        self.time = [time_]
+
+
+class _Closed(OrderCloseObserver):
+    def __init__(self):
+        self.filled = []
+        self.cancelled = []
+
+    def notify_order_accepted(self, order):
+        pass
+
+    def notify_order_filled(self, order):
+        self.filled.append(order)
+
+    def notify_order_cancelled(self, order):
+        self.cancelled.append(order)
+
+
+class _Exchange:
+    def __init__(self):
+        self.stream = _Stream()
+        self.time_ref = SimulatedTimeRef()
+        self.broker = BackTestBroker(self.stream, self.time_ref)
+        self.closed = _Closed()
+        self.broker.add_order_close_observer(self.closed)
+        self.time = 0
+        self.bar(100, 100)
+
+    def bar(self, low, high):
+        """feeds the next bar, which opens at `low`"""
+        self.time += 1
+        self.stream.bar = Bar(Decimal(low), Decimal(high), Decimal(low),
+                              Decimal(low), 1, self.time)
+        self.time_ref.advance(self.time)
+        self.broker.notify_price_update(_Times(self.time))
+
+    @property
+    def filled_ids(self):
+        return [o.order_id for o in self.closed.filled]
+
+    @property
+    def cancelled_ids(self):
+        return [o.order_id for o in self.closed.cancelled]
+
+
+@pytest.fixture
+def exchange() -> _Exchange:
+    return _Exchange()
+
+
+class TestBackTestBroker:
+    def test_fills_resting_orders_touched_by_a_bar(self, exchange):
+        exchange.broker.notify_new_orders([
+            BuyLimitOrder(1, 0, 1, Decimal(95), 0, 1),
+            SellStopOrder(1, 0, 1, Decimal(90), 0, 2),
+            BuyStopOrder(1, 0, 1, Decimal(105), 0, 3)])
+        exchange.bar(96, 104)
+        assert exchange.filled_ids == []
+
+        exchange.bar(94, 99)
+        assert exchange.filled_ids == [1]
+        assert exchange.closed.filled[0].filled_price == Decimal(95)
+        exchange.bar(89, 106)
+        assert exchange.filled_ids == [1, 2, 3]
+
+    def test_cancelled_orders_leave_the_book(self, exchange):
+        exchange.broker.notify_new_orders([
+            BuyLimitOrder(1, 0, 1, Decimal(95), 0, 1),
+            SellLimitOrder(1, 0, 1, Decimal(105), 0, 2)])
+        exchange.broker.notify_cancel_orders([1, 12345])
+        exchange.bar(90, 110)
+
+        assert exchange.cancelled_ids == [1]
+        assert exchange.filled_ids == [2]
+
+    def test_cancelled_orders_are_not_activated(self, exchange):
+        exchange.broker.notify_new_orders([
+            BuyMarketOrder(1, 0, 1, 2, 1)])
+        exchange.bar(100, 100)
+        exchange.broker.notify_cancel_orders([1])
+        for _ in range(3):
+            exchange.bar(100, 100)
+
+        assert exchange.filled_ids == []
+        assert exchange.cancelled_ids == [1]
+
+    def test_cancelled_orders_do_not_expire(self, exchange):
+        exchange.broker.notify_new_orders([
+            BuyLimitOrder(1, 0, 1, Decimal(95), 0, 1).set_time_in_force(
+                TimeInForce(TimeInForceType.N_BARS, n_bars=2)),
+            BuyLimitOrder(1, 0, 1, Decimal(95), 0, 2).set_time_in_force(
+                TimeInForce(TimeInForceType.GTD, expire_time=3))])
+        exchange.broker.notify_cancel_orders([1, 2])
+        for _ in range(4):
+            exchange.bar(100, 100)
+
+        assert exchange.cancelled_ids == [1, 2]
+
+    def test_orders_expire_by_time_in_force(self, exchange):
+        exchange.broker.notify_new_orders([
+            BuyLimitOrder(1, 0, 1, Decimal(95), 0, 1).set_time_in_force(
+                TimeInForce(TimeInForceType.N_BARS, n_bars=2)),
+            BuyLimitOrder(1, 0, 1, Decimal(95), 0, 2).set_time_in_force(
+                TimeInForce(TimeInForceType.GTD, expire_time=5))])
+        exchange.bar(100, 100)
+        exchange.bar(100, 100)
+        assert exchange.cancelled_ids == [1]
+        exchange.bar(90, 100)
+        assert exchange.filled_ids == [2]
+
+    def test_replaced_orders_move_in_the_book(self, exchange):
+        order = BuyLimitOrder(1, 0, 1, Decimal(95), 0, 1)
+        exchange.broker.notify_new_orders([order])
+        exchange.broker.notify_replace_orders([
+            OrderReplacement(1, 2, Decimal(90), 2)])
+        exchange.bar(93, 100)
+        assert exchange.filled_ids == []
+        assert order.status == OrderStatus.CANCELLED
+
+        exchange.bar(89, 100)
+        assert exchange.filled_ids == [2]
+        assert exchange.closed.filled[0].filled_price == Decimal(90)
+        assert exchange.closed.filled[0].filled_n_shares == 2
+        exchange.broker.notify_cancel_orders([1, 2])
+        assert exchange.cancelled_ids == [1]
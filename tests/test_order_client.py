@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+import pytest
+
+from tmtrader.api.back_test.order_client import BackTestOrderClient
+from tmtrader.entity.order import BuyLimitOrder, OrderStatus, \
+    SellLimitOrder, TimeInForce, TimeInForceType
+from tmtrader.trader import create_trader
+from tmtrader.usecase.event_scheduler import EventScheduler
+from tmtrader.usecase.send_order import OrderObserver
+from tmtrader.usecase.strategy import Strategy
+
+ONE_BAR = TimeInForce(TimeInForceType.N_BARS, n_bars=1)
+
+
+class _Limits(Strategy):
+    """keeps the limit orders it returns"""
+
+    def __init__(self):
+        self.orders = []
+
+    def execute(self, d, p):
+        if self.orders and self.orders[-1].status == OrderStatus.OPEN:
+            return None
+        order_class = SellLimitOrder if p.has_positions() else BuyLimitOrder
+        # the close rounded to the tick of 0.25
+        price = Decimal(round(float(d.close[0]) * 4)) / 4
+        self.orders.append(order_class(d.time[0], 0, 1, price, 0))
+        return self.orders[-1]
+
+
+@pytest.mark.parametrize('tick_prices', [False, True])
+def test_strategy_orders_are_sent_as_they_are(price_csv, product_config,
+                                              tick_prices):
+    trader = create_trader(price_csv, product_config, tick_prices=tick_prices)
+    strategy = _Limits()
+    trader.add_strategy(strategy)
+    trader.start()
+
+    trades = trader.trade_history()
+    assert len(trades) > 10
+    filled = [o for o in strategy.orders if o.status == OrderStatus.FILLED]
+    # the last entry may have no exit
+    assert len(filled) in [2 * len(trades), 2 * len(trades) + 1]
+    ids = [o.order_id for o in strategy.orders]
+    assert None not in ids
+    assert len(set(ids)) == len(ids)
+    price_type = int if tick_prices else Decimal
+    assert all(type(o.price) is price_type for o in strategy.orders)
+
+
+def test_tick_prices_do_not_change_the_trades_of_strategy_orders(
+        price_csv, product_config):
+    trades = []
+    for tick_prices in [False, True]:
+        trader = create_trader(price_csv, product_config,
+                               tick_prices=tick_prices)
+        trader.add_strategy(_Limits())
+        trader.start()
+        trades.append(trader.trade_history())
+    assert trades[0] == trades[1]
+
+
+class _FarLimit(Strategy):
+    """places a limit order far from the close every 10 bars, which expires
+    without being filled"""
+
+    def __init__(self, order_class, price):
+        self.__order_class = order_class
+        self.__price = Decimal(price)
+
+    def execute(self, d, p):
+        if d.time[0] % 10 == 0:
+            return self.__order_class(d.time[0], 0, 1, self.__price, 0) \
+                .set_time_in_force(ONE_BAR)
+
+
+class _Notifications(OrderObserver):
+    def __init__(self):
+        self.orders = []
+
+    def notify_new_orders(self, orders):
+        self.orders.append([o.time for o in orders])
+
+
+def test_orders_of_a_bar_reach_the_exchange_in_one_notification(
+        price_csv, product_config):
+    trader = create_trader(price_csv, product_config)
+    trader.add_strategy([_FarLimit(BuyLimitOrder, 1),
+                         _FarLimit(SellLimitOrder, 10000)])
+    notifications = _Notifications()
+    trader.ex.order_receiver.add_order_observer(notifications)
+    trader.start()
+
+    assert notifications.orders == [[float(t)] * 2
+                                    for t in range(0, 300, 10)]
+
+
+def test_orders_placed_in_a_batch_reach_the_exchange_together():
+    order_client = BackTestOrderClient(EventScheduler().time_ref)
+    notifications = _Notifications()
+    order_client.add_order_observer(notifications)
+    with order_client.batch():
+        order_client.buy_limit(0, Decimal(1), 1, 0)
+        order_client.sell_limit(0, Decimal(10000), 1, 0)
+        assert not notifications.orders
+    order_client.buy_limit(0, Decimal(1), 1, 0)
+
+    assert [len(orders) for orders in notifications.orders] == [2, 1]
+
+
+def test_batches_cannot_be_nested():
+    order_client = BackTestOrderClient(EventScheduler().time_ref)
+    with order_client.batch():
+        with pytest.raises(RuntimeError):
+            with order_client.batch():
+                pass
@@ -0,0 +1,26 @@
+import pytest
+
+from strategies.entry_buy_random import EntryBuyRandom
+from strategies.exit_sell_in_n_bars import ExitSellInNBars
+from tmtrader.trader import create_trader
+
+
+@pytest.mark.parametrize('order_latency', [0., 1.5, 3.5])
+def test_orders_in_transit_are_not_duplicated(price_csv, product_config,
+                                              order_latency):
+    trader = create_trader(price_csv, product_config,
+                           order_latency=order_latency)
+    trader.add_strategy([EntryBuyRandom(1.), ExitSellInNBars(3)])
+    trader.start()
+
+    trades = trader.trade_history()
+    assert len(trades) > 20
+    # one position at a time: an entry is not filled before the exit of the
+    # previous trade
+    for previous, trade in zip(trades, trades[1:]):
+        assert trade.entry.timestamp > previous.exit.timestamp
+    assert all(t.n_shares == 1 for t in trades)
+    # orders arrive at the exchange `order_latency` after they are sent
+    assert trades[0].entry.timestamp >= order_latency
+    positions = trader.cl.position_data_controller.get_ref().positions
+    assert sum(len(p.positions) for p in positions.values()) <= 1
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from tmtrader.entity.price import PriceWindow
+
+
+def _columns(n_rows):
+    return [np.arange(n_rows, dtype=np.float64) + 1000 * i for i in range(6)]
+
+
+@pytest.mark.parametrize('contiguous', [True, False])
+def test_window_holds_the_latest_bars_first(contiguous):
+    columns = _columns(20)
+    window = PriceWindow(columns, 4, contiguous)
+    window.seek(10)
+
+    assert window.bar_index == 10
+    np.testing.assert_array_equal(window.close, columns[3][10:6:-1])
+    np.testing.assert_array_equal(window.time, columns[5][10:6:-1])
+    # fewer bars than the window near the first row
+    window.seek(1)
+    np.testing.assert_array_equal(window.open, columns[0][1::-1])
+
+
+def test_window_is_advanced_in_place():
+    columns = _columns(20)
+    window = PriceWindow(columns, 3)
+    window.seek(5)
+    close = window.close
+    window.seek(6)
+
+    assert close[0] == 3005
+    assert window.close[0] == 3006
+    assert window.close.flags.c_contiguous
+
+
+def test_window_of_views_does_not_copy_the_columns():
+    columns = _columns(20)
+    window = PriceWindow(columns, 3, contiguous=False)
+    window.seek(5)
+
+    assert np.shares_memory(window.close, columns[3])
+    assert not np.shares_memory(PriceWindow(columns, 3).close, columns[3])
+
+
+def test_views_of_a_depth_follow_the_window():
+    columns = _columns(20)
+    window = PriceWindow(columns, 5)
+    view = window.with_depth(2)
+    window.seek(8)
+
+    assert window.with_depth(2) is view
+    assert window.with_depth(5) is window
+    np.testing.assert_array_equal(view.close, columns[3][8:6:-1])
+    # history deeper than the window
+    np.testing.assert_array_equal(view.history(9).close, columns[3][8::-1])
+    with pytest.raises(ValueError):
+        view.history(10)
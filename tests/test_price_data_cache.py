@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from tmtrader.exchange_for_backtest.price_data_cache import PriceDataCache
+
+
+class _Parse:
+    def __init__(self):
+        self.n_calls = 0
+
+    def __call__(self, file_path):
+        self.n_calls += 1
+        return pd.read_csv(file_path)
+
+
+def _load_close(cache, price_csv, parse) -> np.ndarray:
+    return cache.load(price_csv, parse)['Close']
+
+
+def test_cached_columns_are_used_while_the_file_is_unchanged(tmp_path,
+                                                             price_csv):
+    cache = PriceDataCache(tmp_path / 'cache')
+    parse = _Parse()
+    built = _load_close(cache, price_csv, parse)
+    loaded = _load_close(PriceDataCache(tmp_path / 'cache'), price_csv, parse)
+
+    assert parse.n_calls == 1
+    np.testing.assert_array_equal(loaded, built)
+    np.testing.assert_array_equal(loaded, pd.read_csv(price_csv)['Close'])
+
+
+def test_touched_file_with_the_same_content_is_not_parsed_again(tmp_path,
+                                                                price_csv):
+    cache = PriceDataCache(tmp_path / 'cache')
+    parse = _Parse()
+    _load_close(cache, price_csv, parse)
+    stat = os.stat(price_csv)
+    os.utime(price_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    _load_close(cache, price_csv, parse)
+    assert parse.n_calls == 1
+    assert cache.meta(price_csv).mtime_ns == stat.st_mtime_ns + 10 ** 9
+
+
+def test_changed_file_is_parsed_again(tmp_path, price_csv):
+    cache = PriceDataCache(tmp_path / 'cache')
+    parse = _Parse()
+    _load_close(cache, price_csv, parse)
+    cache.load_derived(price_csv, 'ones', lambda: np.ones(3))
+    stat = os.stat(price_csv)
+
+    df = pd.read_csv(price_csv)
+    # the same size, but another content
+    df.loc[0, 'Close'], df.loc[1, 'Close'] = df.loc[1, 'Close'], \
+        df.loc[0, 'Close']
+    df.to_csv(price_csv, index=False)
+    os.utime(price_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert os.stat(price_csv).st_size == stat.st_size
+
+    close = _load_close(cache, price_csv, parse)
+    assert parse.n_calls == 2
+    np.testing.assert_array_equal(close, df['Close'])
+    # arrays derived from the old columns are discarded
+    assert cache.load_derived(price_csv, 'ones', lambda: np.zeros(3)).sum() \
+        == 0
+
+    # another size
+    df.iloc[:-1].to_csv(price_csv, index=False)
+    assert len(_load_close(cache, price_csv, parse)) == len(df) - 1
+    assert parse.n_calls == 3
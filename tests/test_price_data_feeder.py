@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from strategies.entry_buy_random import EntryBuyRandom
+from strategies.exit_sell_in_n_bars import ExitSellInNBars
+from tmtrader.trader import create_trader
+from tmtrader.usecase.strategy import Strategy
+
+
+class _Record(Strategy):
+    """records the time and the past closes of every bar it sees"""
+    lookback = 5
+
+    def __init__(self):
+        self.times = []
+        self.closes = []
+
+    def execute(self, d, p):
+        self.times.append(float(d.time[0]))
+        self.closes.append([float(c) for c in d.close])
+
+
+@pytest.mark.parametrize('jump_ahead', [False, True])
+def test_memmap_feeder_feeds_the_same_bars_as_csv_feeder(
+        tmp_path, price_csv, product_config, jump_ahead):
+    trades = []
+    for memmap in [False, True]:
+        trader = create_trader(price_csv, product_config, memmap=memmap,
+                               cache_dir=str(tmp_path / 'cache'),
+                               start=20, end=250, jump_ahead=jump_ahead)
+        trader.add_strategy([EntryBuyRandom(1.), ExitSellInNBars(3)])
+        trader.start()
+        trades.append(trader.trade_history())
+
+    assert trades[0]
+    assert trades[0] == trades[1]
+    assert trades[0][0].entry.timestamp >= 20
+    assert trades[0][-1].exit.timestamp < 250
+
+
+@pytest.mark.parametrize('options', [
+    dict(), dict(memmap=True), dict(chunk_size=7), dict(timeframes=[5])])
+def test_only_the_bars_in_the_time_range_are_fed(tmp_path, price_csv,
+                                                 product_config, options):
+    trader = create_trader(price_csv, product_config, start=20, end=50,
+                           cache_dir=str(tmp_path / 'cache'), **options)
+    recorder = _Record()
+    trader.add_strategy(recorder)
+    trader.start()
+
+    close = pd.read_csv(price_csv)['Close'].to_numpy()
+    assert recorder.times == [float(t) for t in range(20, 50)]
+    # the bars before `start` are still the past bars of the first ones
+    assert recorder.closes[0] == list(close[20:15:-1])
+    assert recorder.closes[-1] == list(close[49:44:-1])
+
+
+@pytest.mark.parametrize('chunk_size', [3, 7, 64, 1000])
+def test_chunked_feeder_feeds_the_same_bars_as_csv_feeder(
+        price_csv, product_config, chunk_size):
+    recorders = []
+    trades = []
+    for options in [dict(), dict(chunk_size=chunk_size)]:
+        trader = create_trader(price_csv, product_config, **options)
+        recorder = _Record()
+        trader.add_strategy([recorder, EntryBuyRandom(1.),
+                             ExitSellInNBars(3)])
+        trader.start()
+        recorders.append(recorder)
+        trades.append(trader.trade_history())
+
+    assert trades[0]
+    assert trades[0] == trades[1]
+    # the past bars are carried over the boundaries of the chunks
+    assert recorders[0].times == recorders[1].times
+    assert recorders[0].closes == recorders[1].closes
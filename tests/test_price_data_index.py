@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tmtrader.exchange_for_backtest.price_data_cache import PriceDataCache
+from tmtrader.exchange_for_backtest.price_data_index import build_index, \
+    load_index
+from tmtrader.trader import create_trader
+
+
+def _columns(time_):
+    time_ = np.asarray(time_, dtype=np.float64)
+    return [np.ones(len(time_)) for _ in range(5)] + [time_]
+
+
+def test_index_flags_duplicates_and_gaps():
+    index = build_index(_columns([0, 1, 2, 2, 3, 10, 11, 11, 12, 20]))
+
+    assert index.base_period == 1.
+    assert list(index.duplicates) == [3, 7]
+    assert list(index.gaps) == [5, 9]
+    assert list(index.session_starts) == [0, 5, 9]
+    assert list(index.session_of(np.arange(10))) \
+        == [0, 0, 0, 0, 0, 1, 1, 1, 1, 2]
+
+
+def test_index_of_regular_bars_has_no_irregular_bar():
+    index = build_index(_columns(np.arange(100) * 60.))
+
+    assert index.base_period == 60.
+    assert not len(index.duplicates)
+    assert not len(index.gaps)
+    assert list(index.session_starts) == [0]
+
+
+@pytest.mark.parametrize('time_, message', [
+    ([0, 1, 3, 2, 4], 'row 3'),
+    ([0, 1, np.nan, 3], 'missing or infinite'),
+])
+def test_invalid_time_is_rejected(time_, message):
+    with pytest.raises(ValueError, match=message):
+        build_index(_columns(time_))
+
+
+def test_backward_time_is_rejected_by_every_feeder(tmp_path, price_csv,
+                                                   product_config):
+    lines = open(price_csv).read().splitlines()
+    # swap two bars in the middle of the data
+    lines[101], lines[150] = lines[150], lines[101]
+    open(price_csv, 'w').write('\n'.join(lines) + '\n')
+
+    for options in [dict(), dict(memmap=True), dict(chunk_size=16)]:
+        with pytest.raises(ValueError, match='ascending order'):
+            trader = create_trader(price_csv, product_config,
+                                   cache_dir=str(tmp_path / 'cache'),
+                                   **options)
+            trader.start()
+
+
+def test_index_is_stored_with_the_cached_columns(tmp_path, price_csv):
+    cache = PriceDataCache(tmp_path / 'cache')
+    columns = [cache.load(price_csv, pd.read_csv)[c]
+               for c in ['Open', 'High', 'Low', 'Close', 'Vol', 'Time']]
+    index = load_index(columns, price_csv, cache)
+
+    # the stored arrays are loaded without building the index again
+    reloaded = load_index(_columns([0, 0, 0]), price_csv, cache)
+    assert reloaded.base_period == index.base_period == 1.
+    assert not len(reloaded.duplicates)
+
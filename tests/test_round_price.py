@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from tmtrader.usecase.round_price import decimal2ticks, round2fraction, \
+    round2ticks, ticks2decimal
+
+
+def _prices(min_frac: int, n_float_digits: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    scale = 10 ** n_float_digits
+    random = rng.uniform(0.01, 10_000, 20_000)
+    # the boundaries between ticks and their neighbouring floats
+    halves = (np.arange(1, 2_000) * min_frac + min_frac / 2) / scale
+    near = np.concatenate([np.nextafter(halves, 0), halves,
+                           np.nextafter(halves, np.inf)])
+    return np.concatenate([random, near, [0.0001, 4000.125, 4000.375]])
+
+
+@pytest.mark.parametrize('min_frac, n_float_digits',
+                         [(25, 2), (1, 2), (5, 1), (1, 0), (10, 3)])
+def test_round2ticks_is_round2fraction_of_the_exact_value(min_frac,
+                                                          n_float_digits):
+    x = _prices(min_frac, n_float_digits)
+    ticks = round2ticks(x, Decimal(min_frac), n_float_digits)
+
+    assert ticks.dtype == np.int64
+    for value, n_ticks in zip(x, ticks):
+        expected = round2fraction(Decimal(float(value)), Decimal(min_frac),
+                                  n_float_digits)
+        assert ticks2decimal(n_ticks, Decimal(min_frac),
+                             n_float_digits) == expected, value
+        assert decimal2ticks(Decimal(float(value)), Decimal(min_frac),
+                             n_float_digits) == n_ticks, value
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.entry_buy_random import EntryBuyRandom
+from strategies.exit_sell_in_n_bars import ExitSellInNBars
+from tmtrader.trader import create_trader
+from tmtrader.usecase.strategy import Schedule, Strategy
+
+
+class _Depth(Strategy):
+    """records the number of bars it receives and reads deeper history"""
+
+    def __init__(self, lookback, n_history):
+        self.lookback = lookback
+        self.__n_history = n_history
+        self.times = []
+        self.depths = set()
+        self.history = None
+
+    def execute(self, d, p):
+        self.times.append(float(d.time[0]))
+        self.depths.add(len(d.close))
+        if self.history is None and d.time[0] >= self.__n_history:
+            self.history = [float(c)
+                            for c in d.history(self.__n_history).close]
+
+
+def test_strategies_receive_the_depth_they_declare(price_csv,
+                                                   product_config):
+    shallow = _Depth(3, 40)
+    deep = _Depth(20, 40)
+    trader = create_trader(price_csv, product_config)
+    trader.add_strategy([shallow, deep])
+    trader.start()
+
+    close = pd.read_csv(price_csv)['Close'].to_numpy()
+    # the feed starts once the deepest lookback is available
+    assert shallow.times[0] == deep.times[0] == 19.
+    assert shallow.depths == {3}
+    assert deep.depths == {20}
+    assert shallow.history == list(close[40:0:-1])
+
+
+SCHEDULES = [
+    Schedule(every_n_bars=3),
+    Schedule(session_times=frozenset([0., 7.]), session_period=10.),
+    Schedule(timeframe=5.),
+    Schedule(every_n_bars=2, timeframe=4.),
+]
+
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+def test_next_due_row_is_the_next_row_where_a_schedule_is_due(schedule):
+    # bars with a gap and a duplicate time
+    time_ = np.concatenate([np.arange(30.), np.arange(42., 60.), [60.]])
+    is_due = [schedule.is_due(row, time_[row],
+                              time_[row - 1] if row else None)
+              for row in range(len(time_))]
+
+    for row in range(len(time_)):
+        due_rows = [r for r in range(row + 1, len(time_)) if is_due[r]]
+        assert schedule.next_due_row(row + 1, row, time_) \
+            == (due_rows[0] if due_rows else len(time_))
+
+
+class _Scheduled(Strategy):
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.times = []
+
+    def execute(self, d, p):
+        self.times.append(float(d.time[0]))
+
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+def test_strategies_run_only_on_the_bars_they_are_due(price_csv,
+                                                      product_config,
+                                                      schedule):
+    scheduled = _Scheduled(schedule)
+    trader = create_trader(price_csv, product_config)
+    trader.add_strategy(scheduled)
+    trader.start()
+
+    time_ = pd.read_csv(price_csv)['Time'].to_numpy()
+    assert scheduled.times == [
+        float(time_[row]) for row in range(len(time_))
+        if schedule.is_due(row, time_[row], time_[row - 1] if row else None)]
+
+
+def test_strategies_run_only_in_their_position_state(price_csv,
+                                                     product_config):
+    when_flat = _Scheduled(Schedule(when_in_position=False))
+    when_in_position = _Scheduled(Schedule(when_flat=False))
+    trader = create_trader(price_csv, product_config)
+    trader.add_strategy([when_flat, when_in_position, EntryBuyRandom(0.5),
+                         ExitSellInNBars(3)])
+    trader.start()
+
+    assert when_flat.times and when_in_position.times
+    assert not set(when_flat.times) & set(when_in_position.times)
+    assert len(when_flat.times) + len(when_in_position.times) \
+        == len(pd.read_csv(price_csv))
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.exit_sell_in_n_bars import ExitSellInNBars
+from strategies.exit_sell_with_target_profit import ExitSellWithTargetProfit
+from tmtrader.entity.order import BuyMarketOrder, SellMarketOrder
+from tmtrader.trader import create_trader, create_vector_trader
+from tmtrader.usecase.strategy import Strategy
+from tmtrader.usecase.vector_strategy import Signals, VectorStrategy
+
+
+class _EnterOn(Strategy):
+    """enters with a market order filled on the bar of the signal"""
+
+    def __init__(self, times):
+        self.__times = set(times)
+
+    def execute(self, d, p):
+        if d.time[0] in self.__times and not p.has_positions():
+            return BuyMarketOrder(d.time[0], 0, 1, 0)
+
+
+class _ExitOn(Strategy):
+    def __init__(self, times):
+        self.__times = set(times)
+
+    def execute(self, d, p):
+        if d.time[0] in self.__times and p.has_positions():
+            return SellMarketOrder(d.time[0], 0, 1, 0)
+
+
+class _Signals(VectorStrategy):
+    def __init__(self, signals: Signals):
+        self.__signals = signals
+
+    def signals(self, columns):
+        return self.__signals
+
+
+def _signal_times(price_csv, every, offset=0):
+    time_ = pd.read_csv(price_csv)['Time'].to_numpy()
+    return time_, time_[offset::every]
+
+
+@pytest.mark.parametrize('rules, exit_strategy', [
+    (dict(exit_in_n_bars=4), ExitSellInNBars(4)),
+    (dict(target_profit=3.), ExitSellWithTargetProfit(3.)),
+    (dict(), None),
+])
+def test_vector_trader_trades_like_the_event_pipeline(price_csv,
+                                                      product_config, rules,
+                                                      exit_strategy):
+    time_, entry_times = _signal_times(price_csv, 3)
+    _, exit_times = _signal_times(price_csv, 11, 5)
+
+    trader = create_trader(price_csv, product_config)
+    strategies = [_EnterOn(entry_times), _ExitOn(exit_times)]
+    if exit_strategy is not None:
+        strategies.append(exit_strategy)
+    trader.add_strategy(strategies)
+    trader.start()
+
+    vector = create_vector_trader(price_csv, product_config)
+    vector.set_strategy(_Signals(Signals(np.isin(time_, entry_times),
+                                         np.isin(time_, exit_times),
+                                         **rules)))
+    vector.start()
+
+    assert len(trader.trade_history()) > 10
+    assert vector.trade_history() == trader.trade_history()
@@ -1,5 +1,9 @@
+from decimal import Decimal
 from typing import Iterable, Union
 
 from nptyping import NDArray
 
 ArrayLike = Union[NDArray, Iterable]
+
+# Decimal, or int tick counts when the engine runs with tick prices
+Price = Union[Decimal, int]
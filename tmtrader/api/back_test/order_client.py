@@ -1,81 +1,146 @@
 from decimal import Decimal
+from itertools import count
 from logging import getLogger
 from typing import List, Optional
 
+from tmtrader._typing import Price
 from tmtrader.controller.order_controller import OrderClient
 from tmtrader.entity.order import BasicOrder, OrderType, OrderCondition, \
-    BuyLimitOrder, BuyMarketOrder, BuyStopOrder, \
-    SellLimitOrder, SellMarketOrder, SellStopOrder, OrderStatus
+    Bracket, BuyLimitOrder, BuyMarketOrder, BuyStopOrder, \
+    OrderReplacement, SellLimitOrder, SellMarketOrder, SellStopOrder, \
+    OrderStatus, GTC, TimeInForce, WithPrice
 from tmtrader.exchange_for_backtest.back_test_broker import BackTestBroker
+from tmtrader.usecase.round_price import RoundPrice
 from tmtrader.usecase.send_order import OrderSender
-from tmtrader.usecase.time_ref import TimeRef, DefaultTimeRef
+from tmtrader.usecase.time_ref import SimulatedTimeRef, TimeRef
 
 logger = getLogger(__name__)
 
 
 class BackTestOrderClient(OrderClient):
-    def __init__(self, time_ref: Optional[TimeRef] = None):
+    def __init__(self, time_ref: Optional[TimeRef] = None,
+                 rounder: Optional[RoundPrice] = None):
+        """
+        :param rounder: if given, the prices of orders are converted to int
+            tick counts (rounded to the nearest tick) before they are sent.
+            Otherwise they are converted to Decimal.
+        """
         super().__init__()
         self.orders: List[BasicOrder] = list()
         if time_ref is None:
-            time_ref = DefaultTimeRef()
+            time_ref = SimulatedTimeRef()
         self.__time_ref = time_ref
+        self.__rounder = rounder
+        self.__ids = count(1)
+
+    def send(self, order: BasicOrder) -> int:
+        if isinstance(order, WithPrice):
+            order.set_price(self.__price(order.price))
+        if order.bracket is not None:
+            order.attach_bracket(self.__bracket(order.bracket))
+        return self.__send(order)
 
     def buy_limit(self, product_id: int, price: Decimal, n_shares: int,
-                  nth_bar: int):
+                  nth_bar: int, bracket: Optional[Bracket] = None,
+                  time_in_force: TimeInForce = GTC) -> int:
         if price is None:
             raise AttributeError(f'`price` must not be None in limit order.')
-        self._notify_new_orders(
-            [BuyLimitOrder(self.__time_ref.now(), product_id, n_shares, price,
-                           nth_bar)])
+        return self.__send(
+            BuyLimitOrder(self.__time_ref.now(), product_id, n_shares,
+                          self.__price(price), nth_bar).attach_bracket(
+                self.__bracket(bracket)).set_time_in_force(time_in_force))
         # logger.debug(
         #     f'called buy_limit with product_id:{product_id}, price:{price}, '
         #     f'n_shares:{n_shares}')
 
-    def buy_market(self, product_id: int, n_shares: int, nth_bar: int):
-        self._notify_new_orders(
-            [BuyMarketOrder(self.__time_ref.now(), product_id, n_shares,
-                            nth_bar)])
+    def buy_market(self, product_id: int, n_shares: int, nth_bar: int,
+                   bracket: Optional[Bracket] = None,
+                   time_in_force: TimeInForce = GTC) -> int:
+        return self.__send(
+            BuyMarketOrder(self.__time_ref.now(), product_id, n_shares,
+                           nth_bar).attach_bracket(
+                self.__bracket(bracket)).set_time_in_force(time_in_force))
         # logger.debug(
         #     f'called buy_market with product_id:{product_id}, n_shares:'
         #     f'{n_shares}')
 
     def buy_stop(self, product_id: int, price: Decimal, n_shares: int,
-                 nth_bar: int):
+                 nth_bar: int, bracket: Optional[Bracket] = None,
+                 time_in_force: TimeInForce = GTC) -> int:
         if price is None:
             raise AttributeError(f'`price` must not be None in stop order.')
-        self._notify_new_orders(
-            [BuyStopOrder(self.__time_ref.now(), product_id, n_shares, price,
-                          nth_bar)])
+        return self.__send(
+            BuyStopOrder(self.__time_ref.now(), product_id, n_shares,
+                         self.__price(price), nth_bar).attach_bracket(
+                self.__bracket(bracket)).set_time_in_force(time_in_force))
         # logger.debug(
         #     f'called buy_stop with product_id:{product_id}, price:{price}, '
         #     f'n_shares:{n_shares}')
 
     def sell_limit(self, product_id: int, price: Decimal, n_shares: int,
-                   nth_bar: int):
+                   nth_bar: int, bracket: Optional[Bracket] = None,
+                   time_in_force: TimeInForce = GTC) -> int:
         if price is None:
             raise AttributeError(f'`price` must not be None in limit order.')
-        self._notify_new_orders(
-            [SellLimitOrder(self.__time_ref.now(), product_id, n_shares, price,
-                            nth_bar)])
+        return self.__send(
+            SellLimitOrder(self.__time_ref.now(), product_id, n_shares,
+                           self.__price(price), nth_bar).attach_bracket(
+                self.__bracket(bracket)).set_time_in_force(time_in_force))
         # logger.debug(
         #     f'called sell_limit with product_id:{product_id}, price:{price}, '
         #     f'n_shares:{n_shares}')
 
-    def sell_market(self, product_id: int, n_shares: int, nth_bar: int):
-        self._notify_new_orders(
-            [SellMarketOrder(self.__time_ref.now(), product_id, n_shares,
-                             nth_bar)])
+    def sell_market(self, product_id: int, n_shares: int, nth_bar: int,
+                    bracket: Optional[Bracket] = None,
+                    time_in_force: TimeInForce = GTC) -> int:
+        return self.__send(
+            SellMarketOrder(self.__time_ref.now(), product_id, n_shares,
+                            nth_bar).attach_bracket(
+                self.__bracket(bracket)).set_time_in_force(time_in_force))
         # logger.debug(
         #     f'called sell_market with product_id:{product_id}, n_shares:'
         #     f'{n_shares}')
 
     def sell_stop(self, product_id: int, price: Decimal, n_shares: int,
-                  nth_bar: int):
+                  nth_bar: int, bracket: Optional[Bracket] = None,
+                  time_in_force: TimeInForce = GTC) -> int:
         if price is None:
             raise AttributeError(f'`price` must not be None in stop order.')
-        self._notify_new_orders(
-            [SellStopOrder(self.__time_ref.now(), product_id, n_shares, price,
-                           nth_bar)])
+        return self.__send(
+            SellStopOrder(self.__time_ref.now(), product_id, n_shares,
+                          self.__price(price), nth_bar).attach_bracket(
+                self.__bracket(bracket)).set_time_in_force(time_in_force))
         # logger.debug(
         #     f'called sell_stop with product_id:{product_id}, price:{price}, n_shares:{n_shares}')
+
+    def cancel(self, order_id: int):
+        self._deliver(self._notify_cancel_orders, [order_id])
+
+    def replace(self, order_id: int, price: Optional[Decimal] = None,
+                n_shares: Optional[int] = None) -> int:
+        new_order_id = next(self.__ids)
+        self._deliver(self._notify_replace_orders, [OrderReplacement(
+            order_id, new_order_id,
+            None if price is None else self.__price(price), n_shares)])
+        return new_order_id
+
+    def __send(self, order: BasicOrder) -> int:
+        order.assign_id(next(self.__ids))
+        self._send_orders([order])
+        return order.order_id
+
+    def __price(self, price: Decimal) -> Price:
+        if self.__rounder is None:
+            # a float like 10.0 is taken as the decimal it is written as
+            return price if isinstance(price, Decimal) \
+                else Decimal(str(price))
+        return self.__rounder.decimal2ticks(price)
+
+    def __bracket(self, bracket: Optional[Bracket]) -> Optional[Bracket]:
+        if bracket is None:
+            return bracket
+        return bracket._replace(
+            target_profit=None if bracket.target_profit is None
+            else self.__price(bracket.target_profit),
+            stop_loss=None if bracket.stop_loss is None
+            else self.__price(bracket.stop_loss))
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from tmtrader.controller.order_history_controller import OrderManagerClient
 from tmtrader.entity.order import BasicOrder
@@ -13,6 +13,10 @@ class BTOrderManagerClient(OrderManagerClient):
     def list_open_orders(self) -> List[BasicOrder]:
         return self.__order_mng.open_orders
 
+    def count_open_orders(self, is_buy: bool,
+                          product_id: Optional[int] = None) -> int:
+        return self.__order_mng.count_open_orders(is_buy, product_id)
+
     def list_trade_history(self) -> List[Trade]:
         return self.__order_mng.trades
 
@@ -3,16 +3,37 @@ from typing import Dict, Optional
 
 from tmtrader.entity.position import PositionsRef
 from tmtrader.exchange_for_backtest.position_manager import PositionManager
+from tmtrader.usecase.round_price import RoundPrice
 
 logger = getLogger(__name__)
 
 
 class PositionClient:
-    def __init__(self, position_mng: PositionManager):
+    def __init__(self, position_mng: PositionManager,
+                 rounder: Optional[RoundPrice] = None):
+        """
+        :param rounder: if given, the filled prices of the positions are
+            int tick counts and converted to Decimal for the client
+        """
         self.__position_mng = position_mng
+        self.__rounder = rounder
 
     def get(self, product_id: int) -> Optional[PositionsRef]:
-        return self.__position_mng.current_positions_of(product_id)
+        ref = self.__position_mng.current_positions_of(product_id)
+        if ref is None:
+            return None
+        return self.__to_decimal(ref)
 
     def list(self) -> Dict[int, PositionsRef]:
-        return self.__position_mng.current_positions()
+        refs = self.__position_mng.current_positions()
+        if self.__rounder is None:
+            return refs
+        return {k: self.__to_decimal(v) for k, v in refs.items()}
+
+    def __to_decimal(self, ref: PositionsRef) -> PositionsRef:
+        if self.__rounder is None:
+            return ref
+        to_decimal = self.__rounder.ticks2decimal
+        return ref._replace(positions=[
+            p._replace(filled_price=to_decimal(p.filled_price)) for p in
+            ref.positions])
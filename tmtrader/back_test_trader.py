@@ -2,6 +2,7 @@ from decimal import Decimal
 from functools import lru_cache
 from typing import List, Optional, Union
 
+from tmtrader._typing import Price
 from tmtrader.controller.account_data_controller import AccountDataController
 from tmtrader.controller.order_controller import OrderClient, OrderController
 from tmtrader.controller.order_history_controller import OrderHistoryController
@@ -13,7 +14,10 @@ from tmtrader.exchange_for_backtest.back_test_broker import BackTestBroker
 from tmtrader.exchange_for_backtest.new_order_receiver import NewOrderReceiver
 from tmtrader.exchange_for_backtest.price_stream import PriceStream
 from tmtrader.exchange_for_backtest.trade_manager import TradeManager
+from tmtrader.usecase.event_scheduler import EventScheduler
+from tmtrader.usecase.round_price import RoundPrice
 from tmtrader.usecase.strategy import Strategy
+from tmtrader.usecase.trade_statistics import TradeStatistics
 
 
 class BTClient:
@@ -39,18 +43,36 @@ class BTExchange:
                  price_stream: PriceStream,
                  trade_manager: TradeManager,
                  broker: BackTestBroker,
-                 order_receiver: NewOrderReceiver):
+                 order_receiver: NewOrderReceiver,
+                 scheduler: Optional[EventScheduler] = None):
         self.price_stream = price_stream
         self.trade_manager = trade_manager
         self.broker = broker
         self.order_receiver = order_receiver
-
-
-# TODO: optimize statistical calculations of trade results
-class BTTrader:
-    def __init__(self, cl: BTClient, ex: BTExchange):
+        self.scheduler = scheduler
+
+
+class BTTrader(TradeStatistics):
+    def __init__(self, cl: BTClient, ex: BTExchange,
+                 rounder: Optional[RoundPrice] = None,
+                 precompute_indicators: bool = False,
+                 jump_ahead: bool = False):
+        """
+        :param rounder: if given, the exchange runs with int tick prices and
+            the trades are converted to Decimal when they are reported
+        :param precompute_indicators: if True, the indicators of the
+            strategies are computed over the whole price data before feeding
+            when the price stream supports it, instead of bar by bar
+        :param jump_ahead: if True, the price stream skips the bars where no
+            strategy is scheduled and no open order can be filled. Every
+            indicator must be precomputed because skipped bars do not update
+            them.
+        """
         self.cl = cl
         self.ex = ex
+        self.__rounder = rounder
+        self.__precompute_indicators = precompute_indicators
+        self.__jump_ahead = jump_ahead
         self.__construct_client()
         self.__construct_exchange()
         self.__connect_client_to_exchange()
@@ -68,107 +90,58 @@ class BTTrader:
             self.cl.strategy_proc.remove(strategy)
 
     def start(self):
+        self.ex.price_stream.set_n_past_bars(self.cl.strategy_proc.lookback)
+        if self.__precompute_indicators:
+            indicators = self.cl.strategy_proc.indicators
+            for spec in self.ex.price_stream.precompute_indicators(
+                    indicators.specs):
+                indicators.unregister(spec)
+        self.cl.strategy_proc.indicators.warm_up(
+            self.ex.price_stream.bars_before_feed())
+        if self.__jump_ahead:
+            if self.cl.strategy_proc.indicators.len:
+                raise ValueError(
+                    f'`jump_ahead` requires every indicator to be '
+                    f'precomputed, but '
+                    f'{self.cl.strategy_proc.indicators.specs} are not.')
+            look_aheads = [self.ex.broker, self.cl.strategy_proc]
+            if self.ex.scheduler is not None:
+                look_aheads.append(self.ex.scheduler)
+            self.ex.price_stream.set_look_ahead(look_aheads)
         self.ex.price_stream.start_feed()
 
     @lru_cache
     def trade_history(self) -> List[Trade]:
-        return self.ex.trade_manager.trade_history
-
-    @lru_cache
-    def long_trades(self) -> List[Trade]:
-        return [t for t in self.trade_history() if t.is_long]
-
-    @lru_cache
-    def short_trades(self) -> List[Trade]:
-        return [t for t in self.trade_history() if not t.is_long]
-
-    @lru_cache
-    def winning_trades(self) -> List[Trade]:
-        return [t for t in self.trade_history() if t.pl > 0]
-
-    @lru_cache
-    def losing_trades(self) -> List[Trade]:
-        return [t for t in self.trade_history() if t.pl < 0]
-
-    @lru_cache
-    def long_winning_trades(self) -> List[Trade]:
-        return [t for t in self.long_trades() if t.pl > 0]
-
-    @lru_cache
-    def long_losing_trades(self) -> List[Trade]:
-        return [t for t in self.long_trades() if t.pl < 0]
-
-    @lru_cache
-    def short_winning_trades(self) -> List[Trade]:
-        return [t for t in self.short_trades() if t.pl > 0]
-
-    @lru_cache
-    def short_losing_trades(self) -> List[Trade]:
-        return [t for t in self.short_trades() if t.pl < 0]
-
-    @lru_cache
-    def pls(self) -> List[Decimal]:
-        return [t.pl for t in self.trade_history()]
-
-    @lru_cache
-    def total_profit(self) -> Decimal:
-        return sum([t.pl for t in self.winning_trades()])
-
-    @lru_cache
-    def total_loss(self) -> Decimal:
-        return sum([t.pl for t in self.losing_trades()])
-
-    @lru_cache
-    def total_pl(self) -> Decimal:
-        return self.total_profit() + self.total_loss()
-
-    @lru_cache
-    def n_wins(self) -> int:
-        return len(self.winning_trades())
-
-    @lru_cache
-    def n_losses(self) -> int:
-        return len(self.losing_trades())
-
-    @lru_cache
-    def n_evens(self) -> int:
-        return self.n_trades() - self.n_wins() - self.n_losses()
+        trades = self.ex.trade_manager.trade_history
+        if self.__rounder is None:
+            return trades
+        return [_to_decimal_trade(t, self.__rounder) for t in trades]
 
-    @lru_cache
-    def n_trades(self) -> int:
-        return len(self.trade_history())
-
-    @lru_cache
-    def percent_profitable(self) -> float:
-        return len(self.winning_trades()) / self.n_trades()
-
-    @lru_cache
-    def max_winning_trade(self) -> Optional[Trade]:
-        if self.n_wins():
-            return sorted(self.winning_trades(),
-                          key=lambda t: t.pl, reverse=True)[0]
-        else:
-            return None
+    def _raw_trades(self) -> List[Trade]:
+        return self.ex.trade_manager.trade_history
 
-    @lru_cache
-    def max_losing_trade(self) -> Optional[Trade]:
-        if self.n_wins():
-            return sorted(self.losing_trades(),
-                          key=lambda t: t.pl)[0]
-        else:
-            return None
+    def _sum_pl(self, pls: List[Price]) -> Decimal:
+        # tick counts are summed exactly as int and converted once
+        if self.__rounder is None:
+            return sum(pls)
+        return self.__rounder.ticks2decimal(sum(pls))
 
     def __construct_client(self):
         self.cl.strategy_proc.add_order_observer(self.cl.order_controller)
         self.cl.price_data_controller.add_price_observer(self.cl.strategy_proc)
 
     def __construct_exchange(self):
+        # open orders are matched against a new bar before the strategies
+        # see it
+        self.ex.price_stream.add_price_observer(self.ex.broker)
         self.ex.order_receiver.add_order_observer(self.ex.broker)
+        self.ex.order_receiver.add_order_change_observer(self.ex.broker)
         self.ex.broker.add_order_close_observer(self.ex.trade_manager)
 
     def __connect_client_to_exchange(self):
         self.ex.price_stream.add_price_observer(self.cl.price_data_controller)
         self.cl.order_client.add_order_observer(self.ex.order_receiver)
+        self.cl.order_client.add_order_change_observer(self.ex.order_receiver)
 
     def __destruct_client(self):
         self.cl.price_data_controller.remove_price_observer(
@@ -182,3 +155,12 @@ class BTTrader:
         self.ex.price_stream.remove_price_observer(
             self.cl.price_data_controller)
         self.cl.order_client.remove_order_observer(self.ex.broker)
+
+
+def _to_decimal_trade(trade: Trade, rounder: RoundPrice) -> Trade:
+    return trade._replace(
+        entry=trade.entry._replace(
+            price=rounder.ticks2decimal(trade.entry.price)),
+        exit=trade.exit._replace(
+            price=rounder.ticks2decimal(trade.exit.price)),
+        pl=rounder.ticks2decimal(trade.pl))
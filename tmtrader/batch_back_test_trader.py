@@ -0,0 +1,72 @@
+from typing import List
+
+from tmtrader.back_test_trader import BTTrader
+from tmtrader.entity.price import PriceSequence
+from tmtrader.exchange_for_backtest.price_stream import PriceStream
+from tmtrader.indicator.registry import IndicatorRegistry
+from tmtrader.usecase.price_feed import PriceObserver
+from tmtrader.usecase.strategy import DEFAULT_LOOKBACK
+
+
+class BatchBTTrader(PriceObserver):
+    """Traders run together in a single pass over the price data.
+
+    Every trader keeps its own strategies, positions, orders and trades,
+    while the price stream, its window and the indicators are shared, so
+    that reading the data and updating the indicators are done once per bar
+    instead of once per trader. A strategy instance must not be added to
+    several traders, because its state would leak between them.
+    """
+
+    def __init__(self, price_stream: PriceStream,
+                 indicators: IndicatorRegistry,
+                 precompute_indicators: bool = False):
+        """
+        :param indicators: registry shared by the strategy processors of the
+            traders
+        :param precompute_indicators: see `BTTrader`
+        """
+        self.__price_stream = price_stream
+        self.__indicators = indicators
+        self.__precompute_indicators = precompute_indicators
+        self.__traders: List[BTTrader] = list()
+        # notified before the traders so that they see the updated values
+        price_stream.add_price_observer(self)
+
+    @property
+    def traders(self) -> List[BTTrader]:
+        return self.__traders
+
+    def add_trader(self, trader: BTTrader):
+        """
+        :param trader: trader built on the price stream and the indicators
+            of this batch
+        """
+        self.__traders.append(trader)
+
+    def start(self):
+        _validate_not_shared(self.__traders)
+        self.__price_stream.set_n_past_bars(
+            max([t.cl.strategy_proc.lookback for t in self.__traders],
+                default=DEFAULT_LOOKBACK))
+        if self.__precompute_indicators:
+            for spec in self.__price_stream.precompute_indicators(
+                    self.__indicators.specs):
+                self.__indicators.unregister(spec)
+        self.__indicators.warm_up(self.__price_stream.bars_before_feed())
+        self.__price_stream.start_feed()
+
+    def notify_price_update(self, price_ref: PriceSequence):
+        if self.__indicators.len:
+            self.__indicators.update(price_ref)
+
+
+def _validate_not_shared(traders: List[BTTrader]):
+    seen = set()
+    for trader in traders:
+        for strategy in trader.cl.strategy_proc.strategies:
+            if id(strategy) in seen:
+                raise ValueError(
+                    f'strategy `{strategy}` is added to several traders. '
+                    f'Create a new instance for each trader.')
+            seen.add(id(strategy))
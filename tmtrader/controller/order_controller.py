@@ -1,44 +1,152 @@
 from abc import abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
 from decimal import Decimal
 from logging import getLogger
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 
-from tmtrader.entity.order import BasicOrder, BuyLimitOrder, BuyMarketOrder, \
-    BuyOrder, BuyStopOrder, SellLimitOrder, \
-    SellMarketOrder, SellOrder, SellStopOrder
+from tmtrader.entity.order import GTC, BasicOrder, Bracket, TimeInForce
 from tmtrader.exchange_for_backtest.usecase.order_spec import OrderSpec
+from tmtrader.usecase.event_scheduler import EventScheduler
 from tmtrader.usecase.send_order import OrderObserver, OrderSender
 
 logger = getLogger(__name__)
 
 
 class OrderClient(OrderSender):
+    def __init__(self):
+        super().__init__()
+        self.__batch: Optional[List[BasicOrder]] = None
+        self.__scheduler: Optional[EventScheduler] = None
+        self.__latency = 0.
+        # (product id, is buy) -> the number of orders sent but not yet
+        # delivered to the exchange
+        self.__n_in_transit: Dict[Tuple[int, bool], int] = defaultdict(int)
+
+    def set_event_scheduler(self, scheduler: EventScheduler,
+                            latency: float = 0.):
+        """Delivers orders, cancellations and replacements to the exchange
+        as events of `scheduler`, `latency` after they are sent, instead of
+        calling the exchange from the strategies.
+
+        :param latency: in the unit of the `Time` column
+        """
+        if latency < 0:
+            raise ValueError(
+                f'latency must be non-negative, but got {latency}.')
+        self.__scheduler = scheduler
+        self.__latency = latency
+
+    def count_orders_in_transit(self, is_buy: bool,
+                                product_id: Optional[int] = None) -> int:
+        """Counts the orders sent but not yet delivered to the exchange,
+        which the exchange does not know as open orders yet.
+
+        :param product_id: if None, the orders of all products are counted
+        """
+        if product_id is not None:
+            return self.__n_in_transit[(product_id, is_buy)]
+        return sum([n for (_, b), n in self.__n_in_transit.items()
+                    if b == is_buy])
+
+    @contextmanager
+    def batch(self):
+        """Sends the orders placed in this context to the exchange in one
+        notification when the context exits, instead of one notification
+        per order."""
+        if self.__batch is not None:
+            raise RuntimeError('batches of orders cannot be nested.')
+        self.__batch = list()
+        try:
+            yield
+            orders = self.__batch
+        finally:
+            self.__batch = None
+        if orders:
+            self.__deliver_orders(orders)
+
+    def _send_orders(self, orders: List[BasicOrder]):
+        if self.__batch is not None:
+            self.__batch.extend(orders)
+        else:
+            self.__deliver_orders(orders)
+
+    def _deliver(self, notify: Callable[[list], None], items: list):
+        if self.__scheduler is None:
+            notify(items)
+        else:
+            self.__scheduler.schedule_after(self.__latency, notify, items)
+
+    def __deliver_orders(self, orders: List[BasicOrder]):
+        if self.__scheduler is not None:
+            self.__count_in_transit(orders, 1)
+        self._deliver(self.__arrive, orders)
+
+    def __arrive(self, orders: List[BasicOrder]):
+        if self.__scheduler is not None:
+            self.__count_in_transit(orders, -1)
+        self._notify_new_orders(orders)
+
+    def __count_in_transit(self, orders: List[BasicOrder], n: int):
+        for o in orders:
+            self.__n_in_transit[(o.product_id, o.is_buy)] += n
+
+    @abstractmethod
+    def send(self, order: BasicOrder) -> int:
+        """Sends an order built by a strategy as it is, after converting its
+        prices like the other methods do.
+
+        :return: the id assigned to the order
+        """
+        pass
+
     @abstractmethod
     def buy_limit(self, product_id: int, price: Decimal, n_shares: int,
-                  nth_bar: int):
+                  nth_bar: int, bracket: Optional[Bracket] = None,
+                  time_in_force: TimeInForce = GTC) -> int:
         pass
 
     @abstractmethod
-    def buy_market(self, product_id: int, n_shares: int, nth_bar: int):
+    def buy_market(self, product_id: int, n_shares: int, nth_bar: int,
+                   bracket: Optional[Bracket] = None,
+                   time_in_force: TimeInForce = GTC) -> int:
         pass
 
     @abstractmethod
     def buy_stop(self, product_id: int, price: Decimal, n_shares: int,
-                 nth_bar: int):
+                 nth_bar: int, bracket: Optional[Bracket] = None,
+                 time_in_force: TimeInForce = GTC) -> int:
         pass
 
     @abstractmethod
     def sell_limit(self, product_id: int, price: Decimal, n_shares: int,
-                   nth_bar: int):
+                   nth_bar: int, bracket: Optional[Bracket] = None,
+                   time_in_force: TimeInForce = GTC) -> int:
         pass
 
     @abstractmethod
-    def sell_market(self, product_id: int, n_shares: int, nth_bar: int):
+    def sell_market(self, product_id: int, n_shares: int, nth_bar: int,
+                    bracket: Optional[Bracket] = None,
+                    time_in_force: TimeInForce = GTC) -> int:
         pass
 
     @abstractmethod
     def sell_stop(self, product_id: int, price: Decimal, n_shares: int,
-                  nth_bar: int):
+                  nth_bar: int, bracket: Optional[Bracket] = None,
+                  time_in_force: TimeInForce = GTC) -> int:
+        pass
+
+    @abstractmethod
+    def cancel(self, order_id: int):
+        pass
+
+    @abstractmethod
+    def replace(self, order_id: int, price: Optional[Decimal] = None,
+                n_shares: Optional[int] = None) -> int:
+        """Replaces an open limit or stop order.
+
+        :return: the id of the new order
+        """
         pass
 
 
@@ -56,35 +164,9 @@ class DefaultOrderController(OrderController):
         self._handle_orders(allowed_orders)
 
     def _handle_orders(self, orders: List[BasicOrder]):
-        [self._handle_order(o) for o in orders]
+        with self.__order_client.batch():
+            [self._handle_order(o) for o in orders]
 
     def _handle_order(self, order: BasicOrder):
-        if isinstance(order, BuyOrder):
-            self._buy(order)
-        elif isinstance(order, SellOrder):
-            self._sell(order)
-        else:
-            raise RuntimeError(
-                f'Got unexpected order type `{type(order)}`: {order}')
-
-    def _buy(self, order: BuyOrder):
-        if isinstance(order, BuyLimitOrder):
-            self.__order_client.buy_limit(order.product_id, order.price,
-                                          order.n_shares, order.nth_bar)
-        elif isinstance(order, BuyMarketOrder):
-            self.__order_client.buy_market(order.product_id, order.n_shares,
-                                           order.nth_bar)
-        elif isinstance(order, BuyStopOrder):
-            self.__order_client.buy_stop(order.product_id, order.price,
-                                         order.n_shares, order.nth_bar)
-
-    def _sell(self, order: SellOrder):
-        if isinstance(order, SellLimitOrder):
-            self.__order_client.sell_limit(order.product_id, order.price,
-                                           order.n_shares, order.nth_bar)
-        elif isinstance(order, SellMarketOrder):
-            self.__order_client.sell_market(order.product_id, order.n_shares,
-                                            order.nth_bar)
-        elif isinstance(order, SellStopOrder):
-            self.__order_client.sell_stop(order.product_id, order.price,
-                                          order.n_shares, order.nth_bar)
+        self.__order_client.send(order)
+
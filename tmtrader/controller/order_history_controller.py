@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
+from tmtrader.controller.order_controller import OrderClient
 from tmtrader.entity.order import BasicOrder
 from tmtrader.entity.trade import Trade
 
@@ -10,6 +11,11 @@ class OrderManagerClient(ABC):
     def list_open_orders(self) -> List[BasicOrder]:
         pass
 
+    @abstractmethod
+    def count_open_orders(self, is_buy: bool,
+                          product_id: Optional[int] = None) -> int:
+        pass
+
     @abstractmethod
     def list_trade_history(self) -> List[Trade]:
         pass
@@ -28,10 +34,36 @@ class OrderHistoryController(ABC):
     def list_open_orders(self) -> List[BasicOrder]:
         pass
 
+    @abstractmethod
+    def count_open_orders(self, is_buy: bool,
+                          product_id: Optional[int] = None) -> int:
+        """Counts the open orders, including the ones sent but not yet
+        delivered to the exchange.
+
+        :param product_id: if None, the open orders of all products are
+            counted
+        """
+        pass
+
 
 class BTOrderHistoryController(OrderHistoryController):
-    def __init__(self, order_mng_client: OrderManagerClient):
+    def __init__(self, order_mng_client: OrderManagerClient,
+                 order_client: Optional[OrderClient] = None):
+        """
+        :param order_client: the client sending the orders, which knows the
+            orders in transit to the exchange
+        """
         self.__order_mng_client = order_mng_client
+        self.__order_client = order_client
 
     def list_open_orders(self) -> List[BasicOrder]:
         return self.__order_mng_client.list_open_orders()
+
+    def count_open_orders(self, is_buy: bool,
+                          product_id: Optional[int] = None) -> int:
+        n_orders = self.__order_mng_client.count_open_orders(is_buy,
+                                                             product_id)
+        if self.__order_client is not None:
+            n_orders += self.__order_client.count_orders_in_transit(
+                is_buy, product_id)
+        return n_orders
@@ -1,35 +1,163 @@
 from logging import getLogger
+from typing import Dict, List, Optional
 
+from tmtrader._typing import ArrayLike
 from tmtrader.controller.position_data_controller import PositionDataController
 from tmtrader.entity.price import PriceSequence
+from tmtrader.indicator.registry import IndicatorPriceSequence, \
+    IndicatorRegistry
+from tmtrader.usecase.look_ahead import LookAhead, LookAheadData
 from tmtrader.usecase.price_feed import PriceObserver
 from tmtrader.usecase.send_order import OrderSender
-from tmtrader.usecase.strategy import BaseStrategy, Strategy
+from tmtrader.usecase.strategy import DEFAULT_LOOKBACK, BaseStrategy, \
+    PRODUCT1, Schedule, Strategy
 
 logger = getLogger(__name__)
 
 
-class StrategyProcessor(PriceObserver, OrderSender):
-    def __init__(self, position_data: PositionDataController):
+class StrategyProcessor(PriceObserver, OrderSender, LookAhead):
+    def __init__(self, position_data: PositionDataController,
+                 indicators: Optional[IndicatorRegistry] = None):
+        """
+        :param indicators: registry shared with other processors. Its owner
+            updates it once per bar before the processors are notified.
+        """
         super().__init__()
         self.__strategies = list()
         self.__position_data = position_data
+        self.__updates_indicators = indicators is None
+        if indicators is None:
+            indicators = IndicatorRegistry()
+        self.__indicators = indicators
+        self.__seq = IndicatorPriceSequence(None, self.__indicators)
+        self.__schedules = _ScheduleIndex()
 
     def add(self, strategy: Strategy):
+        _validate_schedule(strategy.schedule)
         self.__strategies.append(strategy)
+        self.__schedules.rebuild(self.__strategies)
+        for spec in strategy.indicators:
+            self.__indicators.register(spec, strategy.lookback)
 
     def remove(self, strategy: Strategy):
         self.__strategies.remove(strategy)
+        self.__schedules.rebuild(self.__strategies)
+        for spec in strategy.indicators:
+            self.__indicators.release(spec)
+
+    @property
+    def strategies(self) -> List[Strategy]:
+        return list(self.__strategies)
+
+    @property
+    def lookback(self) -> int:
+        """the number of past bars required by the registered strategies"""
+        return max([s.lookback for s in self.__strategies],
+                   default=DEFAULT_LOOKBACK)
+
+    @property
+    def indicators(self) -> IndicatorRegistry:
+        return self.__indicators
 
     def notify_price_update(self, price_ref: PriceSequence):
+        if self.__indicators.len:
+            if self.__updates_indicators:
+                self.__indicators.update(price_ref)
+            self.__seq._set_base(price_ref)
+            price_ref = self.__seq
         self.__run(price_ref)
 
+    def next_active_row(self, row: int, data: LookAheadData) -> int:
+        positions = self.__position_data.get_ref().positions
+        has_positions = PRODUCT1 in positions \
+            and positions[PRODUCT1].has_positions()
+        return self.__schedules.next_due_row(has_positions, row, data.time)
+
+    def skip(self, n_bars: int):
+        self.__schedules.skip(n_bars)
+
     def __run(self, price_ref: PriceSequence):
         logger.debug(f'open: {price_ref.open[0]}, high: {price_ref.high[0]}, '
                      f'low: {price_ref.low[0]}, '
                      f'close: {price_ref.close[0]}, time: {price_ref.time[0]}')
         base = BaseStrategy(price_ref, self.__position_data.get_ref())
-        may_orders = [base.execute(s) for s in self.__strategies]
+        strategies = self.__schedules.due(base.has_positions,
+                                          price_ref.time[0])
+        may_orders = [base.execute(s) for s in strategies]
         # may_ordersは空リストかもしれないし、各要素がNoneかもしれない
         orders = [o for o in may_orders if o]
-        self._notify_new_orders(orders)
+        if orders:
+            self._notify_new_orders(orders)
+
+
+class _ScheduleIndex:
+    """Strategies indexed by the position state they run in, so that only
+    the strategies due on a bar are called. The order of registration is
+    kept because it decides which orders are accepted."""
+
+    def __init__(self):
+        # strategies running on every bar in the position state, or None
+        # if some of them have other conditions
+        self.__every_bar: Dict[bool, Optional[List[Strategy]]] = {
+            False: [], True: []}
+        self.__runs: Dict[bool, List[Strategy]] = {False: [], True: []}
+        self.__n_bars = 0
+        self.__last_time: Optional[float] = None
+
+    def rebuild(self, strategies: List[Strategy]):
+        for has_positions in [False, True]:
+            runs = [s for s in strategies if
+                    (s.schedule.when_in_position if has_positions
+                     else s.schedule.when_flat)]
+            self.__runs[has_positions] = runs
+            self.__every_bar[has_positions] = \
+                runs if all(s.schedule.every_bar for s in runs) else None
+
+    def due(self, has_positions: bool, time_: float) -> List[Strategy]:
+        """Returns the strategies to run on the bar of `time_`. It must be
+        called once per bar."""
+        strategies = self.__every_bar[has_positions]
+        if strategies is None:
+            # each distinct schedule is evaluated once
+            is_due = dict()
+            strategies = []
+            for s in self.__runs[has_positions]:
+                schedule = s.schedule
+                if schedule.every_bar:
+                    strategies.append(s)
+                    continue
+                due = is_due.get(schedule)
+                if due is None:
+                    due = schedule.is_due(self.__n_bars, time_,
+                                          self.__last_time)
+                    is_due[schedule] = due
+                if due:
+                    strategies.append(s)
+        self.__n_bars += 1
+        self.__last_time = time_
+        return strategies
+
+    def next_due_row(self, has_positions: bool, row: int,
+                     time_: ArrayLike) -> int:
+        """Returns the first row after `row` where a strategy is due if the
+        position state does not change, or `len(time_)`."""
+        runs = self.__runs[has_positions]
+        if any(s.schedule.every_bar for s in runs):
+            return row + 1
+        schedules = {s.schedule for s in runs}
+        return min([s.next_due_row(self.__n_bars, row, time_)
+                    for s in schedules], default=len(time_))
+
+    def skip(self, n_bars: int):
+        self.__n_bars += n_bars
+
+
+def _validate_schedule(schedule: Schedule):
+    if schedule.every_n_bars < 1:
+        raise ValueError(
+            f'every_n_bars must be a value of positive int larger or equal '
+            f'to 1, but got {schedule.every_n_bars}.')
+    for name in ['session_period', 'timeframe']:
+        value = getattr(schedule, name)
+        if value is not None and value <= 0:
+            raise ValueError(f'{name} must be positive, but got {value}.')
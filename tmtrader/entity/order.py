@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from decimal import Decimal
 from enum import Enum, auto
-from typing import List, NamedTuple
+from typing import List, NamedTuple, Optional
+
+from tmtrader._typing import Price
 
 
 class OrderType(Enum):
@@ -26,8 +27,59 @@ class Bar(Enum):
     NEXT = 1
 
 
+class TimeInForceType(Enum):
+    # until filled or cancelled
+    GTC = auto()
+    # until the session of the bar where it is placed ends
+    DAY = auto()
+    # until `expire_time`
+    GTD = auto()
+    # for `n_bars` bars from its first bar
+    N_BARS = auto()
+
+
+class TimeInForce(NamedTuple):
+    """How long an order stays open before it expires.
+
+    An expired order is cancelled before the orders are matched against the
+    bar where it expires.
+    """
+    type_: TimeInForceType = TimeInForceType.GTC
+    # GTD: expires on the first bar whose time is at or after this
+    expire_time: Optional[float] = None
+    # N_BARS: the number of bars the order is tried on
+    n_bars: Optional[int] = None
+    # DAY: sessions are the periods of `floor(time / session_period)`
+    session_period: Optional[float] = None
+
+
+GTC = TimeInForce()
+
+
+class Bracket(NamedTuple):
+    """Exit orders attached to an entry order.
+
+    The broker places them when the entry is filled, as one-cancels-other
+    orders: the first one filled cancels the others. The prices are
+    distances from the filled price of the entry.
+
+    Bars do not tell whether their high or low came first, so when one bar
+    reaches both the target and the stop, the stop is filled, which is the
+    conservative assumption.
+    """
+    # a limit order this far in favor of the position
+    target_profit: Optional[Price] = None
+    # a stop order this far against the position
+    stop_loss: Optional[Price] = None
+    # a market order on the first bar where the holding period, in the unit
+    # of the `Time` column, reaches this
+    exit_in_n_bars: Optional[float] = None
+
+
 # TODO: deleted if not necessary
 class Order(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def is_buy(self) -> bool:
@@ -35,13 +87,27 @@ class Order(ABC):
 
 
 class BasicOrder(Order):
+    """Order of one product.
+
+    Orders are created in large numbers, so they keep their attributes in
+    slots, and concrete classes carry their side and condition as class
+    attributes to dispatch on.
+    """
+    __slots__ = ('__time', '__product_id', '__n_shares', '__nth_bar',
+                 '__status', '__bracket', '__order_id', '__time_in_force')
+    order_type: OrderType
+    condition: OrderCondition
+
     def __init__(self, time_: float, product_id: int, n_shares: int,
-                 nth_bar: int):
+                 nth_bar: int, order_id: Optional[int] = None):
         self.__time = time_
         self.__product_id = product_id
         self.__n_shares = n_shares
         self.__nth_bar = nth_bar
         self.__status = OrderStatus.OPEN
+        self.__bracket: Optional[Bracket] = None
+        self.__order_id = order_id
+        self.__time_in_force = GTC
         self.__validate_inputs()
 
     @property
@@ -64,6 +130,44 @@ class BasicOrder(Order):
     def status(self) -> OrderStatus:
         return self.__status
 
+    @property
+    def bracket(self) -> Optional[Bracket]:
+        return self.__bracket
+
+    @property
+    def time_in_force(self) -> TimeInForce:
+        return self.__time_in_force
+
+    def set_time_in_force(self, time_in_force: TimeInForce) -> 'BasicOrder':
+        """
+        :return: this order
+        """
+        _validate_time_in_force(time_in_force)
+        self.__time_in_force = time_in_force
+        return self
+
+    @property
+    def order_id(self) -> Optional[int]:
+        """the id assigned by the order client, or None until it is sent"""
+        return self.__order_id
+
+    def assign_id(self, order_id: int):
+        if self.__order_id is not None:
+            raise AttributeError(
+                f'the order already has id `{self.__order_id}`, but got '
+                f'`{order_id}`.')
+        self.__order_id = order_id
+
+    def attach_bracket(self, bracket: Optional[Bracket]) -> 'BasicOrder':
+        """Attaches exit orders placed when this order is filled.
+
+        :return: this order
+        """
+        if bracket is not None:
+            _validate_bracket(bracket)
+        self.__bracket = bracket
+        return self
+
     @property
     @abstractmethod
     def is_buy(self) -> bool:
@@ -91,23 +195,37 @@ class BasicOrder(Order):
 
 
 class WithPrice(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
-    def price(self) -> Decimal:
+    def price(self) -> Price:
         pass
 
 
 class BasicOrderWithPrice(BasicOrder, WithPrice):
+    __slots__ = ('__price',)
+
     def __init__(self, time_: float, product_id: int, n_shares: int,
-                 price: Decimal, nth_bar: int):
-        super().__init__(time_, product_id, n_shares, nth_bar)
+                 price: Price, nth_bar: int, order_id: Optional[int] = None):
+        super().__init__(time_, product_id, n_shares, nth_bar, order_id)
         self.__price = price
         self.__validate_inputs()
 
     @property
-    def price(self) -> Decimal:
+    def price(self) -> Price:
         return self.__price
 
+    def set_price(self, price: Price) -> 'BasicOrderWithPrice':
+        """Sets the price converted by the order client, e.g. to int tick
+        counts.
+
+        :return: this order
+        """
+        self.__price = price
+        self.__validate_inputs()
+        return self
+
     @property
     @abstractmethod
     def is_buy(self) -> bool:
@@ -116,58 +234,80 @@ class BasicOrderWithPrice(BasicOrder, WithPrice):
     def __validate_inputs(self) -> None:
         if self.__price <= 0:
             raise AttributeError(
-                f'`price` must be Decimal greater than 0, but got `'
+                f'`price` must be greater than 0, but got `'
                 f'{self.__price}`.')
 
 
 class BuyOrder:
-    pass
+    __slots__ = ()
+    order_type = OrderType.BUY
 
 
 class SellOrder:
-    pass
+    __slots__ = ()
+    order_type = OrderType.SELL
 
 
 class BuyLimitOrder(BasicOrderWithPrice, BuyOrder):
+    __slots__ = ()
+    condition = OrderCondition.LIMIT
+
     @property
     def is_buy(self) -> bool:
         return True
 
 
 class BuyMarketOrder(BasicOrder, BuyOrder):
+    __slots__ = ()
+    condition = OrderCondition.MARKET
+
     @property
     def is_buy(self) -> bool:
         return True
 
 
 class BuyStopOrder(BasicOrderWithPrice, BuyOrder):
+    __slots__ = ()
+    condition = OrderCondition.STOP
+
     @property
     def is_buy(self) -> bool:
         return True
 
 
 class SellLimitOrder(BasicOrderWithPrice, SellOrder):
+    __slots__ = ()
+    condition = OrderCondition.LIMIT
+
     @property
     def is_buy(self) -> bool:
         return False
 
 
 class SellMarketOrder(BasicOrder, SellOrder):
+    __slots__ = ()
+    condition = OrderCondition.MARKET
+
     @property
     def is_buy(self) -> bool:
         return False
 
 
 class SellStopOrder(BasicOrderWithPrice, SellOrder):
+    __slots__ = ()
+    condition = OrderCondition.STOP
+
     @property
     def is_buy(self) -> bool:
         return False
 
 
 class FilledOrder(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
-    def filled_price(self) -> Decimal:
+    def filled_price(self) -> Price:
         pass
 
     @property
@@ -187,24 +327,27 @@ class FilledOrder(ABC):
 
 
 class FilledBasicOrder(BasicOrder, FilledOrder):
+    __slots__ = ('__filled_price', '__filled_n_shares', '__filled_time')
+
     @classmethod
-    def from_order(cls, order: BasicOrder, filled_price: Decimal,
+    def from_order(cls, order: BasicOrder, filled_price: Price,
                    filled_n_shares: int, filled_time: float):
         return cls(order.time, order.product_id, order.n_shares,
                    order.nth_bar, filled_price, filled_n_shares,
-                   filled_time)
+                   filled_time, order.order_id)
 
     def __init__(self, time_: float, product_id: int, n_shares: int,
-                 nth_bar: int, filled_price: Decimal,
-                 filled_n_shares: int, filled_time: float):
-        super().__init__(time_, product_id, n_shares, nth_bar)
+                 nth_bar: int, filled_price: Price,
+                 filled_n_shares: int, filled_time: float,
+                 order_id: Optional[int] = None):
+        super().__init__(time_, product_id, n_shares, nth_bar, order_id)
         self.filled()
         self.__filled_price = filled_price
         self.__filled_n_shares = filled_n_shares
         self.__filled_time = filled_time
 
     @property
-    def filled_price(self) -> Decimal:
+    def filled_price(self) -> Price:
         return self.__filled_price
 
     @property
@@ -222,24 +365,28 @@ class FilledBasicOrder(BasicOrder, FilledOrder):
 
 
 class FilledBasicOrderWithPrice(FilledBasicOrder, WithPrice):
+    __slots__ = ('__price',)
+
     @classmethod
     def from_order(cls, order: BasicOrderWithPrice,
-                   filled_price: Decimal, filled_n_shares: int,
+                   filled_price: Price, filled_n_shares: int,
                    filled_time: float):
         return cls(order.time, order.product_id, order.n_shares,
                    order.price, order.nth_bar, filled_price,
-                   filled_n_shares, filled_time)
+                   filled_n_shares, filled_time, order.order_id)
 
     def __init__(self, time_: float, product_id: int, n_shares: int,
-                 price: Decimal, nth_bar: int, filled_price: Decimal,
-                 filled_n_shares: int, filled_time: float):
+                 price: Price, nth_bar: int, filled_price: Price,
+                 filled_n_shares: int, filled_time: float,
+                 order_id: Optional[int] = None):
         super().__init__(time_, product_id, n_shares, nth_bar,
-                         filled_price, filled_n_shares, filled_time)
+                         filled_price, filled_n_shares, filled_time,
+                         order_id)
         self.__price = price
         self.__validate_inputs()
 
     @property
-    def price(self) -> Decimal:
+    def price(self) -> Price:
         return self.__price
 
     @property
@@ -250,46 +397,75 @@ class FilledBasicOrderWithPrice(FilledBasicOrder, WithPrice):
     def __validate_inputs(self) -> None:
         if self.__price <= 0:
             raise AttributeError(
-                f'`price` must be Decimal greater than 0, but got `'
+                f'`price` must be greater than 0, but got `'
                 f'{self.__price}`.')
 
 
 class FilledBuyLimitOrder(FilledBasicOrderWithPrice, BuyOrder):
+    __slots__ = ()
+    condition = OrderCondition.LIMIT
+
     @property
     def is_buy(self) -> bool:
         return True
 
 
 class FilledBuyMarketOrder(FilledBasicOrder, BuyOrder):
+    __slots__ = ()
+    condition = OrderCondition.MARKET
+
     @property
     def is_buy(self) -> bool:
         return True
 
 
 class FilledBuyStopOrder(FilledBasicOrderWithPrice, BuyOrder):
+    __slots__ = ()
+    condition = OrderCondition.STOP
+
     @property
     def is_buy(self) -> bool:
         return True
 
 
 class FilledSellLimitOrder(FilledBasicOrderWithPrice, SellOrder):
+    __slots__ = ()
+    condition = OrderCondition.LIMIT
+
     @property
     def is_buy(self) -> bool:
         return False
 
 
 class FilledSellMarketOrder(FilledBasicOrder, SellOrder):
+    __slots__ = ()
+    condition = OrderCondition.MARKET
+
     @property
     def is_buy(self) -> bool:
         return False
 
 
 class FilledSellStopOrder(FilledBasicOrderWithPrice, SellOrder):
+    __slots__ = ()
+    condition = OrderCondition.STOP
+
     @property
     def is_buy(self) -> bool:
         return False
 
 
+class OrderReplacement(NamedTuple):
+    """Replaces an open limit or stop order with a new order of the same
+    kind. The attributes which are None are taken from the replaced order.
+    """
+    order_id: int
+    # the id of the new order
+    new_order_id: int
+    price: Optional[Price] = None
+    n_shares: Optional[int] = None
+
+
 class BuySellSplitResult(NamedTuple):
     buys: List[BasicOrder]
     sells: List[BasicOrder]
@@ -299,3 +475,32 @@ def buy_sell_split(orders: List[BasicOrder]):
     buy_orders = [o for o in orders if o.is_buy]
     sell_orders = [o for o in orders if not o.is_buy]
     return BuySellSplitResult(buys=buy_orders, sells=sell_orders)
+
+
+def _validate_bracket(bracket: Bracket) -> None:
+    for name in ['target_profit', 'stop_loss']:
+        value = getattr(bracket, name)
+        if value is not None and value <= 0:
+            raise AttributeError(
+                f'`{name}` must be greater than 0, but got `{value}`.')
+    if bracket.exit_in_n_bars is not None and bracket.exit_in_n_bars < 0:
+        raise AttributeError(
+            f'`exit_in_n_bars` must be greater than or equal to 0, but got '
+            f'`{bracket.exit_in_n_bars}`.')
+
+
+def _validate_time_in_force(time_in_force: TimeInForce) -> None:
+    type_ = time_in_force.type_
+    if type_ == TimeInForceType.GTD and time_in_force.expire_time is None:
+        raise AttributeError('`expire_time` must be given for GTD orders.')
+    if type_ == TimeInForceType.N_BARS and (
+            time_in_force.n_bars is None or time_in_force.n_bars < 1):
+        raise AttributeError(
+            f'`n_bars` must be an int greater than or equal to 1 for N_BARS '
+            f'orders, but got `{time_in_force.n_bars}`.')
+    if type_ == TimeInForceType.DAY and (
+            time_in_force.session_period is None
+            or time_in_force.session_period <= 0):
+        raise AttributeError(
+            f'`session_period` must be greater than 0 for DAY orders, but '
+            f'got `{time_in_force.session_period}`.')
@@ -1,12 +1,13 @@
 from collections import deque
-from decimal import Decimal
 from typing import List, NamedTuple, Optional
 
+from tmtrader._typing import Price
+
 
 class Position(NamedTuple):
     product_id: int
     filled_time: float
-    filled_price: Decimal
+    filled_price: Price
     is_buy: bool
 
 
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 from decimal import Decimal
-from typing import NamedTuple
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
 
 from tmtrader._typing import ArrayLike
+from tmtrader.indicator.indicator import indicator_key, output_index
 
 
 class PriceSequence(ABC):
@@ -72,6 +75,36 @@ class PriceSequence(ABC):
     def time(self) -> ArrayLike:
         pass
 
+    def with_depth(self, n_bars: int) -> 'PriceSequence':
+        """Returns the sequence of the latest `n_bars` bars at most."""
+        return ColumnarPriceSequence([self.open[:n_bars],
+                                      self.high[:n_bars],
+                                      self.low[:n_bars],
+                                      self.close[:n_bars],
+                                      self.vol[:n_bars],
+                                      self.time[:n_bars]])
+
+    def history(self, n_bars: int) -> 'PriceSequence':
+        """Returns the sequence of the latest `n_bars` bars, which may be
+        deeper than this sequence if the source keeps more history."""
+        if n_bars > len(self.time):
+            raise ValueError(
+                f'n_bars (={n_bars}) must be smaller or equal to the number '
+                f'of available bars (={len(self.time)}).')
+        return self.with_depth(n_bars)
+
+    def indicator(self, spec, output: Optional[str] = None) -> ArrayLike:
+        """Returns the values of `output` of the indicator of `spec`
+        ordered from the latest value to the oldest value. If `output` is
+        None, the first output of the indicator is used."""
+        raise ValueError(
+            f'indicator `{spec}` is not available. Declare it in '
+            f'`Strategy.indicators`.')
+
+    def _indicator(self, spec, output: Optional[str],
+                   n_bars: int) -> ArrayLike:
+        return self.indicator(spec, output)[:n_bars]
+
 
 class DefaultPriceSequence(PriceSequence):
     def __init__(self, price_seq: ArrayLike):
@@ -132,6 +165,501 @@ class DefaultPriceSequence(PriceSequence):
         return self.price_seq[:, 5]
 
 
+class ColumnarPriceSequence(PriceSequence):
+    def __init__(self, columns: Sequence[ArrayLike]):
+        """
+        :param columns: sequence of 1d-array-like objects
+            Columns of Open, High, Low, Close, Vol and Time must be arranged
+            in this order.
+            Each column must be ordered from latest bar to the oldest bar.
+        """
+        self.columns = columns
+
+    @property
+    def _open(self):
+        pass
+
+    @_open.getter
+    def open(self) -> ArrayLike:
+        return self.columns[0]
+
+    @property
+    def _high(self):
+        pass
+
+    @_high.getter
+    def high(self) -> ArrayLike:
+        return self.columns[1]
+
+    @property
+    def _low(self):
+        pass
+
+    @_low.getter
+    def low(self) -> ArrayLike:
+        return self.columns[2]
+
+    @property
+    def _close(self):
+        pass
+
+    @_close.getter
+    def close(self) -> ArrayLike:
+        return self.columns[3]
+
+    @property
+    def _vol(self):
+        pass
+
+    @_vol.getter
+    def vol(self) -> ArrayLike:
+        return self.columns[4]
+
+    @property
+    def _time(self):
+        pass
+
+    @_time.getter
+    def time(self) -> ArrayLike:
+        return self.columns[5]
+
+
+class PriceWindow(PriceSequence):
+    """Sliding window over whole price columns.
+
+    The window is advanced in place by `seek`, so that a single instance is
+    shared by every bar of a feed. Observers must not keep a reference to it
+    expecting the values to stay the same.
+    """
+
+    def __init__(self, columns: Sequence[ArrayLike], n_bars: int,
+                 contiguous: bool = True):
+        """
+        :param columns: sequence of 1d-array-like objects
+            Columns of Open, High, Low, Close, Vol and Time must be arranged
+            in this order.
+            Each column must be ordered from the oldest bar to the latest bar.
+        :param n_bars: the number of bars in the window
+        :param contiguous: if True, reversed copies of the columns are made
+            once so that each column of the window is contiguous.
+            if False, reversed views are used and no data is copied.
+        """
+        if n_bars < 1:
+            raise ValueError(
+                f'n_bars must be a value of positive int larger or equal to '
+                f'1, but got {n_bars}.')
+        self.__n_rows = len(columns[0])
+        if contiguous:
+            self.__reversed = [np.ascontiguousarray(c[::-1]) for c in columns]
+        else:
+            self.__reversed = [c[::-1] for c in columns]
+        self.__n_bars = n_bars
+        self.__start = self.__n_rows
+        self.__stop = self.__n_rows
+        self.__views = dict()
+        self.__indicators = dict()
+
+    @property
+    def n_rows(self) -> int:
+        return self.__n_rows
+
+    @property
+    def n_bars(self) -> int:
+        return self.__n_bars
+
+    def set_n_bars(self, n_bars: int):
+        if n_bars < 1:
+            raise ValueError(
+                f'n_bars must be a value of positive int larger or equal to '
+                f'1, but got {n_bars}.')
+        self.__n_bars = n_bars
+        self.__stop = min(self.__start + self.__n_bars, self.__n_rows)
+
+    @property
+    def columns(self) -> List[ArrayLike]:
+        """views of the price columns ordered from the oldest bar to the
+        latest bar"""
+        return [c[::-1] for c in self.__reversed]
+
+    def add_indicator(self, spec, values: ArrayLike):
+        """Adds precomputed values of the indicator of `spec`.
+
+        :param values: 2d-array with a row for each output of the indicator.
+            Each row must be ordered from the oldest bar to the latest bar.
+        """
+        if len(values[0]) != self.__n_rows:
+            raise ValueError(
+                f'values must have {self.__n_rows} bars, but got '
+                f'{len(values[0])}.')
+        self.__indicators[indicator_key(spec)] = \
+            [np.ascontiguousarray(v[::-1]) for v in values]
+
+    def indicator(self, spec, output: Optional[str] = None) -> ArrayLike:
+        return self._indicator(spec, output, self.__n_bars)
+
+    @property
+    def bar_index(self) -> int:
+        """index of the latest bar in the window, counted from the oldest
+        bar of the columns"""
+        return self.__n_rows - 1 - self.__start
+
+    def seek(self, bar_idx: int):
+        self.__start = self.__n_rows - 1 - bar_idx
+        self.__stop = min(self.__start + self.__n_bars, self.__n_rows)
+
+    def latest(self, n_bars: int) -> PriceSequence:
+        start = self.__start
+        return ColumnarPriceSequence(
+            [c[start:start + n_bars] for c in self.__reversed])
+
+    def with_depth(self, n_bars: int) -> PriceSequence:
+        if n_bars == self.__n_bars:
+            return self
+        # views follow the window, so one view per depth is enough
+        view = self.__views.get(n_bars)
+        if view is None:
+            view = _PriceWindowView(self, n_bars)
+            self.__views[n_bars] = view
+        return view
+
+    def history(self, n_bars: int) -> PriceSequence:
+        n_available = self.__n_rows - self.__start
+        if n_bars > n_available:
+            raise ValueError(
+                f'n_bars (={n_bars}) must be smaller or equal to the number '
+                f'of available bars (={n_available}).')
+        return self.latest(n_bars)
+
+    def _column(self, idx: int, n_bars: int) -> ArrayLike:
+        start = self.__start
+        return self.__reversed[idx][start:min(start + n_bars, self.__n_rows)]
+
+    def _indicator(self, spec, output: Optional[str],
+                   n_bars: int) -> ArrayLike:
+        columns = self.__indicators.get(indicator_key(spec))
+        if columns is None:
+            return super().indicator(spec, output)
+        start = self.__start
+        return columns[output_index(spec, output)][
+               start:min(start + n_bars, self.__n_rows)]
+
+    @property
+    def _open(self):
+        pass
+
+    @_open.getter
+    def open(self) -> ArrayLike:
+        return self.__reversed[0][self.__start:self.__stop]
+
+    @property
+    def _high(self):
+        pass
+
+    @_high.getter
+    def high(self) -> ArrayLike:
+        return self.__reversed[1][self.__start:self.__stop]
+
+    @property
+    def _low(self):
+        pass
+
+    @_low.getter
+    def low(self) -> ArrayLike:
+        return self.__reversed[2][self.__start:self.__stop]
+
+    @property
+    def _close(self):
+        pass
+
+    @_close.getter
+    def close(self) -> ArrayLike:
+        return self.__reversed[3][self.__start:self.__stop]
+
+    @property
+    def _vol(self):
+        pass
+
+    @_vol.getter
+    def vol(self) -> ArrayLike:
+        return self.__reversed[4][self.__start:self.__stop]
+
+    @property
+    def _time(self):
+        pass
+
+    @_time.getter
+    def time(self) -> ArrayLike:
+        return self.__reversed[5][self.__start:self.__stop]
+
+
+class PriceRingBuffer(PriceSequence):
+    """Bounded sequence of the latest bars pushed one by one.
+
+    Every bar is written twice, `capacity` apart, so that the latest bars are
+    always a contiguous slice of the buffer ordered from the latest bar to
+    the oldest bar. Pushing a bar neither allocates nor shifts data.
+    """
+
+    def __init__(self, capacity: int, n_columns: int = 6,
+                 dtype=np.float64):
+        if capacity < 1:
+            raise ValueError(
+                f'capacity must be a value of positive int larger or equal '
+                f'to 1, but got {capacity}.')
+        self.__capacity = capacity
+        self.__buf = np.zeros((n_columns, 2 * capacity), dtype=dtype)
+        self.__head = 0
+        self.__len = 0
+        self.__views = dict()
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def len(self) -> int:
+        return self.__len
+
+    def push(self, row: ArrayLike):
+        head = self.__head - 1
+        if head < 0:
+            head = self.__capacity - 1
+        self.__buf[:, head] = row
+        self.__buf[:, head + self.__capacity] = row
+        self.__head = head
+        if self.__len < self.__capacity:
+            self.__len += 1
+
+    def clear(self):
+        self.__head = 0
+        self.__len = 0
+
+    def with_depth(self, n_bars: int) -> PriceSequence:
+        if n_bars >= self.__capacity:
+            return self
+        view = self.__views.get(n_bars)
+        if view is None:
+            view = _PriceWindowView(self, n_bars)
+            self.__views[n_bars] = view
+        return view
+
+    def history(self, n_bars: int) -> PriceSequence:
+        if n_bars > self.__len:
+            raise ValueError(
+                f'n_bars (={n_bars}) must be smaller or equal to the number '
+                f'of available bars (={self.__len}).')
+        return ColumnarPriceSequence(
+            [self._column(i, n_bars) for i in range(len(self.__buf))])
+
+    def _column(self, idx: int, n_bars: int) -> ArrayLike:
+        head = self.__head
+        return self.__buf[idx, head:head + min(n_bars, self.__len)]
+
+    @property
+    def _open(self):
+        pass
+
+    @_open.getter
+    def open(self) -> ArrayLike:
+        return self._column(0, self.__capacity)
+
+    @property
+    def _high(self):
+        pass
+
+    @_high.getter
+    def high(self) -> ArrayLike:
+        return self._column(1, self.__capacity)
+
+    @property
+    def _low(self):
+        pass
+
+    @_low.getter
+    def low(self) -> ArrayLike:
+        return self._column(2, self.__capacity)
+
+    @property
+    def _close(self):
+        pass
+
+    @_close.getter
+    def close(self) -> ArrayLike:
+        return self._column(3, self.__capacity)
+
+    @property
+    def _vol(self):
+        pass
+
+    @_vol.getter
+    def vol(self) -> ArrayLike:
+        return self._column(4, self.__capacity)
+
+    @property
+    def _time(self):
+        pass
+
+    @_time.getter
+    def time(self) -> ArrayLike:
+        return self._column(5, self.__capacity)
+
+
+class MultiPriceSequence(PriceSequence):
+    """Price sequences of several products at the same timestamp.
+
+    The price properties are the ones of the primary product, so that a
+    strategy written for a single product works on the primary product.
+    Products without a bar at the latest timestamp keep their last bar.
+    """
+
+    def __init__(self, sequences: Dict[int, PriceSequence], primary: int):
+        if primary not in sequences:
+            raise ValueError(
+                f'primary product `{primary}` is not found in the sequences.')
+        self.__sequences = sequences
+        self.__primary = sequences[primary]
+        self.__primary_id = primary
+        self.__views = dict()
+
+    @property
+    def product_ids(self) -> List[int]:
+        return list(self.__sequences.keys())
+
+    def of(self, product_id: int) -> PriceSequence:
+        return self.__sequences[product_id]
+
+    def with_depth(self, n_bars: int) -> PriceSequence:
+        view = self.__views.get(n_bars)
+        if view is None:
+            view = MultiPriceSequence(
+                {k: s.with_depth(n_bars) for k, s in
+                 self.__sequences.items()}, self.__primary_id)
+            self.__views[n_bars] = view
+        return view
+
+    def history(self, n_bars: int) -> PriceSequence:
+        return MultiPriceSequence(
+            {k: s.history(n_bars) for k, s in self.__sequences.items()},
+            self.__primary_id)
+
+    def indicator(self, spec, output: Optional[str] = None) -> ArrayLike:
+        return self.__primary.indicator(spec, output)
+
+    @property
+    def _open(self):
+        pass
+
+    @_open.getter
+    def open(self) -> ArrayLike:
+        return self.__primary.open
+
+    @property
+    def _high(self):
+        pass
+
+    @_high.getter
+    def high(self) -> ArrayLike:
+        return self.__primary.high
+
+    @property
+    def _low(self):
+        pass
+
+    @_low.getter
+    def low(self) -> ArrayLike:
+        return self.__primary.low
+
+    @property
+    def _close(self):
+        pass
+
+    @_close.getter
+    def close(self) -> ArrayLike:
+        return self.__primary.close
+
+    @property
+    def _vol(self):
+        pass
+
+    @_vol.getter
+    def vol(self) -> ArrayLike:
+        return self.__primary.vol
+
+    @property
+    def _time(self):
+        pass
+
+    @_time.getter
+    def time(self) -> ArrayLike:
+        return self.__primary.time
+
+
+class _PriceWindowView(PriceSequence):
+    """Fixed depth view of a `PriceWindow` or a `PriceRingBuffer` which
+    follows the underlying sequence."""
+
+    def __init__(self, window: PriceSequence, n_bars: int):
+        self.__window = window
+        self.__n_bars = n_bars
+
+    def with_depth(self, n_bars: int) -> PriceSequence:
+        return self.__window.with_depth(n_bars)
+
+    def history(self, n_bars: int) -> PriceSequence:
+        return self.__window.history(n_bars)
+
+    def indicator(self, spec, output: Optional[str] = None) -> ArrayLike:
+        return self.__window._indicator(spec, output, self.__n_bars)
+
+    @property
+    def _open(self):
+        pass
+
+    @_open.getter
+    def open(self) -> ArrayLike:
+        return self.__window._column(0, self.__n_bars)
+
+    @property
+    def _high(self):
+        pass
+
+    @_high.getter
+    def high(self) -> ArrayLike:
+        return self.__window._column(1, self.__n_bars)
+
+    @property
+    def _low(self):
+        pass
+
+    @_low.getter
+    def low(self) -> ArrayLike:
+        return self.__window._column(2, self.__n_bars)
+
+    @property
+    def _close(self):
+        pass
+
+    @_close.getter
+    def close(self) -> ArrayLike:
+        return self.__window._column(3, self.__n_bars)
+
+    @property
+    def _vol(self):
+        pass
+
+    @_vol.getter
+    def vol(self) -> ArrayLike:
+        return self.__window._column(4, self.__n_bars)
+
+    @property
+    def _time(self):
+        pass
+
+    @_time.getter
+    def time(self) -> ArrayLike:
+        return self.__window._column(5, self.__n_bars)
+
+
 class Bar(NamedTuple):
     open: Decimal
     high: Decimal
@@ -1,15 +1,16 @@
-from decimal import Decimal
 from typing import NamedTuple
 
+from tmtrader._typing import Price
+
 
 class Entry(NamedTuple):
     timestamp: float
-    price: Decimal
+    price: Price
 
 
 class Exit(NamedTuple):
     timestamp: float
-    price: Decimal
+    price: Price
 
 
 class Trade(NamedTuple):
@@ -18,4 +19,4 @@ class Trade(NamedTuple):
     is_long: bool
     entry: Entry
     exit: Exit
-    pl: Decimal
+    pl: Price
@@ -1,156 +1,426 @@
+import math
 from decimal import Decimal
+from heapq import heappop, heappush
+from itertools import count
 from logging import getLogger
-from typing import List, NamedTuple, Optional
-
-from tmtrader.entity.order import BasicOrder, BuyLimitOrder, BuyMarketOrder, \
-    BuyStopOrder, FilledBasicOrder, FilledBuyLimitOrder, \
-    FilledBuyMarketOrder, \
-    FilledBuyStopOrder, FilledSellLimitOrder, FilledSellMarketOrder, \
-    FilledSellStopOrder, OrderCondition, OrderStatus, OrderType, \
-    SellLimitOrder, SellMarketOrder, SellStopOrder
-from tmtrader.entity.price import Bar
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, \
+    Type
+
+import numpy as np
+
+from tmtrader._typing import Price
+from tmtrader.entity.order import BasicOrder, BasicOrderWithPrice, \
+    BuyLimitOrder, BuyMarketOrder, BuyStopOrder, FilledBasicOrder, \
+    FilledBuyLimitOrder, FilledBuyMarketOrder, FilledBuyStopOrder, \
+    FilledSellLimitOrder, FilledSellMarketOrder, FilledSellStopOrder, \
+    OrderCondition, OrderReplacement, OrderStatus, OrderType, \
+    SellLimitOrder, SellMarketOrder, SellStopOrder, TimeInForceType, \
+    WithPrice
+from tmtrader.entity.price import Bar, PriceSequence
+from tmtrader.exchange_for_backtest.order_book import OrderBook
 from tmtrader.exchange_for_backtest.price_stream import PriceStream
 from tmtrader.exchange_for_backtest.usecase.close_order import \
     OrderCloseNotifier
-from tmtrader.usecase.send_order import OrderObserver
-from tmtrader.usecase.time_ref import DefaultTimeRef, TimeRef
+from tmtrader.usecase.look_ahead import LookAhead, LookAheadData, \
+    first_touch_index
+from tmtrader.usecase.price_feed import PriceObserver
+from tmtrader.usecase.send_order import OrderChangeObserver, OrderObserver
+from tmtrader.usecase.time_ref import SimulatedTimeRef, TimeRef
 
 logger = getLogger(__name__)
 
 
 class Filled(NamedTuple):
-    price: Decimal
+    price: Price
     n_shares: int
 
 
-class BackTestBroker(OrderObserver, OrderCloseNotifier):
+class _TimeExit(NamedTuple):
+    """market order of a bracket waiting for its holding period"""
+    entry_time: float
+    n_bars: float
+    order: BasicOrder
+
+
+class BackTestBroker(OrderObserver, OrderChangeObserver, OrderCloseNotifier,
+                     PriceObserver, LookAhead):
+    """Broker filling orders against the latest bar.
+
+    New orders are tried when they are placed, or from the `nth_bar`-th bar
+    after it if `nth_bar` is not 0. Orders arriving after the time of the
+    latest bar, delayed by latency, are tried from the next bar at the
+    earliest. Limit and stop orders which
+    are not filled rest in the order book, and on every bar only the ones
+    whose price is within the range of the bar are filled. When an order
+    with a bracket is filled, the exit orders of the bracket are placed and
+    tried from the next bar, and the stop is tried before the target.
+
+    Orders of a product without a bar at the time of the latest bar, which
+    happens with several products, are kept open until the product has one,
+    so that they are not filled at a past price.
+
+    Open orders are found by their ids to be cancelled or replaced. Orders
+    without an id, like the exit orders of brackets, get negative ids.
+
+    Delayed activations and the expiries by time in force are kept in
+    min-heaps, so that they cost O(log n) per order instead of a scan of the
+    open orders on every bar.
+    """
+
     def __init__(self, price_stream_ref: PriceStream,
-                 time_ref: Optional[TimeRef] = None):
+                 time_ref: Optional[TimeRef] = None,
+                 tick_prices: bool = False):
+        """
+        :param tick_prices: if True, orders are filled against bars of int
+            tick counts, so the prices of the orders must be tick counts too
+        """
         super().__init__()
         self.__price_stream_ref = price_stream_ref
-        self.__open_orders: List[BasicOrder] = list()
+        self.__tick_prices = tick_prices
+        if tick_prices:
+            self.__get_latest_bar = price_stream_ref.get_latest_bar_ticks
+        else:
+            self.__get_latest_bar = price_stream_ref.get_latest_bar_decimal
+        self.__has_latest_bar = price_stream_ref.has_latest_bar
+        self.__book = OrderBook()
+        # order id -> order accepted and neither filled nor cancelled
+        self.__working: Dict[int, BasicOrder] = dict()
+        self.__own_ids = count(-1, -1)
+        # the exit orders of a bracket share one list, found by id of each
+        self.__oco_groups: Dict[int, List[BasicOrder]] = dict()
+        self.__time_exits: List[_TimeExit] = list()
+        # market orders waiting for a bar of their product
+        self.__no_bar_orders: List[BasicOrder] = list()
+        # the number of bars fed, including the skipped ones
+        self.__n_bars = 0
+        # (bar index, sequence, order) of orders to activate and to expire
+        self.__activations: List[Tuple[int, int, BasicOrder]] = list()
+        self.__bar_expiries: List[Tuple[int, int, BasicOrder]] = list()
+        # (time, sequence, order) of orders to expire
+        self.__time_expiries: List[Tuple[float, int, BasicOrder]] = list()
+        self.__seq = count()
+        # the latest bar of each product, read once per bar
+        self.__bars: Dict[int, Bar] = dict()
         if time_ref is None:
-            time_ref = DefaultTimeRef()
+            time_ref = SimulatedTimeRef()
         self.__time_ref = time_ref
+        self.__bar_time = -math.inf
 
     def notify_new_orders(self, orders: List[BasicOrder]):
         self.__place_orders(orders)
 
+    def notify_cancel_orders(self, order_ids: List[int]):
+        for order_id in order_ids:
+            order = self.__working.get(order_id)
+            if order is None:
+                logger.warning(f'order `{order_id}` is not open.')
+                continue
+            self.__oco_groups.pop(id(order), None)
+            self.__cancel(order)
+
+    def notify_replace_orders(self, replacements: List[OrderReplacement]):
+        new_orders = []
+        for r in replacements:
+            order = self.__working.get(r.order_id)
+            if order is None:
+                logger.warning(f'order `{r.order_id}` is not open.')
+                continue
+            if not isinstance(order, WithPrice):
+                raise ValueError(
+                    f'only limit and stop orders can be replaced, but order '
+                    f'`{r.order_id}` is `{type(order).__name__}`.')
+            new_order = _replaced(order, r, self.__time_ref.now())
+            # the new order takes the place in the bracket
+            group = self.__oco_groups.pop(id(order), None)
+            if group is not None:
+                group[group.index(order)] = new_order
+                self.__oco_groups[id(new_order)] = group
+            self.__cancel(order)
+            new_orders.append(new_order)
+        if new_orders:
+            self.__place_orders(new_orders)
+
+    def notify_price_update(self, price_ref: PriceSequence):
+        self.__n_bars += 1
+        self.__bar_time = float(price_ref.time[0])
+        self.__bars = bars = dict()
+        if self.__bar_expiries or self.__time_expiries:
+            self.__expire(bars)
+        orders = []
+        if len(self.__book):
+            ranges = dict()
+            for product_id in self.__book.product_ids:
+                if not self.__has_latest_bar(product_id):
+                    continue
+                bar = self.__latest_bar(product_id, bars)
+                ranges[product_id] = (bar.low, bar.high)
+            orders = self.__book.pop_touched(ranges)
+            if self.__oco_groups:
+                # the stops of brackets before their targets, see `Bracket`
+                orders.sort(key=self.__is_not_bracket_stop)
+        if self.__no_bar_orders:
+            orders += self.__no_bar_orders
+            self.__no_bar_orders = []
+        if self.__time_exits:
+            orders += self.__activate_time_exits(bars)
+        if self.__activations:
+            activated = _pop_due(self.__activations, self.__bar_index)
+            [self.__schedule_expiry(o, bars) for o in activated]
+            orders += activated
+        if orders:
+            self.__fill(orders, bars)
+
+    def skip(self, n_bars: int):
+        self.__n_bars += n_bars
+
+    def next_active_row(self, row: int, data: LookAheadData) -> int:
+        if self.__no_bar_orders:
+            return row + 1
+        prices = [self.__price_in_ticks(p, data) for p in self.__book.prices()]
+        next_row = first_touch_index(data.ticks, prices, row + 1,
+                                     data.n_rows)
+        for e in self.__time_exits:
+            # not later than the first bar where the rounded holding period
+            # reaches `n_bars`
+            due_row = int(np.searchsorted(data.time,
+                                          e.entry_time + e.n_bars - 0.5))
+            next_row = min(next_row, max(due_row, row + 1))
+        if self.__activations:
+            next_row = min(next_row, row + self.__activations[0][0]
+                           - self.__bar_index)
+        return next_row
+
+    @property
+    def __bar_index(self) -> int:
+        """the index of the latest bar"""
+        return self.__n_bars - 1
+
+    def __price_in_ticks(self, price: Price, data: LookAheadData) -> float:
+        if self.__tick_prices:
+            return float(price)
+        tick = data.rounder.ticks2decimal(1)
+        return float(Decimal(price) / tick)
+
     def __place_orders(self, orders: List[BasicOrder]):
-        self.__open_orders.extend(orders)
-        self.__try_fill_with_latest_price()
+        bars = self.__bars
+        between_bars = self.__time_ref.now() > self.__bar_time
+        due = []
+        for o in orders:
+            self.__accept(o)
+            nth_bar = max(o.nth_bar, 1) if between_bars else o.nth_bar
+            if nth_bar:
+                heappush(self.__activations, (self.__bar_index + nth_bar,
+                                              next(self.__seq), o))
+            else:
+                self.__schedule_expiry(o, bars)
+                due.append(o)
+        self.__fill(due, bars)
 
-    def __try_fill_with_latest_price(self):
-        bar = self.__price_stream_ref.get_latest_bar_decimal()
-        may_filled_orders = [_try_fill(o, bar) for o in self.__open_orders]
-        fos = [self._notify_order_filled(o) for o in may_filled_orders if
-               o is not None]
-        self.__open_orders = [o for o in self.__open_orders if
-                              o.status == OrderStatus.OPEN]
-        # logger.debug(
-        #     f'len(filled orders) = {len(fos)}, len(open orders) '
-        #     f'= {len(self.__orders)}')
+    def __schedule_expiry(self, order: BasicOrder, bars: Dict[int, Bar]):
+        """Schedules the expiry of `order` activated on the latest bar."""
+        tif = order.time_in_force
+        if tif.type_ == TimeInForceType.GTC:
+            return
+        if tif.type_ == TimeInForceType.N_BARS:
+            heappush(self.__bar_expiries, (self.__bar_index + tif.n_bars,
+                                           next(self.__seq), order))
+            return
+        if tif.type_ == TimeInForceType.DAY:
+            time_ = self.__latest_bar(order.product_id, bars).time
+            expire_time = (math.floor(time_ / tif.session_period) + 1) \
+                * tif.session_period
+        else:
+            expire_time = tif.expire_time
+        heappush(self.__time_expiries, (expire_time, next(self.__seq), order))
 
+    def __expire(self, bars: Dict[int, Bar]):
+        expired = _pop_due(self.__bar_expiries, self.__bar_index)
+        heap = self.__time_expiries
+        while heap and heap[0][0] <= self.__latest_bar(
+                heap[0][2].product_id, bars).time:
+            order = heappop(heap)[2]
+            if order.status == OrderStatus.OPEN:
+                expired.append(order)
+        [self.__cancel(o) for o in expired]
 
-def _try_fill(order: BasicOrder, bar: Bar) -> Optional[FilledBasicOrder]:
-    filled_order = None
-    if isinstance(order, BuyLimitOrder):
-        filled = _buy_limit(order.price, order.n_shares, bar)
-        if filled:
-            filled_order = FilledBuyLimitOrder.from_order(order,
-                                                          filled.price,
-                                                          filled.n_shares,
-                                                          bar.time)
-    elif isinstance(order, BuyMarketOrder):
-        filled = _buy_market(order.n_shares, bar)
-        if filled:
-            filled_order = FilledBuyMarketOrder.from_order(order,
-                                                           filled.price,
-                                                           filled.n_shares,
-                                                           bar.time)
-    elif isinstance(order, BuyStopOrder):
-        filled = _buy_stop(order.price, order.n_shares, bar)
-        if filled:
-            filled_order = FilledBuyStopOrder.from_order(order,
-                                                         filled.price,
-                                                         filled.n_shares,
-                                                         bar.time)
-    elif isinstance(order, SellLimitOrder):
-        filled = _sell_limit(order.price, order.n_shares, bar)
-        if filled:
-            filled_order = FilledSellLimitOrder.from_order(order,
-                                                           filled.price,
-                                                           filled.n_shares,
-                                                           bar.time)
-    elif isinstance(order, SellMarketOrder):
-        filled = _sell_market(order.n_shares, bar)
-        if filled:
-            filled_order = FilledSellMarketOrder.from_order(order,
-                                                            filled.price,
-                                                            filled.n_shares,
-                                                            bar.time)
-    elif isinstance(order, SellStopOrder):
-        filled = _sell_stop(order.price, order.n_shares, bar)
-        if filled:
-            filled_order = FilledSellStopOrder.from_order(order,
-                                                          filled.price,
-                                                          filled.n_shares,
-                                                          bar.time)
-    else:
-        TypeError(
-            f'`order` must be an instance of BasicOrder, but got type `'
-            f'{type(order)}`.')
+    def __accept(self, order: BasicOrder):
+        if order.order_id is None:
+            order.assign_id(next(self.__own_ids))
+        self.__working[order.order_id] = order
+        self._notify_order_accepted(order)
 
-    # TODO: これは単なるフラグだから書かなくても良くなるようにリファクタリングする
-    if filled_order:
-        order.filled()
+    def __cancel(self, order: BasicOrder):
+        if isinstance(order, WithPrice):
+            self.__book.remove(order)
+        del self.__working[order.order_id]
+        order.cancelled()
+        self._notify_order_cancelled(order)
+        if self.__time_exits:
+            self.__time_exits = [e for e in self.__time_exits if
+                                 e.order.status == OrderStatus.OPEN]
 
-    return filled_order
+    def __fill(self, orders: List[BasicOrder], bars: Dict[int, Bar]):
+        """Fills `orders` in order against the latest bar, and puts the ones
+        which are not filled into the book."""
+        bracketed = []
+        for o in orders:
+            if o.status != OrderStatus.OPEN:
+                # cancelled by another order of its bracket
+                continue
+            filled = None
+            if self.__has_latest_bar(o.product_id):
+                filled = _try_fill(o, self.__latest_bar(o.product_id, bars))
+            if filled is None:
+                if isinstance(o, WithPrice):
+                    self.__book.add(o)
+                else:
+                    self.__no_bar_orders.append(o)
+                continue
+            del self.__working[o.order_id]
+            self._notify_order_filled(filled)
+            self.__cancel_others_of_bracket(o)
+            if o.bracket is not None:
+                bracketed.append((o, filled))
+        [self.__place_bracket(o, f) for o, f in bracketed]
 
+    def __place_bracket(self, entry: BasicOrder, filled: FilledBasicOrder):
+        bracket = entry.bracket
+        price = filled.filled_price
+        args = (self.__time_ref.now(), entry.product_id,
+                filled.filled_n_shares)
+        orders = []
+        if bracket.target_profit is not None:
+            if entry.is_buy:
+                orders.append(SellLimitOrder(
+                    *args, price + bracket.target_profit, 0))
+            else:
+                orders.append(BuyLimitOrder(
+                    *args, price - bracket.target_profit, 0))
+        if bracket.stop_loss is not None:
+            if entry.is_buy:
+                orders.append(SellStopOrder(
+                    *args, price - bracket.stop_loss, 0))
+            else:
+                orders.append(BuyStopOrder(
+                    *args, price + bracket.stop_loss, 0))
+        [self.__book.add(o) for o in orders]
 
-def _buy_limit(price: Decimal, n_shares: int, bar: Bar):
-    if bar.low <= price <= bar.high:
-        # logger.debug('BuyLimitOrder filled.')
-        return Filled(price, n_shares)
-    else:
-        return None
+        if bracket.exit_in_n_bars is not None:
+            if entry.is_buy:
+                order = SellMarketOrder(*args, 0)
+            else:
+                order = BuyMarketOrder(*args, 0)
+            self.__time_exits.append(
+                _TimeExit(filled.filled_time, bracket.exit_in_n_bars, order))
+            orders.append(order)
 
+        for o in orders:
+            self.__accept(o)
+            self.__oco_groups[id(o)] = orders
 
-def _buy_market(n_shares: int, bar: Bar):
-    return Filled(bar.open, n_shares)
+    def __cancel_others_of_bracket(self, order: BasicOrder):
+        group = self.__oco_groups.pop(id(order), None)
+        if group is None:
+            return
+        for o in group:
+            if o is order:
+                continue
+            self.__oco_groups.pop(id(o), None)
+            if o.status == OrderStatus.OPEN:
+                self.__cancel(o)
 
+    def __is_not_bracket_stop(self, order: BasicOrder) -> bool:
+        return order.condition != OrderCondition.STOP \
+            or id(order) not in self.__oco_groups
 
-def _buy_stop(price: Decimal, n_shares: int, bar: Bar):
-    if bar.low <= price <= bar.high:
-        return Filled(price, n_shares)
-    else:
-        return None
+    def __activate_time_exits(self, bars: Dict[int, Bar]) \
+            -> List[BasicOrder]:
+        activated = []
+        waiting = []
+        for e in self.__time_exits:
+            bar = self.__latest_bar(e.order.product_id, bars)
+            # the same rounding as `longest_holding_period_bars`
+            if round(bar.time - e.entry_time) >= e.n_bars:
+                activated.append(e.order)
+            else:
+                waiting.append(e)
+        self.__time_exits = waiting
+        return activated
 
+    def __latest_bar(self, product_id: int, bars: Dict[int, Bar]) -> Bar:
+        if product_id not in bars:
+            bars[product_id] = self.__get_latest_bar(product_id)
+        return bars[product_id]
 
-def _sell_limit(price: Decimal, n_shares: int, bar: Bar):
-    if bar.low <= price <= bar.high:
-        return Filled(price, n_shares)
-    else:
+
+def _try_fill(order: BasicOrder, bar: Bar) -> Optional[FilledBasicOrder]:
+    fill, filled_class = _FILL_RULES[(order.order_type, order.condition)]
+    filled = fill(order, bar)
+    if filled is None:
         return None
+    order.filled()
+    return filled_class.from_order(order, filled.price, filled.n_shares,
+                                   bar.time)
 
 
-def _sell_market(n_shares: int, bar: Bar):
-    # logger.debug('SellMarketOrder filled.')
-    return Filled(bar.open, n_shares)
+def _pop_due(heap: List[Tuple[int, int, BasicOrder]],
+             bar_index: int) -> List[BasicOrder]:
+    """Pops the orders due by `bar_index` which are still open."""
+    orders = []
+    while heap and heap[0][0] <= bar_index:
+        order = heappop(heap)[2]
+        if order.status == OrderStatus.OPEN:
+            orders.append(order)
+    return orders
 
 
-def _sell_stop(price: Decimal, n_shares: int, bar: Bar):
-    if bar.low <= price <= bar.high:
-        return Filled(price, n_shares)
-    else:
-        return None
+def _replaced(order: BasicOrderWithPrice, replacement: OrderReplacement,
+              time_: float) -> BasicOrderWithPrice:
+    price = order.price if replacement.price is None else replacement.price
+    n_shares = order.n_shares if replacement.n_shares is None \
+        else replacement.n_shares
+    return type(order)(time_, order.product_id, n_shares, price,
+                       order.nth_bar, replacement.new_order_id) \
+        .attach_bracket(order.bracket) \
+        .set_time_in_force(order.time_in_force)
+
+
+def _fill_at_open(order: BasicOrder, bar: Bar) -> Optional[Filled]:
+    return Filled(bar.open, order.n_shares)
+
+
+def _fill_at_price(order: BasicOrderWithPrice, bar: Bar) -> Optional[Filled]:
+    # limit and stop orders are filled alike if the price is within the bar
+    if bar.low <= order.price <= bar.high:
+        return Filled(order.price, order.n_shares)
+    return None
+
+
+# (side, condition) -> how an order is filled, and the class of the filled
+# order
+_FILL_RULES: Dict[Tuple[OrderType, OrderCondition],
+                  Tuple[Callable[[BasicOrder, Bar], Optional[Filled]],
+                        Type[FilledBasicOrder]]] = {
+    (OrderType.BUY, OrderCondition.LIMIT):
+        (_fill_at_price, FilledBuyLimitOrder),
+    (OrderType.BUY, OrderCondition.MARKET):
+        (_fill_at_open, FilledBuyMarketOrder),
+    (OrderType.BUY, OrderCondition.STOP):
+        (_fill_at_price, FilledBuyStopOrder),
+    (OrderType.SELL, OrderCondition.LIMIT):
+        (_fill_at_price, FilledSellLimitOrder),
+    (OrderType.SELL, OrderCondition.MARKET):
+        (_fill_at_open, FilledSellMarketOrder),
+    (OrderType.SELL, OrderCondition.STOP):
+        (_fill_at_price, FilledSellStopOrder),
+}
 
 
 # TODO: delete if unnecessary
 def _create_open_order(timestamp: float, product_id: int, n_shares: int,
                        nth_bar: int, type_: OrderType,
                        condition: OrderCondition,
-                       price: Optional[Decimal] = None) -> BasicOrder:
+                       price: Optional[Price] = None) -> BasicOrder:
     if type_ == OrderType.BUY:
         if condition == OrderCondition.LIMIT:
             return BuyLimitOrder(timestamp, product_id, n_shares, price,
@@ -0,0 +1,263 @@
+import math
+from logging import getLogger
+from typing import Dict, List, Optional, Sequence
+
+from tmtrader._typing import ArrayLike
+from tmtrader.entity.price import Bar, PriceRingBuffer, PriceSequence
+from tmtrader.exchange_for_backtest.price_stream import PriceStream
+from tmtrader.indicator.indicator import IndicatorSpec
+from tmtrader.usecase.price_feed import PriceObserver
+
+logger = getLogger(__name__)
+
+# the number of completed bars kept for each higher timeframe
+N_TIMEFRAME_BARS = 100
+
+
+class TimeframeAggregator:
+    """Builds bars of a higher timeframe incrementally from base bars.
+
+    A higher timeframe bar covers `[k * period, (k + 1) * period)` in the
+    unit of the `Time` column and is closed together with the last base bar
+    inside that range, so it is available on the same update as that base
+    bar. When the base period is not given, the smallest time difference
+    between consecutive base bars seen so far is used.
+    """
+
+    def __init__(self, period: float, n_bars: int = N_TIMEFRAME_BARS,
+                 base_period: Optional[float] = None):
+        if period <= 0:
+            raise ValueError(f'period must be positive, but got {period}.')
+        self.__period = period
+        self.__base_period = base_period
+        self.__infer_base_period = base_period is None
+        self.__bars = PriceRingBuffer(n_bars)
+        self.__bucket: Optional[int] = None
+        # open, high, low, close, vol and time of the forming bar
+        self.__forming: Optional[List[float]] = None
+        self.__last_time: Optional[float] = None
+        self.__is_new_bar = False
+
+    @property
+    def period(self) -> float:
+        return self.__period
+
+    @property
+    def bars(self) -> PriceSequence:
+        """completed bars ordered from the latest bar to the oldest bar"""
+        return self.__bars
+
+    @property
+    def is_new_bar(self) -> bool:
+        """True if a bar has been completed by the last update"""
+        return self.__is_new_bar
+
+    def reset(self):
+        self.__bars.clear()
+        self.__bucket = None
+        self.__forming = None
+        self.__last_time = None
+        self.__is_new_bar = False
+        if self.__infer_base_period:
+            self.__base_period = None
+
+    def update(self, open_: float, high: float, low: float, close: float,
+               vol: float, time_: float):
+        self.__is_new_bar = False
+        if self.__infer_base_period and self.__last_time is not None:
+            diff = time_ - self.__last_time
+            if diff > 0 and (self.__base_period is None
+                             or diff < self.__base_period):
+                self.__base_period = diff
+        self.__last_time = time_
+
+        bucket = math.floor(time_ / self.__period)
+        forming = self.__forming
+        if forming is not None and bucket != self.__bucket:
+            # a gap skipped the end of the forming bar
+            self.__close()
+            forming = None
+
+        if forming is None:
+            self.__bucket = bucket
+            self.__forming = [open_, high, low, close, vol,
+                              bucket * self.__period]
+        else:
+            if high > forming[1]:
+                forming[1] = high
+            if low < forming[2]:
+                forming[2] = low
+            forming[3] = close
+            forming[4] += vol
+
+        if self.__base_period is not None \
+                and time_ + self.__base_period >= (bucket + 1) * self.__period:
+            self.__close()
+
+    def __close(self):
+        self.__bars.push(self.__forming)
+        self.__forming = None
+        self.__is_new_bar = True
+
+
+class MultiTimeframePriceSequence(PriceSequence):
+    """Base price sequence together with bars of higher timeframes."""
+
+    def __init__(self, base: Optional[PriceSequence],
+                 timeframes: Dict[float, TimeframeAggregator]):
+        self.__base = base
+        self.__timeframes = timeframes
+        self.__views = dict()
+
+    def timeframe(self, period: float) -> PriceSequence:
+        """Returns the completed bars of the timeframe of `period`."""
+        return self.__aggregator(period).bars
+
+    def is_new_bar(self, period: float) -> bool:
+        """Returns True if a bar of the timeframe of `period` has been
+        completed by the latest base bar."""
+        return self.__aggregator(period).is_new_bar
+
+    def with_depth(self, n_bars: int) -> PriceSequence:
+        view = self.__views.get(n_bars)
+        if view is None:
+            view = MultiTimeframePriceSequence(None, self.__timeframes)
+            self.__views[n_bars] = view
+        view._set_base(self.__base.with_depth(n_bars))
+        return view
+
+    def history(self, n_bars: int) -> PriceSequence:
+        return MultiTimeframePriceSequence(self.__base.history(n_bars),
+                                           self.__timeframes)
+
+    def indicator(self, spec, output: Optional[str] = None) -> ArrayLike:
+        return self.__base.indicator(spec, output)
+
+    def _set_base(self, base: PriceSequence):
+        self.__base = base
+
+    def __aggregator(self, period: float) -> TimeframeAggregator:
+        try:
+            return self.__timeframes[period]
+        except KeyError:
+            raise ValueError(
+                f'timeframe of period `{period}` is not aggregated. '
+                f'Available periods: {list(self.__timeframes.keys())}.')
+
+    @property
+    def _open(self):
+        pass
+
+    @_open.getter
+    def open(self) -> ArrayLike:
+        return self.__base.open
+
+    @property
+    def _high(self):
+        pass
+
+    @_high.getter
+    def high(self) -> ArrayLike:
+        return self.__base.high
+
+    @property
+    def _low(self):
+        pass
+
+    @_low.getter
+    def low(self) -> ArrayLike:
+        return self.__base.low
+
+    @property
+    def _close(self):
+        pass
+
+    @_close.getter
+    def close(self) -> ArrayLike:
+        return self.__base.close
+
+    @property
+    def _vol(self):
+        pass
+
+    @_vol.getter
+    def vol(self) -> ArrayLike:
+        return self.__base.vol
+
+    @property
+    def _time(self):
+        pass
+
+    @_time.getter
+    def time(self) -> ArrayLike:
+        return self.__base.time
+
+
+class AggregatedPriceStream(PriceStream, PriceObserver):
+    """Price stream which adds bars of higher timeframes to the price
+    updates of another stream."""
+
+    def __init__(self, price_stream: PriceStream, periods: List[float],
+                 n_bars: int = N_TIMEFRAME_BARS,
+                 base_period: Optional[float] = None):
+        """
+        :param price_stream: the stream of base bars
+        :param periods: periods of the higher timeframes in the unit of the
+            `Time` column
+        :param n_bars: the number of completed bars kept for each timeframe
+        :param base_period: the period of the base bars. If None, it is
+            inferred from the base bars.
+        """
+        super().__init__()
+        self.__price_stream = price_stream
+        self.__timeframes = {p: TimeframeAggregator(p, n_bars, base_period)
+                             for p in periods}
+        self.__aggregators = list(self.__timeframes.values())
+        self.__seq = MultiTimeframePriceSequence(None, self.__timeframes)
+        price_stream.add_price_observer(self)
+
+    def start_feed(self):
+        for a in self.__aggregators:
+            a.reset()
+        self.__price_stream.start_feed()
+
+    def set_n_past_bars(self, n_bars: int):
+        self.__price_stream.set_n_past_bars(n_bars)
+
+    def set_time_range(self, start: Optional[float] = None,
+                       end: Optional[float] = None):
+        self.__price_stream.set_time_range(start, end)
+
+    def precompute_indicators(self, specs: Sequence[IndicatorSpec]
+                              ) -> List[IndicatorSpec]:
+        return self.__price_stream.precompute_indicators(specs)
+
+    def bars_before_feed(self) -> Optional[Sequence[ArrayLike]]:
+        return self.__price_stream.bars_before_feed()
+
+    def get_latest_bars(self, n_bars: int = 1) -> PriceSequence:
+        return self.__price_stream.get_latest_bars(n_bars)
+
+    def get_latest_bar_decimal(self,
+                               product_id: Optional[int] = None) -> Bar:
+        return self.__price_stream.get_latest_bar_decimal(product_id)
+
+    def has_latest_bar(self, product_id: Optional[int] = None) -> bool:
+        return self.__price_stream.has_latest_bar(product_id)
+
+    def get_latest_bar_ticks(self,
+                             product_id: Optional[int] = None) -> Bar:
+        return self.__price_stream.get_latest_bar_ticks(product_id)
+
+    def notify_price_update(self, price_ref: PriceSequence):
+        open_ = price_ref.open[0]
+        high = price_ref.high[0]
+        low = price_ref.low[0]
+        close = price_ref.close[0]
+        vol = price_ref.vol[0]
+        time_ = price_ref.time[0]
+        for a in self.__aggregators:
+            a.update(open_, high, low, close, vol, time_)
+
+        self.__seq._set_base(price_ref)
+        self._notify_price_update(self.__seq)
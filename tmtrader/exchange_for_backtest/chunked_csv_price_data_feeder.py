@@ -0,0 +1,197 @@
+from contextlib import closing
+from logging import getLogger
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from tmtrader.entity.price import Bar, PriceSequence, PriceWindow
+from tmtrader.exchange_for_backtest.csv_price_data_feeder import N_PAST_BARS, \
+    _feed_range, _validate_data_layout, _validate_time_range
+from tmtrader.exchange_for_backtest.decimal_bar_table import DecimalBarTable
+from tmtrader.exchange_for_backtest.price_data_index import TIME_COLUMN, \
+    _validate_time_order
+from tmtrader.exchange_for_backtest.price_stream import PriceStream
+from tmtrader.usecase.round_price import RoundPrice
+
+logger = getLogger(__name__)
+
+CHUNK_SIZE = 100_000
+PREFETCH_DEPTH = 1
+_QUEUE_TIMEOUT = 0.1
+
+
+class ChunkedCSVPriceDataFeeder(PriceStream):
+    """Price stream reading a CSV file chunk by chunk.
+
+    Only the current chunk and the last `n_past_bars - 1` bars of the
+    previous chunk are kept in memory, and the next chunk is parsed on a
+    background thread while the bars of the current chunk are fed.
+    Therefore `PriceSequence.history` can only reach back to the start of the
+    bars kept in memory.
+    """
+
+    def __init__(self, file_path: Path, rounder: RoundPrice,
+                 chunk_size: int = CHUNK_SIZE,
+                 prefetch_depth: int = PREFETCH_DEPTH):
+        super().__init__()
+        if chunk_size < 1:
+            raise ValueError(
+                f'chunk_size must be a positive int, but got {chunk_size}.')
+        self.__file_path = file_path
+        self.__chunk_size = chunk_size
+        self.__prefetch_depth = prefetch_depth
+        self.__start: Optional[float] = None
+        self.__end: Optional[float] = None
+        self.__n_past_bars = N_PAST_BARS
+        self.__window: Optional[PriceWindow] = None
+        self.__bars: Optional[DecimalBarTable] = None
+        self.__current_bar_idx = 0
+        self.__rounder = rounder
+
+    def start_feed(self):
+        n_tail = self.__n_past_bars - 1
+        tail = None
+        n_seen = 0
+        chunks = _read_chunks(self.__file_path, self.__chunk_size)
+        with closing(_prefetch(chunks, self.__prefetch_depth)) as prefetched:
+            for chunk in prefetched:
+                n_carried = 0 if tail is None else len(tail)
+                block = chunk if tail is None else np.concatenate(
+                    [tail, chunk])
+                # global index of the first bar in the block
+                offset = n_seen - n_carried
+                n_seen += len(chunk)
+                first, last = _feed_range(block[:, TIME_COLUMN],
+                                          self.__start, self.__end)
+                first = max(n_carried, n_tail - offset, first)
+                if first < last:
+                    self.__feed_block(block, first, last, offset)
+                if last < len(block):
+                    # the rest of the file is after the end
+                    break
+                # copy so that the rest of the block can be released
+                tail = block[len(block) - min(n_tail, len(block)):].copy()
+
+        if n_seen < self.__n_past_bars:
+            logger.warning(
+                f'Not enough data to use. The length of the historical data '
+                f'`{n_seen}` is smaller than the number of '
+                f'past bars to use `{self.__n_past_bars}`.')
+
+    def __feed_block(self, block: np.ndarray, first: int, last: int,
+                     offset: int):
+        window = PriceWindow(block.T, self.__n_past_bars)
+        self.__window = window
+        self.__bars = DecimalBarTable.from_prices(*block.T, self.__rounder,
+                                                  first, last)
+        for idx in range(first, last):
+            logger.debug('%08d', offset + idx)
+            self.__current_bar_idx = idx + 1
+            window.seek(idx)
+            self._notify_price_update(window)
+
+    def set_n_past_bars(self, n_bars: int):
+        if n_bars < 1:
+            raise ValueError(
+                f'n_bars must be a value of positive int larger or equal to '
+                f'1, but got {n_bars}.')
+        self.__n_past_bars = n_bars
+
+    def set_time_range(self, start: Optional[float] = None,
+                       end: Optional[float] = None):
+        _validate_time_range(start, end)
+        self.__start = start
+        self.__end = end
+
+    def get_latest_bars(self, n_bars: int = 1) -> PriceSequence:
+        if n_bars > self.__current_bar_idx:
+            raise ValueError(
+                f'n_bars (={n_bars}) must be smaller or equal to '
+                f'self.__current_bar_idx (={self.__current_bar_idx}).')
+        elif n_bars < 1:
+            raise ValueError(
+                f'n_bars must be a value of positive int larger or equal to '
+                f'1, but got {n_bars}.')
+
+        return self.__window.latest(n_bars)
+
+    def get_latest_bar_decimal(self,
+                               product_id: Optional[int] = None) -> Bar:
+        return self.__bars.bar(self.__current_bar_idx - 1)
+
+    def get_latest_bar_ticks(self,
+                             product_id: Optional[int] = None) -> Bar:
+        return self.__bars.tick_bar(self.__current_bar_idx - 1)
+
+
+def _read_chunks(file_path: Path, chunk_size: int) -> Iterator[np.ndarray]:
+    last_time = None
+    with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+        for df in reader:
+            _validate_data_layout(df)
+            chunk = df.to_numpy(dtype=np.float64)
+            _validate_time_order(chunk[:, TIME_COLUMN], last_time)
+            if len(chunk):
+                last_time = chunk[-1, TIME_COLUMN]
+            yield chunk
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END = object()
+
+
+def _prefetch(items: Iterator, depth: int) -> Iterator:
+    """Runs `items` on a background thread keeping up to `depth` items
+    ahead of the consumer."""
+    if depth < 1:
+        yield from items
+        return
+
+    queue = Queue(maxsize=depth)
+    stopped = Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put(item, timeout=_QUEUE_TIMEOUT)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+            return
+        put(_END)
+
+    producer = Thread(target=produce, name='csv-prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            try:
+                item = queue.get(timeout=_QUEUE_TIMEOUT)
+            except Empty:
+                if not producer.is_alive() and queue.empty():
+                    raise RuntimeError('prefetch thread stopped unexpectedly.')
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
@@ -1,17 +1,29 @@
-from decimal import Decimal
 from logging import getLogger
 from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
-from tmtrader.entity.price import Bar, DefaultPriceSequence, PriceSequence
+from tmtrader._typing import ArrayLike
+from tmtrader.entity.price import Bar, PriceSequence, PriceWindow
+from tmtrader.exchange_for_backtest.decimal_bar_table import DecimalBarTable
+from tmtrader.exchange_for_backtest.price_data_cache import PriceDataCache, \
+    _file_sha256
+from tmtrader.exchange_for_backtest.price_data_index import TIME_COLUMN, \
+    PriceDataIndex, load_index
 from tmtrader.exchange_for_backtest.price_stream import PriceStream
+from tmtrader.indicator.indicator import IndicatorSpec
+from tmtrader.indicator.indicator_cache import IndicatorCache
+from tmtrader.indicator.vectorized import compute
+from tmtrader.usecase.look_ahead import LookAhead, LookAheadData, \
+    next_row
 from tmtrader.usecase.round_price import RoundPrice
 
 logger = getLogger(__name__)
 
-# FIXME: set this value at configuration
+# The default number of past bars. BTTrader replaces it with the largest
+# lookback of the registered strategies.
 N_PAST_BARS = 10
 
 # FIXME: set these values based on the focused product
@@ -20,22 +32,47 @@ MIN_FRAC = 25
 N_FLOAT_DIGITS = 2
 
 
-class CSVPriceDataFeeder(PriceStream):
-    @staticmethod
-    def _read_csv(file_path: Path):
-        df = pd.read_csv(file_path)
-        _validate_data_layout(df)
-        return df.to_numpy()
-
-    def __init__(self, file_path: Path, rounder: RoundPrice):
+class ColumnarPriceDataFeeder(PriceStream):
+    """Price stream of the columns of one price data file.
+
+    Subclasses differ only in how they load the columns, and pass them with
+    the bars rounded to ticks to this class.
+    """
+
+    def __init__(self, file_path: Path, columns: List[np.ndarray],
+                 bars: Optional[DecimalBarTable], rounder: RoundPrice,
+                 cache: Optional[PriceDataCache] = None,
+                 indicator_cache: Optional[IndicatorCache] = None,
+                 contiguous: bool = True):
+        """
+        :param columns: the columns of the file in the order of the headers
+        :param bars: the bars of `columns` rounded to ticks. If None, only
+            the bars to feed are rounded when feeding starts.
+        :param indicator_cache: cache of the indicators computed by
+            `precompute_indicators`
+        :param contiguous: see `PriceWindow`
+        """
         super().__init__()
-        self.__price_seq = self._read_csv(file_path)
-        self.__n_past_bars = N_PAST_BARS
-        self.__current_bar_idx = self.__n_past_bars
+        self.__file_path = file_path
+        self.__indicator_cache = indicator_cache
+        self.__fingerprint: Optional[str] = None
+        self.__cache = cache
+        self.__index = load_index(columns, file_path, cache)
+        self.__time = columns[TIME_COLUMN]
+        self.__start: Optional[float] = None
+        self.__end: Optional[float] = None
+        self.__look_aheads: List[LookAhead] = list()
         self.__rounder = rounder
+        self.__n_past_bars = N_PAST_BARS
+        self.__window = PriceWindow(columns, self.__n_past_bars,
+                                    contiguous=contiguous)
+        self.__bars = bars
+        self.__rounds_on_feed = bars is None
+        self.__current_bar_idx = min(self.__n_past_bars, self.__window.n_rows)
+        self.__window.seek(self.__current_bar_idx - 1)
 
     def start_feed(self):
-        seq_len = self.__price_seq.shape[0]
+        seq_len = self.__window.n_rows
         if seq_len < self.__n_past_bars:
             logger.warning(
                 f'Not enough data to use. The length of the historical data '
@@ -43,12 +80,65 @@ class CSVPriceDataFeeder(PriceStream):
                 f'past bars to use `{self.__n_past_bars}`.')
             return
 
-        for idx in range(self.__n_past_bars - 1, seq_len):
-            logger.debug(f'{idx:08d} / {seq_len:08d}')
-            start = idx - (self.__n_past_bars - 1)
+        idx, last = self.__feed_range()
+        window = self.__window
+        if self.__rounds_on_feed:
+            self.__bars = DecimalBarTable.from_prices(
+                *window.columns, self.__rounder, idx, last)
+        data = None
+        if self.__look_aheads:
+            # the rows after the range are not searched, and may not be
+            # rounded
+            data = LookAheadData(self.__bars.ticks[:last],
+                                 np.asarray(self.__time)[:last],
+                                 self.__rounder)
+        while idx < last:
+            logger.debug('%08d / %08d', idx, seq_len)
             self.__current_bar_idx = idx + 1
-            seq = np.flipud(self.__price_seq[start:self.__current_bar_idx])
-            self._notify_price_update(DefaultPriceSequence(seq))
+            window.seek(idx)
+            self._notify_price_update(window)
+            idx = next_row(self.__look_aheads, idx, data, last)
+
+    def __feed_range(self) -> Tuple[int, int]:
+        first, last = _feed_range(self.__time, self.__start, self.__end)
+        return max(self.__n_past_bars - 1, first), last
+
+    def set_n_past_bars(self, n_bars: int):
+        if n_bars < 1:
+            raise ValueError(
+                f'n_bars must be a value of positive int larger or equal to '
+                f'1, but got {n_bars}.')
+        self.__n_past_bars = n_bars
+        self.__window.set_n_bars(n_bars)
+
+    def set_time_range(self, start: Optional[float] = None,
+                       end: Optional[float] = None):
+        _validate_time_range(start, end)
+        self.__start = start
+        self.__end = end
+
+    def set_look_ahead(self, look_aheads: Sequence[LookAhead]):
+        self.__look_aheads = list(look_aheads)
+
+    def precompute_indicators(self, specs: Sequence[IndicatorSpec]
+                              ) -> List[IndicatorSpec]:
+        columns = self.__window.columns
+        for spec in specs:
+            self.__window.add_indicator(
+                spec, _compute_indicator(spec, columns,
+                                         self.__indicator_cache,
+                                         self.__data_fingerprint))
+        return list(specs)
+
+    def bars_before_feed(self) -> Optional[Sequence[ArrayLike]]:
+        first, _ = self.__feed_range()
+        return [c[:first] for c in self.__window.columns[:TIME_COLUMN]]
+
+    def __data_fingerprint(self) -> str:
+        if self.__fingerprint is None:
+            self.__fingerprint = _data_fingerprint(self.__file_path,
+                                                   self.__cache)
+        return self.__fingerprint
 
     def get_latest_bars(self, n_bars: int = 1) -> PriceSequence:
         if n_bars > self.__current_bar_idx:
@@ -60,19 +150,83 @@ class CSVPriceDataFeeder(PriceStream):
                 f'n_bars must be a value of positive int larger or equal to '
                 f'1, but got {n_bars}.')
 
-        start = self.__current_bar_idx - n_bars
+        return self.__window.latest(n_bars)
+
+    @property
+    def index(self) -> PriceDataIndex:
+        return self.__index
+
+    def get_latest_bar_decimal(self,
+                               product_id: Optional[int] = None) -> Bar:
+        return self.__bars.bar(self.__current_bar_idx - 1)
+
+    def get_latest_bar_ticks(self,
+                             product_id: Optional[int] = None) -> Bar:
+        return self.__bars.tick_bar(self.__current_bar_idx - 1)
+
+
+class CSVPriceDataFeeder(ColumnarPriceDataFeeder):
+    @staticmethod
+    def _read_columns(file_path: Path,
+                      cache: Optional[PriceDataCache] = None
+                      ) -> List[np.ndarray]:
+        if cache is None:
+            df = _parse_csv(file_path)
+            return [df[c].to_numpy() for c in df.columns]
+
+        return list(cache.load(file_path, _parse_csv).values())
+
+    def __init__(self, file_path: Path, rounder: RoundPrice,
+                 cache: Optional[PriceDataCache] = None,
+                 indicator_cache: Optional[IndicatorCache] = None):
+        """
+        :param indicator_cache: cache of the indicators computed by
+            `precompute_indicators`
+        """
+        columns = self._read_columns(file_path, cache)
+        super().__init__(file_path, columns, None, rounder, cache,
+                         indicator_cache)
+
+
+def _feed_range(time_: ArrayLike, start: Optional[float],
+                end: Optional[float]) -> Tuple[int, int]:
+    """Returns the range of rows whose time is in `[start, end)` by binary
+    search over the sorted `time_`."""
+    first = 0 if start is None else int(np.searchsorted(time_, start))
+    last = len(time_) if end is None else int(np.searchsorted(time_, end))
+    return first, last
+
+
+def _validate_time_range(start: Optional[float], end: Optional[float]):
+    if start is not None and end is not None and start >= end:
+        raise ValueError(
+            f'start must be earlier than end, but got start `{start}` and '
+            f'end `{end}`.')
+
+
+def _compute_indicator(spec: IndicatorSpec, columns: Sequence[ArrayLike],
+                       indicator_cache: Optional[IndicatorCache],
+                       fingerprint: Callable[[], str]) -> np.ndarray:
+    if indicator_cache is None:
+        return compute(spec, columns)
+    return indicator_cache.get(fingerprint(), spec,
+                               lambda: compute(spec, columns))
+
+
+def _data_fingerprint(file_path: Path,
+                      cache: Optional[PriceDataCache] = None) -> str:
+    """Returns the content hash of the price data, which is stored in the
+    cache if the data is cached."""
+    meta = cache.meta(file_path) if cache is not None else None
+    if meta is not None:
+        return meta.sha256
+    return _file_sha256(file_path)
 
-        return DefaultPriceSequence(
-            np.flipud(self.__price_seq[start:self.__current_bar_idx]))
 
-    def get_latest_bar_decimal(self) -> Bar:
-        bar = self.get_latest_bars(1)
-        return Bar(self.__rounder.round2fraction(Decimal(bar.open[0])),
-                   self.__rounder.round2fraction(Decimal(bar.high[0])),
-                   self.__rounder.round2fraction(Decimal(bar.low[0])),
-                   self.__rounder.round2fraction(Decimal(bar.close[0])),
-                   int(bar.vol[0]),
-                   int(bar.time[0]))
+def _parse_csv(file_path: Path) -> pd.DataFrame:
+    df = pd.read_csv(file_path)
+    _validate_data_layout(df)
+    return df
 
 
 def _validate_data_layout(df: pd.DataFrame, headers=None):
@@ -0,0 +1,91 @@
+from typing import Optional
+
+import numpy as np
+
+from tmtrader._typing import ArrayLike
+from tmtrader.entity.price import Bar
+from tmtrader.usecase.round_price import RoundPrice
+
+
+class DecimalBarTable:
+    """Bars whose prices are rounded to the tick grid of a product at once.
+
+    The prices are kept as int64 tick counts and converted to Decimal only
+    when a bar is requested. The last requested bar is memoized because the
+    broker asks for the same bar repeatedly while it is the latest one.
+    """
+
+    def __init__(self, ticks: ArrayLike, vol: ArrayLike, time_: ArrayLike,
+                 rounder: RoundPrice):
+        """
+        :param ticks: 2d-array of tick counts of Open, High, Low and Close
+        """
+        self.__ticks = ticks
+        self.__vol = vol
+        self.__time = time_
+        self.__rounder = rounder
+        self.__last_idx: Optional[int] = None
+        self.__last_bar: Optional[Bar] = None
+        self.__last_tick_idx: Optional[int] = None
+        self.__last_tick_bar: Optional[Bar] = None
+
+    @classmethod
+    def from_prices(cls, open_: ArrayLike, high: ArrayLike, low: ArrayLike,
+                    close: ArrayLike, vol: ArrayLike, time_: ArrayLike,
+                    rounder: RoundPrice, first: int = 0,
+                    last: Optional[int] = None) -> 'DecimalBarTable':
+        """
+        :param first: the first row to round
+        :param last: the row after the last row to round. The rows out of
+            `[first, last)` are not rounded and must not be requested.
+        """
+        n_rows = len(open_)
+        last = n_rows if last is None else last
+        if first == 0 and last == n_rows:
+            return cls(round_ohlc(open_, high, low, close, rounder), vol,
+                       time_, rounder)
+        # the memory of the rows left out is never written, so that the OS
+        # does not allocate it
+        ticks = np.empty((n_rows, 4), dtype=np.int64)
+        ticks[first:last] = round_ohlc(open_[first:last], high[first:last],
+                                       low[first:last], close[first:last],
+                                       rounder)
+        return cls(ticks, vol, time_, rounder)
+
+    @property
+    def ticks(self) -> ArrayLike:
+        return self.__ticks
+
+    def bar(self, idx: int) -> Bar:
+        if idx != self.__last_idx:
+            ticks = self.__ticks[idx]
+            to_decimal = self.__rounder.ticks2decimal
+            self.__last_bar = Bar(to_decimal(ticks[0]),
+                                  to_decimal(ticks[1]),
+                                  to_decimal(ticks[2]),
+                                  to_decimal(ticks[3]),
+                                  int(self.__vol[idx]),
+                                  int(self.__time[idx]))
+            self.__last_idx = idx
+        return self.__last_bar
+
+    def tick_bar(self, idx: int) -> Bar:
+        """Returns the bar whose prices are int tick counts."""
+        if idx != self.__last_tick_idx:
+            ticks = self.__ticks[idx]
+            self.__last_tick_bar = Bar(int(ticks[0]),
+                                       int(ticks[1]),
+                                       int(ticks[2]),
+                                       int(ticks[3]),
+                                       int(self.__vol[idx]),
+                                       int(self.__time[idx]))
+            self.__last_tick_idx = idx
+        return self.__last_tick_bar
+
+
+def round_ohlc(open_: ArrayLike, high: ArrayLike, low: ArrayLike,
+               close: ArrayLike, rounder: RoundPrice) -> np.ndarray:
+    ticks = np.empty((len(open_), 4), dtype=np.int64)
+    for i, prices in enumerate([open_, high, low, close]):
+        ticks[:, i] = rounder.round2ticks(prices)
+    return ticks
@@ -0,0 +1,39 @@
+from pathlib import Path
+from typing import Optional
+
+from tmtrader.exchange_for_backtest.csv_price_data_feeder import \
+    ColumnarPriceDataFeeder, _parse_csv
+from tmtrader.exchange_for_backtest.decimal_bar_table import DecimalBarTable, \
+    round_ohlc
+from tmtrader.exchange_for_backtest.price_data_cache import PriceDataCache
+from tmtrader.indicator.indicator_cache import IndicatorCache
+from tmtrader.usecase.round_price import RoundPrice
+
+
+class MemmapPriceDataFeeder(ColumnarPriceDataFeeder):
+    """Price stream backed by memory-mapped columnar files.
+
+    The source CSV file is converted into the columnar cache once, and the
+    cached columns are memory-mapped read-only, so that the OS pages bars in
+    on demand and several processes share the same physical pages.
+    """
+
+    def __init__(self, file_path: Path, rounder: RoundPrice,
+                 cache: Optional[PriceDataCache] = None,
+                 indicator_cache: Optional[IndicatorCache] = None):
+        """
+        :param indicator_cache: cache of the indicators computed by
+            `precompute_indicators`
+        """
+        if cache is None:
+            cache = PriceDataCache()
+        columns = list(cache.load(file_path, _parse_csv, mmap=True).values())
+        ticks = cache.load_derived(
+            file_path,
+            f'ticks-{rounder.min_frac}-{rounder.n_float_digits}',
+            lambda: round_ohlc(*columns[:4], rounder), mmap=True)
+        # reversed views keep the columns memory-mapped instead of copying
+        super().__init__(file_path, columns,
+                         DecimalBarTable(ticks, columns[4], columns[5],
+                                         rounder),
+                         rounder, cache, indicator_cache, contiguous=False)
@@ -0,0 +1,180 @@
+import heapq
+from itertools import groupby
+from logging import getLogger
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from tmtrader.entity.price import Bar, MultiPriceSequence, PriceRingBuffer, \
+    PriceSequence
+from tmtrader.exchange_for_backtest.chunked_csv_price_data_feeder import \
+    CHUNK_SIZE, PREFETCH_DEPTH, _prefetch, _read_chunks
+from tmtrader.exchange_for_backtest.csv_price_data_feeder import N_PAST_BARS, \
+    _validate_time_range
+from tmtrader.exchange_for_backtest.decimal_bar_table import DecimalBarTable
+from tmtrader.exchange_for_backtest.price_data_index import TIME_COLUMN
+from tmtrader.exchange_for_backtest.price_stream import PriceStream
+from tmtrader.usecase.round_price import RoundPrice
+
+logger = getLogger(__name__)
+
+# (time, product id, bar, the table of the chunk of the bar, its row)
+_TaggedBar = Tuple[float, int, np.ndarray, DecimalBarTable, int]
+
+
+class MultiCSVPriceDataFeeder(PriceStream):
+    """Price stream of several products, one CSV file per product.
+
+    The files are read chunk by chunk and merged lazily by the `Time` column
+    with a heap-based k-way merge. A `MultiPriceSequence` of all products is
+    fed for every timestamp once every product has enough past bars.
+    The first product is the primary product. Products without a bar at a
+    timestamp keep their last bar, and `has_latest_bar` tells them apart.
+    Each chunk is rounded to ticks once, on the background thread reading
+    it. The files are read sequentially, so the bars before the start of
+    the time range are parsed too, but they are only kept as past bars and
+    not rounded.
+    """
+
+    def __init__(self, file_paths: Dict[int, Path],
+                 rounders: Dict[int, RoundPrice],
+                 chunk_size: int = CHUNK_SIZE,
+                 prefetch_depth: int = PREFETCH_DEPTH):
+        """
+        :param file_paths: dict of product id to the price data file
+        :param rounders: dict of product id to the price rounder
+        """
+        super().__init__()
+        if not file_paths:
+            raise ValueError('file_paths must not be empty.')
+        if set(file_paths.keys()) != set(rounders.keys()):
+            raise ValueError(
+                'file_paths and rounders must have the same product ids.')
+        self.__file_paths = file_paths
+        self.__rounders = rounders
+        self.__chunk_size = chunk_size
+        self.__prefetch_depth = prefetch_depth
+        self.__primary = next(iter(file_paths.keys()))
+        self.__start: Optional[float] = None
+        self.__end: Optional[float] = None
+        self.__n_past_bars = N_PAST_BARS
+        self.__buffers: Dict[int, PriceRingBuffer] = dict()
+        # product id -> (table, row) of the last bar of the product
+        self.__latest: Dict[int, Tuple[DecimalBarTable, int]] = dict()
+        self.__snapshot: Optional[MultiPriceSequence] = None
+        # the time of the latest price update
+        self.__time: Optional[float] = None
+        self.__init_buffers()
+
+    def start_feed(self):
+        for buf in self.__buffers.values():
+            buf.clear()
+        self.__latest.clear()
+        self.__time = None
+        buffers = self.__buffers
+        latest = self.__latest
+        snapshot = self.__snapshot
+        start = self.__start
+        end = self.__end
+        ready = False
+
+        merged = heapq.merge(*[self.__tagged_bars(pid) for pid in
+                               self.__file_paths.keys()])
+        for t, bars in groupby(merged, key=itemgetter(0)):
+            if end is not None and t >= end:
+                break
+            for _, pid, bar, table, row in bars:
+                buffers[pid].push(bar)
+                latest[pid] = (table, row)
+            if not ready:
+                ready = all(b.len >= self.__n_past_bars for b in
+                            buffers.values())
+                if not ready:
+                    continue
+            if start is not None and t < start:
+                continue
+            self.__time = t
+            logger.debug('%s', t)
+            self._notify_price_update(snapshot)
+
+        if not ready:
+            logger.warning(
+                f'Not enough data to use. Some product has less historical '
+                f'data than the number of past bars to use '
+                f'`{self.__n_past_bars}`.')
+
+    def set_n_past_bars(self, n_bars: int):
+        if n_bars < 1:
+            raise ValueError(
+                f'n_bars must be a value of positive int larger or equal to '
+                f'1, but got {n_bars}.')
+        self.__n_past_bars = n_bars
+        self.__init_buffers()
+
+    def set_time_range(self, start: Optional[float] = None,
+                       end: Optional[float] = None):
+        _validate_time_range(start, end)
+        self.__start = start
+        self.__end = end
+
+    def get_latest_bars(self, n_bars: int = 1) -> PriceSequence:
+        if n_bars < 1:
+            raise ValueError(
+                f'n_bars must be a value of positive int larger or equal to '
+                f'1, but got {n_bars}.')
+
+        return self.__snapshot.history(n_bars)
+
+    def get_latest_bar_decimal(self,
+                               product_id: Optional[int] = None) -> Bar:
+        table, row = self.__latest[self.__validate_product_id(product_id)]
+        return table.bar(row)
+
+    def has_latest_bar(self, product_id: Optional[int] = None) -> bool:
+        product_id = self.__validate_product_id(product_id)
+        buf = self.__buffers[product_id]
+        return buf.len > 0 and buf.time[0] == self.__time
+
+    def get_latest_bar_ticks(self,
+                             product_id: Optional[int] = None) -> Bar:
+        table, row = self.__latest[self.__validate_product_id(product_id)]
+        return table.tick_bar(row)
+
+    @property
+    def product_ids(self) -> List[int]:
+        return list(self.__file_paths.keys())
+
+    def __validate_product_id(self, product_id: Optional[int]) -> int:
+        if product_id is None:
+            return self.__primary
+        if product_id not in self.__buffers:
+            raise ValueError(
+                f'product id `{product_id}` is not fed by this stream.')
+        return product_id
+
+    def __init_buffers(self):
+        self.__buffers = {pid: PriceRingBuffer(self.__n_past_bars) for pid in
+                          self.__file_paths.keys()}
+        self.__snapshot = MultiPriceSequence(dict(self.__buffers),
+                                             self.__primary)
+
+    def __tagged_bars(self, product_id: int) -> Iterator[_TaggedBar]:
+        chunks = self.__rounded_chunks(product_id)
+        for chunk, table in _prefetch(chunks, self.__prefetch_depth):
+            for row, bar in enumerate(chunk):
+                yield bar[TIME_COLUMN], product_id, bar, table, row
+
+    def __rounded_chunks(self, product_id: int
+                         ) -> Iterator[Tuple[np.ndarray, DecimalBarTable]]:
+        rounder = self.__rounders[product_id]
+        for chunk in _read_chunks(self.__file_paths[product_id],
+                                  self.__chunk_size):
+            first = 0
+            if self.__start is not None:
+                # the last bar before `start` may still be the latest bar of
+                # the product when feeding starts
+                first = max(int(np.searchsorted(chunk[:, TIME_COLUMN],
+                                                self.__start)) - 1, 0)
+            yield chunk, DecimalBarTable.from_prices(*chunk.T, rounder, first)
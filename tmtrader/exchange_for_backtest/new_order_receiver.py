@@ -1,13 +1,19 @@
 from typing import List
 
-from tmtrader.entity.order import BasicOrder
-from tmtrader.usecase.send_order import OrderObserver, OrderSender
+from tmtrader.entity.order import BasicOrder, OrderReplacement
+from tmtrader.usecase.send_order import OrderChangeObserver, \
+    OrderObserver, OrderSender
 
 
-class NewOrderReceiver(OrderSender, OrderObserver):
+class NewOrderReceiver(OrderSender, OrderObserver, OrderChangeObserver):
     def __init__(self):
         super().__init__()
 
     def notify_new_orders(self, orders: List[BasicOrder]):
         self._notify_new_orders(orders)
 
+    def notify_cancel_orders(self, order_ids: List[int]):
+        self._notify_cancel_orders(order_ids)
+
+    def notify_replace_orders(self, replacements: List[OrderReplacement]):
+        self._notify_replace_orders(replacements)
@@ -0,0 +1,81 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from math import inf
+from typing import Dict, List, Set, Tuple
+
+from tmtrader._typing import Price
+from tmtrader.entity.order import BasicOrderWithPrice
+
+# the price and the sequence number of an order
+_Key = Tuple[Price, int]
+# product id and whether orders are buy orders
+_Side = Tuple[int, bool]
+
+
+class OrderBook:
+    """Resting limit and stop orders sorted by price per product and side.
+
+    Limit and stop orders are both filled if their price is within the range
+    of the bar, so the orders to fill on a bar are found with two binary
+    searches per side instead of trying every order.
+    """
+
+    def __init__(self):
+        self.__keys: Dict[_Side, List[_Key]] = dict()
+        self.__orders: Dict[int, BasicOrderWithPrice] = dict()
+        # id of an order -> its side and key
+        self.__entries: Dict[int, Tuple[_Side, _Key]] = dict()
+        self.__seq = count()
+
+    def __len__(self) -> int:
+        return len(self.__orders)
+
+    @property
+    def product_ids(self) -> Set[int]:
+        """ids of the products which have resting orders"""
+        return {side[0] for side, keys in self.__keys.items() if keys}
+
+    def prices(self) -> List[Price]:
+        return [k[0] for keys in self.__keys.values() for k in keys]
+
+    def add(self, order: BasicOrderWithPrice):
+        side = (order.product_id, order.is_buy)
+        key = (order.price, next(self.__seq))
+        insort(self.__keys.setdefault(side, list()), key)
+        self.__orders[key[1]] = order
+        self.__entries[id(order)] = (side, key)
+
+    def remove(self, order: BasicOrderWithPrice) -> bool:
+        """
+        :return: False if `order` is not in the book
+        """
+        entry = self.__entries.pop(id(order), None)
+        if entry is None:
+            return False
+        side, key = entry
+        keys = self.__keys[side]
+        del keys[bisect_left(keys, key)]
+        del self.__orders[key[1]]
+        return True
+
+    def pop_touched(self, ranges: Dict[int, Tuple[Price, Price]]) \
+            -> List[BasicOrderWithPrice]:
+        """Removes and returns the orders whose price is within the range of
+        their product, in the order they were added.
+
+        :param ranges: product id -> the low and the high of the bar
+        """
+        seqs = []
+        for (product_id, _), keys in self.__keys.items():
+            if not keys or product_id not in ranges:
+                continue
+            low, high = ranges[product_id]
+            begin = bisect_left(keys, (low, -1))
+            end = bisect_right(keys, (high, inf))
+            seqs.extend([k[1] for k in keys[begin:end]])
+            del keys[begin:end]
+        seqs.sort()
+        orders = [self.__orders.pop(s) for s in seqs]
+        for o in orders:
+            del self.__entries[id(o)]
+        return orders
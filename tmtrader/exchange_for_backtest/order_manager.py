@@ -1,42 +1,77 @@
-from typing import List
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 
 from tmtrader.entity.order import BasicOrder, FilledBasicOrder
 from tmtrader.entity.trade import Trade
 
 
 class OrderManager:
+    """Orders and trades of a trader.
+
+    Orders are registered by their ids, so that an order moves from the open
+    orders to the filled or cancelled orders in constant time, and the open
+    orders are counted per product and side.
+    """
+
     def __init__(self):
-        self.__open_orders: List[BasicOrder] = list()
-        self.__filled_orders: List[FilledBasicOrder] = list()
+        self.__open_orders: Dict[int, BasicOrder] = dict()
+        self.__filled_orders: Dict[int, FilledBasicOrder] = dict()
 
         # TODO: refactor and define ClosedOrder and CancelledOrder
-        self.__cancelled_orders: List[BasicOrder] = list()
+        self.__cancelled_orders: Dict[int, BasicOrder] = dict()
         self.__trades: List[Trade] = list()
+        # (product id, is buy) -> the number of open orders
+        self.__n_open_orders: Dict[Tuple[int, bool], int] = defaultdict(int)
 
     @property
     def open_orders(self) -> List[BasicOrder]:
-        return self.__open_orders
+        return list(self.__open_orders.values())
 
     @property
     def filled_orders(self) -> List[FilledBasicOrder]:
-        return self.__filled_orders
+        return list(self.__filled_orders.values())
 
     @property
     def cancelled_orders(self) -> List[BasicOrder]:
-        return self.__cancelled_orders
+        return list(self.__cancelled_orders.values())
 
     @property
     def trades(self) -> List[Trade]:
         return self.__trades
 
+    def get_open_order(self, order_id: int) -> Optional[BasicOrder]:
+        return self.__open_orders.get(order_id)
+
+    def count_open_orders(self, is_buy: bool,
+                          product_id: Optional[int] = None) -> int:
+        """
+        :param product_id: if None, the open orders of all products are
+            counted
+        """
+        if product_id is not None:
+            return self.__n_open_orders[(product_id, is_buy)]
+        return sum([n for (_, b), n in self.__n_open_orders.items()
+                    if b == is_buy])
+
     def add_open_orders(self, orders: List[BasicOrder]):
-        self.__open_orders.extend(orders)
+        for o in orders:
+            self.__open_orders[o.order_id] = o
+            self.__n_open_orders[(o.product_id, o.is_buy)] += 1
 
     def add_filled_orders(self, orders: List[FilledBasicOrder]):
-        self.__filled_orders.extend(orders)
+        for o in orders:
+            self.__filled_orders[o.order_id] = o
+            self.__close(o.order_id)
 
     def add_cancelled_orders(self, orders: List[BasicOrder]):
-        self.__cancelled_orders.extend(orders)
+        for o in orders:
+            self.__cancelled_orders[o.order_id] = o
+            self.__close(o.order_id)
 
     def add_trades(self, trades: List[Trade]):
         self.__trades.extend(trades)
+
+    def __close(self, order_id: int):
+        order = self.__open_orders.pop(order_id, None)
+        if order is not None:
+            self.__n_open_orders[(order.product_id, order.is_buy)] -= 1
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+from logging import getLogger
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = getLogger(__name__)
+
+CACHE_VERSION = 1
+META_FILE_NAME = 'meta.json'
+DERIVED_PREFIX = 'derived-'
+HASH_CHUNK_SIZE = 1 << 20
+
+Columns = Dict[str, np.ndarray]
+
+
+class CacheMeta(NamedTuple):
+    version: int
+    source: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    columns: list
+    n_rows: int
+
+
+class PriceDataCache:
+    """Persistent columnar cache of parsed price data files.
+
+    Every column of a parsed file is stored as a `.npy` file together with a
+    small metadata header keyed by the source file path, size, mtime and
+    content hash. The cache is used instead of the source file while it is
+    fresh and is rebuilt transparently when the source file has changed.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        :param cache_dir: directory to store cached columns in.
+            If None, `.tmtrader_cache` next to each source file is used.
+        """
+        self.__cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+    def entry_dir(self, file_path: Path) -> Path:
+        source = Path(file_path).resolve()
+        if self.__cache_dir is None:
+            base = source.parent / '.tmtrader_cache'
+        else:
+            base = self.__cache_dir
+        path_key = hashlib.sha1(str(source).encode()).hexdigest()[:12]
+        return base / f'{source.stem}-{path_key}'
+
+    def load(self, file_path: Path,
+             parse: Callable[[Path], pd.DataFrame],
+             mmap: bool = False) -> Columns:
+        """Loads the columns of `file_path` from the cache.
+
+        :param file_path: source file of the price data
+        :param parse: function to parse and validate the source file,
+            called only when the cache is missing or stale
+        :param mmap: if True, the columns are read-only memory-mapped
+            instead of being read into memory
+        :return: dict of column name to 1d-array, ordered as in the source
+        """
+        entry_dir = self.entry_dir(file_path)
+        meta = self.__fresh_meta(Path(file_path), entry_dir)
+        if meta is None:
+            logger.info(f'building price data cache of `{file_path}` in '
+                        f'`{entry_dir}`.')
+            columns = self.__build(Path(file_path), entry_dir, parse)
+            if not mmap:
+                return columns
+            meta = _read_meta(entry_dir)
+
+        mmap_mode = 'r' if mmap else None
+        return {c: np.load(entry_dir / f'{c}.npy', mmap_mode=mmap_mode)
+                for c in meta.columns}
+
+    def load_derived(self, file_path: Path, name: str,
+                     build: Callable[[], np.ndarray],
+                     mmap: bool = False) -> np.ndarray:
+        """Loads an array derived from the columns of `file_path`.
+
+        Derived arrays are stored next to the cached columns and are
+        discarded whenever the columns are rebuilt. `load` must be called
+        before this method so that the columns are fresh.
+        :param name: unique name of the derived array
+        :param build: function to build the array when it is not cached
+        """
+        path = self.entry_dir(file_path) / f'{DERIVED_PREFIX}{name}.npy'
+        if not path.exists():
+            values = build()
+            with NamedTemporaryFile(dir=path.parent, suffix='.tmp.npy',
+                                    delete=False) as f:
+                np.save(f, values)
+            os.replace(f.name, path)
+            if not mmap:
+                return values
+
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def meta(self, file_path: Path) -> Optional[CacheMeta]:
+        return _read_meta(self.entry_dir(file_path))
+
+    def __fresh_meta(self, file_path: Path,
+                     entry_dir: Path) -> Optional[CacheMeta]:
+        meta = _read_meta(entry_dir)
+        if meta is None or meta.version != CACHE_VERSION \
+                or meta.source != str(file_path.resolve()):
+            return None
+
+        stat = file_path.stat()
+        if meta.size != stat.st_size:
+            return None
+        if meta.mtime_ns == stat.st_mtime_ns:
+            return meta
+
+        # The file has been touched or copied. Trust the cache only if the
+        # content is still the same.
+        if _file_sha256(file_path) != meta.sha256:
+            return None
+        meta = meta._replace(mtime_ns=stat.st_mtime_ns)
+        _write_meta(entry_dir, meta)
+        return meta
+
+    def __build(self, file_path: Path, entry_dir: Path,
+                parse: Callable[[Path], pd.DataFrame]) -> Columns:
+        stat = file_path.stat()
+        sha256 = _file_sha256(file_path)
+        df = parse(file_path)
+        columns = {c: df[c].to_numpy() for c in df.columns}
+
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        # invalidate the old entry before overwriting its columns
+        (entry_dir / META_FILE_NAME).unlink(missing_ok=True)
+        for derived in entry_dir.glob(f'{DERIVED_PREFIX}*'):
+            derived.unlink()
+        for name, values in columns.items():
+            np.save(entry_dir / f'{name}.npy', values)
+
+        _write_meta(entry_dir,
+                    CacheMeta(CACHE_VERSION, str(file_path.resolve()),
+                              stat.st_size, stat.st_mtime_ns, sha256,
+                              list(columns.keys()), len(df)))
+        return columns
+
+
+def _read_meta(entry_dir: Path) -> Optional[CacheMeta]:
+    try:
+        with open(entry_dir / META_FILE_NAME, mode='r') as f:
+            return CacheMeta(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_meta(entry_dir: Path, meta: CacheMeta):
+    # write to a temporary file of a unique name first so that readers never
+    # see a partial header, even when several processes write it
+    with NamedTemporaryFile(mode='w', dir=entry_dir, suffix='.tmp',
+                            delete=False) as f:
+        json.dump(meta._asdict(), f)
+    os.replace(f.name, entry_dir / META_FILE_NAME)
+
+
+def _file_sha256(file_path: Path) -> str:
+    h = hashlib.sha256()
+    with open(file_path, mode='rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,120 @@
+from logging import getLogger
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from tmtrader._typing import ArrayLike
+from tmtrader.exchange_for_backtest.price_data_cache import PriceDataCache
+
+logger = getLogger(__name__)
+
+TIME_COLUMN = 5
+# a time difference larger than this times the base period is a gap
+GAP_FACTOR = 1.5
+
+_INDEX_FIELDS = ['base_period', 'duplicates', 'gaps']
+
+
+class PriceDataIndex(NamedTuple):
+    """Positions of irregular bars found by `build_index`.
+
+    `duplicates` and `gaps` hold the row of the bar which has the same time
+    as the previous bar, and the row of the first bar after a gap
+    respectively. Sessions are the runs of bars between gaps.
+    """
+    n_rows: int
+    base_period: float
+    duplicates: np.ndarray
+    gaps: np.ndarray
+
+    @property
+    def session_starts(self) -> np.ndarray:
+        """the first row of every session"""
+        if not self.n_rows:
+            return self.gaps
+        return np.concatenate([np.zeros(1, dtype=self.gaps.dtype),
+                               self.gaps])
+
+    def session_of(self, row: ArrayLike) -> ArrayLike:
+        """Returns the session number of `row`."""
+        return np.searchsorted(self.gaps, row, side='right')
+
+
+def build_index(columns: Sequence[ArrayLike]) -> PriceDataIndex:
+    """Validates the price data and builds its index.
+
+    :param columns: Open, High, Low, Close, Vol and Time columns
+    :raise ValueError: if a column has a NaN or an infinite value, or if the
+        `Time` column is not sorted in ascending order
+    """
+    for name, values in zip(['Open', 'High', 'Low', 'Close', 'Vol', 'Time'],
+                            columns):
+        not_finite = np.flatnonzero(~np.isfinite(values))
+        if len(not_finite):
+            raise ValueError(
+                f'The column `{name}` has {len(not_finite)} missing or '
+                f'infinite values. The first one is at row '
+                f'{not_finite[0]}.')
+
+    time_ = np.asarray(columns[TIME_COLUMN])
+    _validate_time_order(time_)
+    diff = np.diff(time_)
+    duplicates = np.flatnonzero(diff == 0) + 1
+    positive = diff[diff > 0]
+    if len(positive):
+        base_period = float(positive.min())
+        gaps = np.flatnonzero(diff > base_period * GAP_FACTOR) + 1
+    else:
+        base_period = float('nan')
+        gaps = np.empty(0, dtype=duplicates.dtype)
+
+    return PriceDataIndex(len(time_), base_period, duplicates, gaps)
+
+
+def load_index(columns: Sequence[ArrayLike],
+               file_path: Optional[Path] = None,
+               cache: Optional[PriceDataCache] = None) -> PriceDataIndex:
+    """Returns the index of the price data, built once and stored in
+    `cache` together with the columns of `file_path`."""
+    if cache is None:
+        index = build_index(columns)
+    else:
+        built: List[PriceDataIndex] = []
+
+        def builder(field: str):
+            def build() -> np.ndarray:
+                if not built:
+                    built.append(build_index(columns))
+                return np.atleast_1d(getattr(built[0], field))
+            return build
+
+        arrays = {f: cache.load_derived(file_path, f'index-{f}', builder(f))
+                  for f in _INDEX_FIELDS}
+        index = PriceDataIndex(len(columns[TIME_COLUMN]),
+                               float(arrays['base_period'][0]),
+                               arrays['duplicates'], arrays['gaps'])
+
+    if len(index.duplicates):
+        logger.warning(
+            f'{len(index.duplicates)} bars have the same time as the '
+            f'previous bar. The first one is at row {index.duplicates[0]}.')
+    if len(index.gaps):
+        logger.info(f'{len(index.gaps)} gaps are found in the price data.')
+    return index
+
+
+def _validate_time_order(time_: np.ndarray,
+                         last_time: Optional[float] = None):
+    if last_time is not None and len(time_) and time_[0] < last_time:
+        raise ValueError(
+            f'`Time` must be sorted in ascending order, but `{time_[0]}` '
+            f'follows `{last_time}`.')
+
+    backward = np.flatnonzero(np.diff(time_) < 0)
+    if len(backward):
+        row = backward[0] + 1
+        raise ValueError(
+            f'`Time` must be sorted in ascending order, but row {row} '
+            f'(`{time_[row]}`) is earlier than the previous row '
+            f'(`{time_[row - 1]}`). {len(backward)} rows go backward.')
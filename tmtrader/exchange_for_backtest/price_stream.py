@@ -1,6 +1,11 @@
 from abc import abstractmethod
+from typing import List, Optional, Sequence
+
+from tmtrader._typing import ArrayLike
 
 from tmtrader.entity.price import PriceSequence, Bar
+from tmtrader.indicator.indicator import IndicatorSpec
+from tmtrader.usecase.look_ahead import LookAhead
 from tmtrader.usecase.price_feed import PriceFeeder
 
 
@@ -9,10 +14,69 @@ class PriceStream(PriceFeeder):
     def start_feed(self):
         pass
 
+    @abstractmethod
+    def set_n_past_bars(self, n_bars: int):
+        """Sets the number of past bars, including the latest one, that
+        each price update holds. Feeding starts when this number of bars
+        is available."""
+        pass
+
+    @abstractmethod
+    def set_time_range(self, start: Optional[float] = None,
+                       end: Optional[float] = None):
+        """Limits the bars to feed to those whose time is in
+        `[start, end)`. Bars before `start` are still used as past bars.
+        None means no limit."""
+        pass
+
+    def precompute_indicators(self, specs: Sequence[IndicatorSpec]
+                              ) -> List[IndicatorSpec]:
+        """Computes the indicators of `specs` over the whole price data
+        before feeding, so that the price updates provide them with
+        `PriceSequence.indicator`.
+
+        :return: the specs computed. Streams that cannot see the whole price
+            data at once compute nothing.
+        """
+        return []
+
+    def bars_before_feed(self) -> Optional[Sequence[ArrayLike]]:
+        """Returns the Open, High, Low, Close and Vol columns of the bars
+        before the first bar to feed, so that the indicators updated bar by
+        bar can be warmed up with them like the precomputed ones.
+
+        :return: None if the stream cannot see those bars before feeding
+        """
+        return None
+
+    def set_look_ahead(self, look_aheads: Sequence[LookAhead]):
+        """Lets the stream skip the bars where none of `look_aheads` can
+        act, instead of feeding every bar.
+
+        :raise ValueError: if the stream cannot skip bars. Streams reading
+            the price data sequentially or aggregating every bar cannot.
+        """
+        if look_aheads:
+            raise ValueError(f'`{type(self).__name__}` cannot skip bars.')
+
     @abstractmethod
     def get_latest_bars(self, n_bars: int = 1) -> PriceSequence:
         pass
 
     @abstractmethod
-    def get_latest_bar_decimal(self) -> Bar:
+    def get_latest_bar_decimal(self,
+                               product_id: Optional[int] = None) -> Bar:
+        """Returns the latest bar of `product_id`. Streams of a single
+        product ignore `product_id`."""
+        pass
+
+    def has_latest_bar(self, product_id: Optional[int] = None) -> bool:
+        """Returns whether `product_id` has a bar at the time of the latest
+        price update. Streams of a single product always have it."""
+        return True
+
+    @abstractmethod
+    def get_latest_bar_ticks(self, product_id: Optional[int] = None) -> Bar:
+        """Same as `get_latest_bar_decimal`, but the prices are int tick
+        counts of the product."""
         pass
@@ -29,6 +29,9 @@ class TradeManager(OrderCloseObserver):
     def trade_history(self) -> List[Trade]:
         return self.__order_mng.trades
 
+    def notify_order_accepted(self, order: Order):
+        self.__order_mng.add_open_orders([order])
+
     def notify_order_filled(self, order: FilledBasicOrder):
         # self.__position_mng.update_position(order)
         closed_positions = self.__position_mng.update_position(order)
@@ -40,5 +43,4 @@ class TradeManager(OrderCloseObserver):
         # self.__account_mng.update_balance(order)
 
     def notify_order_cancelled(self, order: Order):
-        logger.warning('not implemented yet.')
-        pass
+        self.__order_mng.add_cancelled_orders([order])
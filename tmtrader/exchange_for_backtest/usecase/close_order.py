@@ -5,6 +5,12 @@ from tmtrader.entity.order import FilledOrder, Order
 
 
 class OrderCloseObserver(ABC):
+    @abstractmethod
+    def notify_order_accepted(self, order: Order):
+        """Notified of an order before it is filled or cancelled, so that
+        the orders open in the broker can be tracked."""
+        pass
+
     @abstractmethod
     def notify_order_filled(self, order: FilledOrder):
         pass
@@ -24,6 +30,9 @@ class OrderCloseNotifier(ABC):
     def remove_order_close_observer(self, observer: OrderCloseObserver):
         self.__order_close_observers.remove(observer)
 
+    def _notify_order_accepted(self, order: Order):
+        [o.notify_order_accepted(order) for o in self.__order_close_observers]
+
     def _notify_order_filled(self, order: FilledOrder):
         [o.notify_order_filled(order) for o in self.__order_close_observers]
 
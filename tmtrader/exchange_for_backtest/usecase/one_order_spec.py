@@ -2,8 +2,7 @@ from logging import getLogger
 from typing import List
 
 from tmtrader.controller.order_history_controller import OrderHistoryController
-from tmtrader.entity.order import BasicOrder, BuyOrder, SellOrder, \
-    buy_sell_split
+from tmtrader.entity.order import BasicOrder, buy_sell_split
 from tmtrader.exchange_for_backtest.usecase.order_spec import OrderSpec
 
 logger = getLogger(__name__)
@@ -29,11 +28,10 @@ class OneOrderSpec(OrderSpec):
     def __no_new_order_when_exists_open_order(self, orders):
         buy_orders, sell_orders = buy_sell_split(orders)
 
-        open_orders = self.__order_history_ctr.list_open_orders()
-        if [o for o in open_orders if isinstance(o, BuyOrder)]:
+        if self.__order_history_ctr.count_open_orders(is_buy=True):
             buy_orders = []
 
-        if [o for o in open_orders if isinstance(o, SellOrder)]:
+        if self.__order_history_ctr.count_open_orders(is_buy=False):
             sell_orders = []
 
         return buy_orders + sell_orders
@@ -0,0 +1,147 @@
+from logging import getLogger
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from tmtrader._typing import ArrayLike
+from tmtrader.entity.order import OrderCondition
+from tmtrader.entity.trade import Entry, Exit, Trade
+from tmtrader.usecase.look_ahead import HIGH_TICKS, LOW_TICKS, \
+    OPEN_TICKS, first_index
+from tmtrader.usecase.round_price import RoundPrice
+from tmtrader.usecase.vector_strategy import Signals
+
+logger = getLogger(__name__)
+
+
+def resolve_trades(signals: Signals, ticks: np.ndarray, close: ArrayLike,
+                   time_: ArrayLike, rounder: RoundPrice,
+                   product_id: int = 0, first: int = 0,
+                   last: Optional[int] = None) -> List[Trade]:
+    """Resolves the fills of the orders of `signals` into trades.
+
+    The fillable bars of every signal are found with array operations, so
+    that only one binary search per entry and exit is done in Python.
+    :param ticks: 2d-array of tick counts of Open, High, Low and Close
+    :param first: the first row to trade
+    :param last: the row after the last row to trade. A position still held
+        there is left open and not reported as a trade.
+    """
+    n_rows = len(time_)
+    last = n_rows if last is None else last
+    entry_ticks, can_enter = _fills(signals.entries, signals.entry_condition,
+                                    signals.entry_prices, ticks, rounder)
+    if signals.exits is None:
+        exit_ticks = ticks[:, OPEN_TICKS]
+        can_exit = np.zeros(n_rows, dtype=bool)
+    else:
+        exit_ticks, can_exit = _fills(signals.exits, signals.exit_condition,
+                                      signals.exit_prices, ticks, rounder)
+    entry_rows = np.flatnonzero(can_enter[first:last]) + first
+    exit_rows = np.flatnonzero(can_exit[first:last]) + first
+    close = np.asarray(close, dtype=float)
+    time_ = np.asarray(time_)
+
+    sign = 1 if signals.is_long else -1
+    to_decimal = rounder.ticks2decimal
+    trades = []
+    row = first
+    while True:
+        k = int(np.searchsorted(entry_rows, row))
+        if k == len(entry_rows):
+            break
+        entry_row = int(entry_rows[k])
+        entry_price = int(entry_ticks[entry_row])
+
+        k = int(np.searchsorted(exit_rows, entry_row, side='right'))
+        signal_row = int(exit_rows[k]) if k < len(exit_rows) else last
+        # the order of a rule hit on a bar is filled at the open of the next
+        # bar, so a rule hit on the bar before a signal is filled first
+        rule_row = _first_rule_hit(signals, close, time_, entry_row,
+                                   float(to_decimal(entry_price)),
+                                   sign, min(signal_row, last) - 1)
+        if rule_row is not None:
+            exit_row = rule_row + 1
+            if exit_row == last:
+                break
+            exit_price = int(ticks[exit_row, OPEN_TICKS])
+            # filled before the strategies run, so they may enter again on
+            # the bar of the exit
+            row = exit_row
+        elif signal_row < last:
+            exit_row = signal_row
+            exit_price = int(exit_ticks[exit_row])
+            row = exit_row + 1
+        else:
+            break
+
+        entry = Entry(int(time_[entry_row]), to_decimal(entry_price))
+        exit_ = Exit(int(time_[exit_row]), to_decimal(exit_price))
+        trades.append(Trade(product_id, 1, signals.is_long, entry, exit_,
+                            sign * (exit_.price - entry.price)))
+
+    return trades
+
+
+def _fills(signal: ArrayLike, condition: OrderCondition,
+           prices: Optional[ArrayLike], ticks: np.ndarray,
+           rounder: RoundPrice) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the filled price in ticks of the order of every bar and
+    whether it is filled."""
+    signal = np.asarray(signal, dtype=bool)
+    if len(signal) != len(ticks):
+        raise ValueError(
+            f'signals must have one element per bar, but got {len(signal)} '
+            f'elements for {len(ticks)} bars.')
+    if condition == OrderCondition.MARKET:
+        return ticks[:, OPEN_TICKS], signal
+
+    if prices is None:
+        raise ValueError(f'prices must be given for {condition} orders.')
+    prices = np.asarray(prices, dtype=float)
+    has_price = ~np.isnan(prices)
+    price_ticks = rounder.round2ticks(np.where(has_price, prices, 0.))
+    # limit and stop orders are filled alike if the price is within the bar
+    filled = signal & has_price \
+        & (ticks[:, LOW_TICKS] <= price_ticks) \
+        & (price_ticks <= ticks[:, HIGH_TICKS])
+    return price_ticks, filled
+
+
+def _first_rule_hit(signals: Signals, close: np.ndarray, time_: np.ndarray,
+                    entry_row: int, entry_price: float, sign: int,
+                    end: int) -> Optional[int]:
+    """Returns the first row in `(entry_row, end]` where an exit rule is hit,
+    or None."""
+    n_bars_row = None
+    if signals.exit_in_n_bars is not None:
+        # the holding period is rounded like `longest_holding_period_bars`
+        row = int(np.searchsorted(
+            time_, time_[entry_row] + signals.exit_in_n_bars - 0.5))
+        row = max(row, entry_row + 1)
+        if row <= end:
+            n_bars_row = end = row
+    if signals.target_profit is not None or signals.stop_loss is not None:
+        hit = _first_pl_hit(signals, close, entry_row + 1, end + 1,
+                            entry_price, sign)
+        if hit is not None:
+            return hit
+    return n_bars_row
+
+
+def _first_pl_hit(signals: Signals, close: np.ndarray, begin: int, end: int,
+                  entry_price: float, sign: int) -> Optional[int]:
+    """Returns the first row in `[begin, end)` where the P/L at the close
+    reaches the target profit or the stop loss, or None."""
+
+    def hit(first: int, stop: int) -> np.ndarray:
+        pl = sign * (close[first:stop] - entry_price)
+        hits = np.zeros(len(pl), dtype=bool)
+        if signals.target_profit is not None:
+            hits |= pl >= signals.target_profit
+        if signals.stop_loss is not None:
+            hits |= pl <= -signals.stop_loss
+        return hits
+
+    row = first_index(hit, begin, end)
+    return row if row < end else None
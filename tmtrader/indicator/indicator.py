@@ -0,0 +1,391 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import NamedTuple, Optional, Tuple, Union
+
+# column indices of a price sequence
+OPEN, HIGH, LOW, CLOSE, VOL, TIME = range(6)
+
+NAN = float('nan')
+
+
+class Indicator(ABC):
+    """Incremental calculation of an indicator.
+
+    `update` takes the latest bar and returns the values of the outputs of
+    the indicator in O(1). Values are NaN until enough bars have been seen.
+    """
+
+    @abstractmethod
+    def update(self, open_: float, high: float, low: float, close: float,
+               vol: float) -> Tuple[float, ...]:
+        pass
+
+
+class SMA(NamedTuple):
+    period: int
+    column: int = CLOSE
+
+    outputs = ('value',)
+
+    def create(self) -> Indicator:
+        return _SMA(_validate_period(self.period), self.column)
+
+
+class EMA(NamedTuple):
+    """exponential moving average seeded with the SMA of the first `period`
+    values"""
+    period: int
+    column: int = CLOSE
+
+    outputs = ('value',)
+
+    def create(self) -> Indicator:
+        return _EMA(_validate_period(self.period), self.column)
+
+
+class ATR(NamedTuple):
+    """average true range with Wilder's smoothing"""
+    period: int
+
+    outputs = ('value',)
+
+    def create(self) -> Indicator:
+        return _ATR(_validate_period(self.period))
+
+
+class RSI(NamedTuple):
+    """relative strength index with Wilder's smoothing"""
+    period: int
+    column: int = CLOSE
+
+    outputs = ('value',)
+
+    def create(self) -> Indicator:
+        return _RSI(_validate_period(self.period), self.column)
+
+
+class RollingHigh(NamedTuple):
+    period: int
+    column: int = HIGH
+
+    outputs = ('value',)
+
+    def create(self) -> Indicator:
+        return _RollingExtreme(_validate_period(self.period), self.column,
+                               is_high=True)
+
+
+class RollingLow(NamedTuple):
+    period: int
+    column: int = LOW
+
+    outputs = ('value',)
+
+    def create(self) -> Indicator:
+        return _RollingExtreme(_validate_period(self.period), self.column,
+                               is_high=False)
+
+
+class VWAP(NamedTuple):
+    """volume weighted average of the typical price `(high + low + close) /
+    3` over the last `period` bars, or over all bars if `period` is None"""
+    period: Optional[int] = None
+
+    outputs = ('value',)
+
+    def create(self) -> Indicator:
+        if self.period is not None:
+            _validate_period(self.period)
+        return _VWAP(self.period)
+
+
+class Bollinger(NamedTuple):
+    """SMA and the bands `n_std` population standard deviations away"""
+    period: int
+    n_std: float = 2.0
+    column: int = CLOSE
+
+    outputs = ('middle', 'upper', 'lower')
+
+    def create(self) -> Indicator:
+        return _Bollinger(_validate_period(self.period), self.n_std,
+                          self.column)
+
+
+IndicatorSpec = Union[SMA, EMA, ATR, RSI, RollingHigh, RollingLow, VWAP,
+                      Bollinger]
+
+
+def indicator_key(spec: IndicatorSpec) -> Tuple[type, IndicatorSpec]:
+    """Returns the key identifying the indicator of `spec`."""
+    # specs of different types may be equal as tuples
+    return type(spec), spec
+
+
+def output_index(spec: IndicatorSpec, output: Optional[str]) -> int:
+    """Returns the index of `output` in the outputs of `spec`. None means
+    the first output."""
+    if output is None:
+        return 0
+    try:
+        return spec.outputs.index(output)
+    except ValueError:
+        raise ValueError(
+            f'output must be one of {list(spec.outputs)}, but got '
+            f'`{output}`.')
+
+
+def _validate_period(period: int) -> int:
+    if period < 1:
+        raise ValueError(
+            f'period must be a value of positive int larger or equal to 1, '
+            f'but got {period}.')
+    return period
+
+
+class _RollingSum:
+    """sum of the last `period` values, recomputed from the values every
+    `period` pushes so that rounding errors do not accumulate"""
+
+    def __init__(self, period: int):
+        self.__values = deque(maxlen=period)
+        self.__n_pushes = 0
+        self.sum = 0.
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.__values) == self.__values.maxlen
+
+    def push(self, x: float):
+        if self.is_full:
+            self.sum -= self.__values[0]
+        self.__values.append(x)
+        self.sum += x
+        self.__n_pushes += 1
+        if self.__n_pushes == self.__values.maxlen:
+            self.__n_pushes = 0
+            self.sum = math.fsum(self.__values)
+
+
+class _RollingVariance:
+    """mean and population variance of the last `period` values
+
+    The sums are taken over the values minus a recent mean, so that the sum
+    of squares does not lose the variance to the magnitude of the values,
+    and they are recomputed every `period` pushes.
+    """
+
+    def __init__(self, period: int):
+        self.__values = deque(maxlen=period)
+        self.__n_pushes = 0
+        self.__shift = 0.
+        self.__sum = 0.
+        self.__sum_sq = 0.
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.__values) == self.__values.maxlen
+
+    @property
+    def mean(self) -> float:
+        return self.__shift + self.__sum / len(self.__values)
+
+    @property
+    def var(self) -> float:
+        n = len(self.__values)
+        mean = self.__sum / n
+        return max(self.__sum_sq / n - mean * mean, 0.)
+
+    def push(self, x: float):
+        if self.is_full:
+            d = self.__values[0] - self.__shift
+            self.__sum -= d
+            self.__sum_sq -= d * d
+        self.__values.append(x)
+        d = x - self.__shift
+        self.__sum += d
+        self.__sum_sq += d * d
+        self.__n_pushes += 1
+        if self.__n_pushes == self.__values.maxlen:
+            self.__n_pushes = 0
+            self.__recompute()
+
+    def __recompute(self):
+        self.__shift = math.fsum(self.__values) / len(self.__values)
+        deviations = [x - self.__shift for x in self.__values]
+        self.__sum = math.fsum(deviations)
+        self.__sum_sq = math.fsum([d * d for d in deviations])
+
+
+class _SMA(Indicator):
+    def __init__(self, period: int, column: int):
+        self.__period = period
+        self.__column = column
+        self.__sum = _RollingSum(period)
+
+    def update(self, *bar: float) -> Tuple[float, ...]:
+        self.__sum.push(bar[self.__column])
+        if not self.__sum.is_full:
+            return NAN,
+        return self.__sum.sum / self.__period,
+
+
+class _EMA(Indicator):
+    def __init__(self, period: int, column: int):
+        self.__period = period
+        self.__column = column
+        self.__alpha = 2 / (period + 1)
+        self.__n_seen = 0
+        self.__value = 0.
+
+    def update(self, *bar: float) -> Tuple[float, ...]:
+        x = bar[self.__column]
+        self.__n_seen += 1
+        if self.__n_seen < self.__period:
+            self.__value += x
+            return NAN,
+        if self.__n_seen == self.__period:
+            self.__value = (self.__value + x) / self.__period
+        else:
+            self.__value += self.__alpha * (x - self.__value)
+        return self.__value,
+
+
+class _WilderAverage:
+    """average seeded with the mean of the first `period` values and
+    smoothed with `1 / period` afterwards"""
+
+    def __init__(self, period: int):
+        self.__period = period
+        self.__n_seen = 0
+        self.value = 0.
+
+    @property
+    def is_ready(self) -> bool:
+        return self.__n_seen >= self.__period
+
+    def push(self, x: float):
+        self.__n_seen += 1
+        if self.__n_seen < self.__period:
+            self.value += x
+        elif self.__n_seen == self.__period:
+            self.value = (self.value + x) / self.__period
+        else:
+            self.value += (x - self.value) / self.__period
+
+
+class _ATR(Indicator):
+    def __init__(self, period: int):
+        self.__average = _WilderAverage(period)
+        self.__last_close: Optional[float] = None
+
+    def update(self, open_: float, high: float, low: float, close: float,
+               vol: float) -> Tuple[float, ...]:
+        tr = high - low
+        if self.__last_close is not None:
+            tr = max(tr, abs(high - self.__last_close),
+                     abs(low - self.__last_close))
+        self.__last_close = close
+        self.__average.push(tr)
+        if not self.__average.is_ready:
+            return NAN,
+        return self.__average.value,
+
+
+class _RSI(Indicator):
+    def __init__(self, period: int, column: int):
+        self.__column = column
+        self.__gain = _WilderAverage(period)
+        self.__loss = _WilderAverage(period)
+        self.__last: Optional[float] = None
+
+    def update(self, *bar: float) -> Tuple[float, ...]:
+        x = bar[self.__column]
+        last = self.__last
+        self.__last = x
+        if last is None:
+            return NAN,
+        change = x - last
+        self.__gain.push(max(change, 0.))
+        self.__loss.push(max(-change, 0.))
+        if not self.__gain.is_ready:
+            return NAN,
+        loss = self.__loss.value
+        if loss == 0:
+            return 100.,
+        return 100. - 100. / (1. + self.__gain.value / loss),
+
+
+class _RollingExtreme(Indicator):
+    """rolling max or min with a monotonic queue"""
+
+    def __init__(self, period: int, column: int, is_high: bool):
+        self.__period = period
+        self.__column = column
+        self.__is_high = is_high
+        # (bar number, value) with values in monotonic order
+        self.__queue = deque()
+        self.__n_seen = 0
+
+    def update(self, *bar: float) -> Tuple[float, ...]:
+        x = bar[self.__column]
+        queue = self.__queue
+        if self.__is_high:
+            while queue and queue[-1][1] <= x:
+                queue.pop()
+        else:
+            while queue and queue[-1][1] >= x:
+                queue.pop()
+        queue.append((self.__n_seen, x))
+        self.__n_seen += 1
+        if queue[0][0] <= self.__n_seen - 1 - self.__period:
+            queue.popleft()
+        if self.__n_seen < self.__period:
+            return NAN,
+        return queue[0][1],
+
+
+class _VWAP(Indicator):
+    def __init__(self, period: Optional[int]):
+        self.__period = period
+        if period is None:
+            self.__pv = 0.
+            self.__vol = 0.
+        else:
+            self.__rolling_pv = _RollingSum(period)
+            self.__rolling_vol = _RollingSum(period)
+
+    def update(self, open_: float, high: float, low: float, close: float,
+               vol: float) -> Tuple[float, ...]:
+        pv = (high + low + close) / 3 * vol
+        if self.__period is None:
+            self.__pv += pv
+            self.__vol += vol
+            total_pv, total_vol = self.__pv, self.__vol
+        else:
+            self.__rolling_pv.push(pv)
+            self.__rolling_vol.push(vol)
+            if not self.__rolling_vol.is_full:
+                return NAN,
+            total_pv = self.__rolling_pv.sum
+            total_vol = self.__rolling_vol.sum
+        if total_vol == 0:
+            return NAN,
+        return total_pv / total_vol,
+
+
+class _Bollinger(Indicator):
+    def __init__(self, period: int, n_std: float, column: int):
+        self.__n_std = n_std
+        self.__column = column
+        self.__window = _RollingVariance(period)
+
+    def update(self, *bar: float) -> Tuple[float, ...]:
+        window = self.__window
+        window.push(bar[self.__column])
+        if not window.is_full:
+            return NAN, NAN, NAN
+        mean = window.mean
+        band = self.__n_std * math.sqrt(window.var)
+        return mean, mean + band, mean - band
@@ -0,0 +1,98 @@
+import os
+from collections import OrderedDict
+from logging import getLogger
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from tmtrader.indicator.indicator import IndicatorSpec, indicator_key
+
+logger = getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 1 << 30
+
+_Key = Tuple[str, type, IndicatorSpec]
+
+
+class IndicatorCache:
+    """Cache of precomputed indicator values shared across runs.
+
+    Values are keyed by the fingerprint of the price data and the spec of
+    the indicator. They are kept in memory up to `max_bytes`, evicting the
+    least recently used ones, and optionally stored in `cache_dir` so that
+    other processes working on the same data can load them.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 cache_dir: Optional[Path] = None):
+        """
+        :param max_bytes: the total size of the values kept in memory
+        :param cache_dir: directory to store values in. If None, values are
+            kept only in memory.
+        """
+        if max_bytes < 0:
+            raise ValueError(
+                f'max_bytes must be a non-negative int, but got {max_bytes}.')
+        self.__max_bytes = max_bytes
+        self.__cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.__values = OrderedDict()
+        self.__n_bytes = 0
+
+    @property
+    def n_bytes(self) -> int:
+        """the total size of the values kept in memory"""
+        return self.__n_bytes
+
+    def get(self, fingerprint: str, spec: IndicatorSpec,
+            compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Returns the values of the indicator of `spec` over the price data
+        of `fingerprint`, calling `compute` only if they are not cached.
+
+        The returned array is read-only because it is shared.
+        """
+        key = (fingerprint,) + indicator_key(spec)
+        values = self.__values.get(key)
+        if values is not None:
+            self.__values.move_to_end(key)
+            return values
+
+        path = self.__path(fingerprint, spec)
+        if path is not None and path.exists():
+            values = np.load(path)
+        else:
+            values = np.asarray(compute())
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # a unique name, so that processes computing the same values
+                # do not write to the same file
+                with NamedTemporaryFile(dir=path.parent, suffix='.tmp.npy',
+                                        delete=False) as f:
+                    np.save(f, values)
+                os.replace(f.name, path)
+
+        values.flags.writeable = False
+        self.__put(key, values)
+        return values
+
+    def clear(self):
+        """Drops the values kept in memory. Stored files are kept."""
+        self.__values.clear()
+        self.__n_bytes = 0
+
+    def __put(self, key: _Key, values: np.ndarray):
+        if values.nbytes > self.__max_bytes:
+            return
+        self.__values[key] = values
+        self.__n_bytes += values.nbytes
+        while self.__n_bytes > self.__max_bytes:
+            _, evicted = self.__values.popitem(last=False)
+            self.__n_bytes -= evicted.nbytes
+
+    def __path(self, fingerprint: str,
+               spec: IndicatorSpec) -> Optional[Path]:
+        if self.__cache_dir is None:
+            return None
+        name = '-'.join([type(spec).__name__] + [str(v) for v in spec])
+        return self.__cache_dir / fingerprint / f'{name}.npy'
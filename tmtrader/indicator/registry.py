@@ -0,0 +1,198 @@
+from logging import getLogger
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from tmtrader._typing import ArrayLike
+from tmtrader.entity.price import PriceRingBuffer, PriceSequence
+from tmtrader.indicator.indicator import Indicator, IndicatorSpec, \
+    indicator_key, output_index
+
+logger = getLogger(__name__)
+
+_Key = Tuple[type, IndicatorSpec]
+
+
+class _Entry:
+    def __init__(self, spec: IndicatorSpec, n_bars: int):
+        self.spec = spec
+        self.indicator: Indicator = spec.create()
+        self.values = PriceRingBuffer(n_bars, len(spec.outputs))
+
+
+class IndicatorRegistry:
+    """Indicators updated once per bar and shared by every strategy.
+
+    An indicator is identified by its spec, so strategies declaring equal
+    specs share a single calculation. Indicators see the bars fed to the
+    strategies and the bars given to `warm_up`, so their values are NaN
+    until enough bars are seen.
+    The registrations of a spec are counted, and its indicator is dropped
+    when every one of them is released.
+    """
+
+    def __init__(self):
+        self.__entries: Dict[_Key, _Entry] = dict()
+        self.__n_registrations: Dict[_Key, int] = dict()
+        self.__to_update = list()
+
+    @property
+    def len(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def specs(self) -> List[IndicatorSpec]:
+        return [e.spec for e in self.__entries.values()]
+
+    def registered(self, spec: IndicatorSpec) -> bool:
+        return indicator_key(spec) in self.__entries
+
+    def register(self, spec: IndicatorSpec, n_bars: int = 1):
+        """
+        :param n_bars: the number of the latest values to keep
+        """
+        key = indicator_key(spec)
+        self.__n_registrations[key] = self.__n_registrations.get(key, 0) + 1
+        entry = self.__entries.get(key)
+        if entry is not None and entry.values.capacity >= n_bars:
+            return
+        self.__entries[key] = _Entry(spec, n_bars)
+        self.__to_update = list(self.__entries.values())
+
+    def release(self, spec: IndicatorSpec):
+        """Releases one registration of `spec`, and drops its indicator if
+        it was the last one."""
+        key = indicator_key(spec)
+        n_registrations = self.__n_registrations.get(key)
+        if n_registrations is None:
+            return
+        if n_registrations > 1:
+            self.__n_registrations[key] = n_registrations - 1
+            return
+        self.unregister(spec)
+
+    def unregister(self, spec: IndicatorSpec):
+        """Drops the indicator of `spec` regardless of its registrations,
+        e.g. when it is precomputed."""
+        key = indicator_key(spec)
+        self.__entries.pop(key, None)
+        self.__n_registrations.pop(key, None)
+        self.__to_update = list(self.__entries.values())
+
+    def reset(self):
+        self.__entries = {k: _Entry(e.spec, e.values.capacity) for k, e in
+                          self.__entries.items()}
+        self.__to_update = list(self.__entries.values())
+
+    def update(self, price_ref: PriceSequence):
+        self.__push((price_ref.open[0], price_ref.high[0], price_ref.low[0],
+                     price_ref.close[0], price_ref.vol[0]))
+
+    def warm_up(self, columns: Optional[Sequence[ArrayLike]]):
+        """Updates the indicators with the bars before the first fed bar.
+
+        :param columns: Open, High, Low, Close and Vol columns ordered from
+            the oldest bar to the latest bar, see
+            `PriceStream.bars_before_feed`. None does nothing.
+        """
+        if columns is None or not self.__to_update:
+            return
+        [self.__push(bar) for bar in zip(*columns)]
+
+    def __push(self, bar: tuple):
+        for entry in self.__to_update:
+            entry.values.push(entry.indicator.update(*bar))
+
+    def values(self, spec: IndicatorSpec, output: Optional[str] = None,
+               n_bars: Optional[int] = None) -> ArrayLike:
+        """Returns the latest values of `output` of the indicator of `spec`
+        ordered from the latest value to the oldest value."""
+        entry = self.__entries.get(indicator_key(spec))
+        if entry is None:
+            raise ValueError(
+                f'indicator `{spec}` is not registered. Declare it in '
+                f'`Strategy.indicators`.')
+        buf = entry.values
+        return buf._column(output_index(spec, output),
+                           buf.capacity if n_bars is None else n_bars)
+
+
+class IndicatorPriceSequence(PriceSequence):
+    """Price sequence which also provides the values of the indicators in
+    an `IndicatorRegistry`."""
+
+    def __init__(self, base: Optional[PriceSequence],
+                 registry: IndicatorRegistry, n_bars: Optional[int] = None):
+        self.__base = base
+        self.__registry = registry
+        self.__n_bars = n_bars
+        self.__views = dict()
+
+    def indicator(self, spec: IndicatorSpec,
+                  output: Optional[str] = None) -> ArrayLike:
+        if self.__registry.registered(spec):
+            return self.__registry.values(spec, output, self.__n_bars)
+        # the indicator may be provided by the base, e.g. precomputed
+        return self.__base.indicator(spec, output)
+
+    def with_depth(self, n_bars: int) -> PriceSequence:
+        view = self.__views.get(n_bars)
+        if view is None:
+            view = IndicatorPriceSequence(None, self.__registry, n_bars)
+            self.__views[n_bars] = view
+        view._set_base(self.__base.with_depth(n_bars))
+        return view
+
+    def history(self, n_bars: int) -> PriceSequence:
+        return IndicatorPriceSequence(self.__base.history(n_bars),
+                                      self.__registry, n_bars)
+
+    def _set_base(self, base: PriceSequence):
+        self.__base = base
+
+    @property
+    def _open(self):
+        pass
+
+    @_open.getter
+    def open(self) -> ArrayLike:
+        return self.__base.open
+
+    @property
+    def _high(self):
+        pass
+
+    @_high.getter
+    def high(self) -> ArrayLike:
+        return self.__base.high
+
+    @property
+    def _low(self):
+        pass
+
+    @_low.getter
+    def low(self) -> ArrayLike:
+        return self.__base.low
+
+    @property
+    def _close(self):
+        pass
+
+    @_close.getter
+    def close(self) -> ArrayLike:
+        return self.__base.close
+
+    @property
+    def _vol(self):
+        pass
+
+    @_vol.getter
+    def vol(self) -> ArrayLike:
+        return self.__base.vol
+
+    @property
+    def _time(self):
+        pass
+
+    @_time.getter
+    def time(self) -> ArrayLike:
+        return self.__base.time
+
@@ -0,0 +1,235 @@
+import math
+from typing import Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+from tmtrader._typing import ArrayLike
+from tmtrader.indicator.indicator import ATR, CLOSE, EMA, HIGH, LOW, RSI, \
+    SMA, VOL, VWAP, Bollinger, IndicatorSpec, RollingHigh, RollingLow, \
+    _validate_period
+
+# Terms of a block of the linear recurrence are scaled by up to this power
+# of 2, which bounds the rounding error of the blocked evaluation.
+_MAX_GROWTH_LOG2 = 20
+
+# Rolling sums are computed from cumulative sums restarted every this number
+# of rows, which bounds their magnitude and rounding error.
+_SUM_BLOCK_ROWS = 4096
+
+
+def compute(spec: IndicatorSpec, columns: Sequence[ArrayLike]) -> np.ndarray:
+    """Computes the indicator of `spec` over whole price columns at once.
+
+    The values are the same as the ones of the incremental indicator of
+    `spec` fed with the bars one by one, up to rounding errors.
+    :param columns: Open, High, Low, Close and Vol columns ordered from the
+        oldest bar to the latest bar
+    :return: 2d-array of the outputs of the indicator, one row per output
+    """
+    try:
+        func = _FUNCTIONS[type(spec)]
+    except KeyError:
+        raise ValueError(f'`{spec}` cannot be computed at once.')
+    return np.atleast_2d(func(spec, columns))
+
+
+def _sma(spec: SMA, columns: Sequence[ArrayLike]) -> np.ndarray:
+    return _rolling_mean(columns[spec.column], _validate_period(spec.period))
+
+
+def _ema(spec: EMA, columns: Sequence[ArrayLike]) -> np.ndarray:
+    period = _validate_period(spec.period)
+    return _seeded_average(np.asarray(columns[spec.column], dtype=float),
+                           period, 2 / (period + 1))
+
+
+def _atr(spec: ATR, columns: Sequence[ArrayLike]) -> np.ndarray:
+    period = _validate_period(spec.period)
+    high = np.asarray(columns[HIGH], dtype=float)
+    low = np.asarray(columns[LOW], dtype=float)
+    close = np.asarray(columns[CLOSE], dtype=float)
+    tr = high - low
+    if len(tr) > 1:
+        last_close = close[:-1]
+        tr[1:] = np.maximum.reduce([tr[1:], np.abs(high[1:] - last_close),
+                                    np.abs(low[1:] - last_close)])
+    return _seeded_average(tr, period, 1 / period)
+
+
+def _rsi(spec: RSI, columns: Sequence[ArrayLike]) -> np.ndarray:
+    period = _validate_period(spec.period)
+    x = np.asarray(columns[spec.column], dtype=float)
+    values = np.full(len(x), np.nan)
+    if len(x) < 2:
+        return values
+    change = np.diff(x)
+    gain = _seeded_average(np.maximum(change, 0.), period, 1 / period)
+    loss = _seeded_average(np.maximum(-change, 0.), period, 1 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100. - 100. / (1. + gain / loss)
+    rsi[loss == 0] = 100.
+    rsi[np.isnan(gain)] = np.nan
+    values[1:] = rsi
+    return values
+
+
+def _rolling_high(spec: RollingHigh, columns: Sequence[ArrayLike]
+                  ) -> np.ndarray:
+    return _rolling_extreme(columns[spec.column],
+                            _validate_period(spec.period), np.maximum)
+
+
+def _rolling_low(spec: RollingLow, columns: Sequence[ArrayLike]
+                 ) -> np.ndarray:
+    return _rolling_extreme(columns[spec.column],
+                            _validate_period(spec.period), np.minimum)
+
+
+def _vwap(spec: VWAP, columns: Sequence[ArrayLike]) -> np.ndarray:
+    vol = np.asarray(columns[VOL], dtype=float)
+    typical = (np.asarray(columns[HIGH], dtype=float)
+               + np.asarray(columns[LOW], dtype=float)
+               + np.asarray(columns[CLOSE], dtype=float)) / 3
+    if spec.period is None:
+        pv = np.cumsum(typical * vol)
+        total_vol = np.cumsum(vol)
+    else:
+        period = _validate_period(spec.period)
+        pv = _rolling_sum(typical * vol, period)
+        total_vol = _rolling_sum(vol, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = pv / total_vol
+    values[total_vol == 0] = np.nan
+    return values
+
+
+def _bollinger(spec: Bollinger, columns: Sequence[ArrayLike]) -> np.ndarray:
+    period = _validate_period(spec.period)
+    x = np.asarray(columns[spec.column], dtype=float)
+    mean, var = _rolling_mean_var(x, period)
+    band = spec.n_std * np.sqrt(var)
+    return np.stack([mean, mean + band, mean - band])
+
+
+_FUNCTIONS: Dict[type, Callable[..., np.ndarray]] = {
+    SMA: _sma,
+    EMA: _ema,
+    ATR: _atr,
+    RSI: _rsi,
+    RollingHigh: _rolling_high,
+    RollingLow: _rolling_low,
+    VWAP: _vwap,
+    Bollinger: _bollinger,
+}
+
+
+def _rolling_sum(x: np.ndarray, period: int) -> np.ndarray:
+    """sum of the last `period` values, NaN for the first `period - 1`"""
+    sums = np.full(len(x), np.nan)
+    n_windows = len(x) - period + 1
+    for begin in range(0, n_windows, _SUM_BLOCK_ROWS):
+        end = min(begin + _SUM_BLOCK_ROWS, n_windows)
+        cumsum = np.cumsum(x[begin:end + period - 1])
+        block = cumsum[period - 1:].copy()
+        block[1:] -= cumsum[:-period]
+        sums[begin + period - 1:end + period - 1] = block
+    return sums
+
+
+def _rolling_mean_var(x: np.ndarray, period: int
+                      ) -> Tuple[np.ndarray, np.ndarray]:
+    """rolling mean and population variance, NaN for the first
+    `period - 1`
+
+    The values of each block of rows are shifted by their mean, so that the
+    sums of squares keep the precision of the variance.
+    """
+    means = np.full(len(x), np.nan)
+    variances = np.full(len(x), np.nan)
+    n_windows = len(x) - period + 1
+    for begin in range(0, n_windows, _SUM_BLOCK_ROWS):
+        end = min(begin + _SUM_BLOCK_ROWS, n_windows)
+        block = x[begin:end + period - 1]
+        shift = block.mean()
+        centered = block - shift
+        mean = _rolling_sum(centered, period)[period - 1:] / period
+        var = _rolling_sum(centered * centered, period)[period - 1:] \
+            / period - mean * mean
+        means[begin + period - 1:end + period - 1] = mean + shift
+        variances[begin + period - 1:end + period - 1] = np.maximum(var, 0.)
+    return means, variances
+
+
+def _rolling_mean(x: ArrayLike, period: int) -> np.ndarray:
+    x = np.asarray(x, dtype=float)
+    shift = x[0] if len(x) else 0.
+    return _rolling_sum(x - shift, period) / period + shift
+
+
+def _rolling_extreme(x: ArrayLike, period: int,
+                     func: np.ufunc) -> np.ndarray:
+    """rolling max or min in O(n) by the van Herk/Gil-Werman algorithm"""
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    values = np.full(n, np.nan)
+    if n < period:
+        return values
+    if period == 1:
+        values[:] = x
+        return values
+
+    n_blocks = -(-n // period)
+    padded = np.full(n_blocks * period, x[-1])
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, period)
+    prefix = func.accumulate(blocks, axis=1).ravel()
+    suffix = func.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    # the window ending at i starts at i - period + 1 and spans at most two
+    # blocks
+    end = np.arange(period - 1, n)
+    values[period - 1:] = func(suffix[end - period + 1], prefix[end])
+    return values
+
+
+def _seeded_average(x: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """exponential average seeded with the mean of the first `period`
+    values"""
+    values = np.full(len(x), np.nan)
+    if len(x) < period:
+        return values
+    seed = x[:period].mean()
+    values[period - 1] = seed
+    values[period:] = _linear_recurrence(alpha * x[period:], 1 - alpha, seed)
+    return values
+
+
+def _linear_recurrence(x: np.ndarray, decay: float,
+                       initial: float) -> np.ndarray:
+    """Evaluates `y[t] = decay * y[t - 1] + x[t]` with `y[-1] = initial`.
+
+    The series is split into blocks short enough for the closed form
+    `y[k] = decay ** (k + 1) * (y[-1] + sum(x[j] / decay ** (j + 1)))` to be
+    accurate, so that only the last value of each block is carried in a
+    Python loop.
+    """
+    n = len(x)
+    if n == 0 or decay == 0:
+        return x.copy()
+
+    block = max(1, int(_MAX_GROWTH_LOG2 * math.log(2) / -math.log(decay)))
+    block = min(block, n)
+    n_blocks = -(-n // block)
+    padded = np.zeros(n_blocks * block)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, block)
+    powers = decay ** np.arange(1, block + 1)
+    particular = np.cumsum(blocks / powers, axis=1) * powers
+
+    carried = np.empty(n_blocks)
+    last = initial
+    decay_of_block = powers[-1]
+    for i, end in enumerate(particular[:, -1].tolist()):
+        carried[i] = last
+        last = decay_of_block * last + end
+
+    return (particular + carried[:, None] * powers).ravel()[:n]
@@ -1,12 +1,13 @@
 import json
 from logging import getLogger
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 
 from tmtrader.api.back_test.order_client import BackTestOrderClient
 from tmtrader.api.back_test.order_manager_client import BTOrderManagerClient
 from tmtrader.api.back_test.position_client import PositionClient
 from tmtrader.back_test_trader import BTClient, BTExchange, BTTrader
+from tmtrader.batch_back_test_trader import BatchBTTrader
 from tmtrader.config.product_config import ProductConfig
 from tmtrader.controller.account_data_controller import BTAccountDataController
 from tmtrader.controller.order_controller import DefaultOrderController
@@ -17,14 +18,31 @@ from tmtrader.controller.strategy_processor import StrategyProcessor
 from tmtrader.controller.position_data_controller import \
     BTPositionDataController
 from tmtrader.exchange_for_backtest.back_test_broker import BackTestBroker
+from tmtrader.exchange_for_backtest.bar_aggregator import \
+    AggregatedPriceStream
+from tmtrader.exchange_for_backtest.chunked_csv_price_data_feeder import \
+    CHUNK_SIZE, ChunkedCSVPriceDataFeeder
 from tmtrader.exchange_for_backtest.csv_price_data_feeder import \
-    CSVPriceDataFeeder
+    CSVPriceDataFeeder, _feed_range, _validate_time_range
+from tmtrader.exchange_for_backtest.decimal_bar_table import round_ohlc
+from tmtrader.exchange_for_backtest.memmap_price_data_feeder import \
+    MemmapPriceDataFeeder
+from tmtrader.exchange_for_backtest.multi_csv_price_data_feeder import \
+    MultiCSVPriceDataFeeder
 from tmtrader.exchange_for_backtest.new_order_receiver import NewOrderReceiver
 from tmtrader.exchange_for_backtest.order_manager import OrderManager
+from tmtrader.exchange_for_backtest.price_data_cache import PriceDataCache
+from tmtrader.exchange_for_backtest.price_data_index import TIME_COLUMN, \
+    load_index
+from tmtrader.exchange_for_backtest.price_stream import PriceStream
 from tmtrader.exchange_for_backtest.position_manager import PositionManager
 from tmtrader.exchange_for_backtest.trade_manager import TradeManager
+from tmtrader.indicator.indicator_cache import IndicatorCache
+from tmtrader.indicator.registry import IndicatorRegistry
+from tmtrader.usecase.event_scheduler import EventScheduler
 from tmtrader.exchange_for_backtest.usecase.one_order_spec import OneOrderSpec
 from tmtrader.usecase.round_price import RoundPrice
+from tmtrader.vector_back_test_trader import VectorBTTrader
 
 logger = getLogger(__name__)
 
@@ -33,31 +51,182 @@ PRODUCT_ID = 1  # Micro E-Mini S&P 500 Futures
 
 
 def _create_single_data_trader(file_path: str, raw_product_config: dict, *args,
-                               **kwargs) -> BTTrader:
+                               cache_dir: Optional[str] = None,
+                               memmap: bool = False,
+                               chunk_size: Optional[int] = None,
+                               timeframes: Optional[List[float]] = None,
+                               tick_prices: bool = False,
+                               start: Optional[float] = None,
+                               end: Optional[float] = None,
+                               precompute_indicators: bool = False,
+                               indicator_cache: Optional[
+                                   IndicatorCache] = None,
+                               n_traders: Optional[int] = None,
+                               jump_ahead: bool = False,
+                               order_latency: float = 0.,
+                               **kwargs) -> Union[BTTrader, BatchBTTrader]:
+    """
+    :param start: time of the first bar to feed. Earlier bars are used only
+        as past bars.
+    :param end: time after the last bar to feed
+    :param tick_prices: if True, the exchange handles prices and P/L as int
+        tick counts of the product, and they are converted to Decimal only
+        when they are passed to the strategies or reported
+    :param precompute_indicators: if True, the indicators declared by the
+        strategies are computed over the whole price data at once
+    :param indicator_cache: cache to share the precomputed indicators with
+        other traders on the same data
+    :param jump_ahead: see `BTTrader`
+    :param order_latency: see `_create_trader_of`
+    """
+    if memmap and chunk_size:
+        raise ValueError('`memmap` and `chunk_size` cannot be used together.')
     product_conf = ProductConfig(PRODUCT_ID, raw_product_config)
+    rounder = RoundPrice(product_conf)
+    cache = PriceDataCache(Path(cache_dir)) if cache_dir else None
 
     # exchange
-    price_seq_feeder = CSVPriceDataFeeder(Path(file_path),
-                                          RoundPrice(product_conf))
+    if chunk_size:
+        price_seq_feeder = ChunkedCSVPriceDataFeeder(Path(file_path), rounder,
+                                                     chunk_size)
+    elif memmap:
+        price_seq_feeder = MemmapPriceDataFeeder(Path(file_path), rounder,
+                                                 cache, indicator_cache)
+    else:
+        price_seq_feeder = CSVPriceDataFeeder(Path(file_path), rounder, cache,
+                                              indicator_cache)
+    price_seq_feeder.set_time_range(start, end)
+
+    return _create_trader_of(price_seq_feeder, timeframes,
+                             rounder if tick_prices else None,
+                             precompute_indicators, n_traders, jump_ahead,
+                             order_latency)
+
+
+def _create_multi_data_trader(file_paths: List[str], raw_product_config: dict,
+                              *args,
+                              product_config_ids: Optional[List[int]] = None,
+                              chunk_size: int = CHUNK_SIZE,
+                              timeframes: Optional[List[float]] = None,
+                              tick_prices: bool = False,
+                              start: Optional[float] = None,
+                              end: Optional[float] = None,
+                              n_traders: Optional[int] = None,
+                              order_latency: float = 0.,
+                              **kwargs) -> Union[BTTrader, BatchBTTrader]:
+    """
+    Products are identified by the index of their file in `file_paths`,
+    and the first one is the primary product.
+    :param product_config_ids: product id in the product config of each file.
+        If None, the products in the product config are used in order.
+    """
+    if tick_prices:
+        # tick counts of products with different tick sizes cannot be mixed
+        raise ValueError('`tick_prices` is not supported with multiple data.')
+    if product_config_ids is None:
+        product_config_ids = [p['id'] for p in
+                              raw_product_config['products']]
+    if len(product_config_ids) < len(file_paths):
+        raise ValueError(
+            f'{len(file_paths)} files are given, but only '
+            f'{len(product_config_ids)} products are configured. '
+            f'Specify `product_config_ids` for every file.')
+
+    rounders = {i: RoundPrice(ProductConfig(product_config_ids[i],
+                                            raw_product_config))
+                for i in range(len(file_paths))}
+    price_seq_feeder = MultiCSVPriceDataFeeder(
+        {i: Path(f) for i, f in enumerate(file_paths)}, rounders, chunk_size)
+    price_seq_feeder.set_time_range(start, end)
+
+    return _create_trader_of(price_seq_feeder, timeframes,
+                             n_traders=n_traders,
+                             order_latency=order_latency)
+
+
+def _create_trader_of(price_seq_feeder: PriceStream,
+                      timeframes: Optional[List[float]] = None,
+                      rounder: Optional[RoundPrice] = None,
+                      precompute_indicators: bool = False,
+                      n_traders: Optional[int] = None,
+                      jump_ahead: bool = False,
+                      order_latency: float = 0.
+                      ) -> Union[BTTrader, BatchBTTrader]:
+    """
+    :param timeframes: periods of higher timeframes to aggregate, in the unit
+        of the `Time` column
+    :param rounder: if given, the exchange runs with int tick prices of the
+        product of this rounder
+    :param precompute_indicators: see `BTTrader`
+    :param n_traders: if given, a batch of this number of traders sharing the
+        price stream is created
+    :param jump_ahead: see `BTTrader`. It is not supported with a batch.
+    :param order_latency: delay from sending an order to its arrival at the
+        exchange, in the unit of the `Time` column
+    """
+    # bars and orders are delivered as events in simulated time
+    scheduler = EventScheduler()
+    price_seq_feeder.set_event_scheduler(scheduler)
+    price_stream = price_seq_feeder
+    if timeframes:
+        price_stream = AggregatedPriceStream(price_seq_feeder, timeframes)
+    if n_traders is None:
+        return _create_trader_on(price_seq_feeder, price_stream, scheduler,
+                                 order_latency, rounder,
+                                 precompute_indicators, jump_ahead)
+
+    if jump_ahead:
+        raise ValueError('`jump_ahead` is not supported with a batch.')
+    if n_traders < 1:
+        raise ValueError(
+            f'n_traders must be a value of positive int larger or equal to '
+            f'1, but got {n_traders}.')
+    indicators = IndicatorRegistry()
+    batch = BatchBTTrader(price_stream, indicators, precompute_indicators)
+    for _ in range(n_traders):
+        batch.add_trader(_create_trader_on(price_seq_feeder, price_stream,
+                                           scheduler, order_latency, rounder,
+                                           indicators=indicators))
+    return batch
+
+
+def _create_trader_on(price_seq_feeder: PriceStream,
+                      price_stream: PriceStream,
+                      scheduler: EventScheduler,
+                      order_latency: float = 0.,
+                      rounder: Optional[RoundPrice] = None,
+                      precompute_indicators: bool = False,
+                      jump_ahead: bool = False,
+                      indicators: Optional[IndicatorRegistry] = None
+                      ) -> BTTrader:
+    """
+    :param price_stream: the stream notifying the strategies, which is
+        `price_seq_feeder` or built on it
+    :param scheduler: the scheduler of `price_seq_feeder`
+    :param indicators: registry shared with other traders
+    """
+    # exchange
     position_mng = PositionManager()
     order_mng = OrderManager()
     trade_manager = TradeManager(position_mng, order_mng)
-    broker = BackTestBroker(price_seq_feeder)
+    broker = BackTestBroker(price_seq_feeder, scheduler.time_ref,
+                            tick_prices=rounder is not None)
     order_receiver = NewOrderReceiver()
-    bt_exchange = BTExchange(price_seq_feeder, trade_manager, broker,
-                             order_receiver)
+    bt_exchange = BTExchange(price_stream, trade_manager, broker,
+                             order_receiver, scheduler)
 
     # client
     order_mng_client = BTOrderManagerClient(order_mng)
-    order_history = BTOrderHistoryController(order_mng_client)
+    order_client = BackTestOrderClient(scheduler.time_ref, rounder)
+    order_client.set_event_scheduler(scheduler, order_latency)
+    order_history = BTOrderHistoryController(order_mng_client, order_client)
     order_spec = OneOrderSpec(order_history)
     price_data_controller = BTPriceDataController()
-    order_client = BackTestOrderClient()
     order_controller = DefaultOrderController(order_client, order_spec)
-    position_client = PositionClient(position_mng)
+    position_client = PositionClient(position_mng, rounder)
     position_data_controller = BTPositionDataController(position_client)
     account_data = BTAccountDataController()
-    strategy_proc = StrategyProcessor(position_data_controller)
+    strategy_proc = StrategyProcessor(position_data_controller, indicators)
     bt_client = BTClient(price_data_controller,
                          strategy_proc,
                          order_controller,
@@ -66,15 +235,8 @@ def _create_single_data_trader(file_path: str, raw_product_config: dict, *args,
                          account_data,
                          order_client)
 
-    return BTTrader(bt_client, bt_exchange)
-
-
-# TODO: implement
-def _create_multi_data_trader(file_paths: List[str], raw_product_config: dict,
-                              *args, **kwargs) -> BTTrader:
-    logger.warning('create_multi_data_trader() is not implemented yet.')
-    raise NotImplementedError(
-        'create_multi_data_trader() is not implemented yet.')
+    return BTTrader(bt_client, bt_exchange, rounder, precompute_indicators,
+                    jump_ahead)
 
 
 def create_trader(file_paths: Union[str, List[str]], product_config_file: str,
@@ -87,3 +249,47 @@ def create_trader(file_paths: Union[str, List[str]], product_config_file: str,
     else:
         return _create_multi_data_trader(file_paths, raw_product_config, *args,
                                          **kwargs)
+
+
+def create_batch_trader(file_paths: Union[str, List[str]],
+                        product_config_file: str, n_traders: int, *args,
+                        **kwargs) -> BatchBTTrader:
+    """Creates `n_traders` traders fed in a single pass over the same data.
+    Add strategies to each of `BatchBTTrader.traders` and start the batch.
+
+    The other arguments are the same as `create_trader`.
+    """
+    return create_trader(file_paths, product_config_file, *args,
+                         n_traders=n_traders, **kwargs)
+
+
+def create_vector_trader(file_path: str, product_config_file: str, *args,
+                         cache_dir: Optional[str] = None,
+                         start: Optional[float] = None,
+                         end: Optional[float] = None,
+                         **kwargs) -> VectorBTTrader:
+    """Creates the trader of a `VectorStrategy` on single data.
+
+    :param start: time of the first bar to trade. Earlier bars are used only
+        to compute the signals.
+    :param end: time after the last bar to trade
+    """
+    with open(product_config_file, mode='r') as f:
+        raw_product_config = json.load(f)
+    _validate_time_range(start, end)
+    rounder = RoundPrice(ProductConfig(PRODUCT_ID, raw_product_config))
+    cache = PriceDataCache(Path(cache_dir)) if cache_dir else None
+
+    columns = CSVPriceDataFeeder._read_columns(Path(file_path), cache)
+    load_index(columns, Path(file_path), cache)
+    if cache is None:
+        ticks = round_ohlc(*columns[:4], rounder)
+    else:
+        # shared with `MemmapPriceDataFeeder`
+        ticks = cache.load_derived(
+            Path(file_path),
+            f'ticks-{rounder.min_frac}-{rounder.n_float_digits}',
+            lambda: round_ohlc(*columns[:4], rounder))
+    first, last = _feed_range(columns[TIME_COLUMN], start, end)
+
+    return VectorBTTrader(columns, ticks, rounder, first, last)
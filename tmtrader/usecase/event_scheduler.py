@@ -0,0 +1,72 @@
+from heapq import heappop, heappush
+from itertools import count
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from tmtrader.usecase.look_ahead import LookAhead, LookAheadData
+from tmtrader.usecase.time_ref import SimulatedTimeRef
+
+_Event = Tuple[float, int, Callable[..., None], tuple]
+
+
+class EventScheduler(LookAhead):
+    """Queue of events ordered by simulated time, and by the order they
+    were scheduled at the same time.
+
+    The price stream schedules every bar at its time and runs the events
+    due by then, so that an event is handled after the handler scheduling
+    it returns instead of deeper in its call stack, and events delayed to a
+    later time, like orders with latency, are handled in time order with
+    the bars.
+    """
+
+    def __init__(self, time_ref: Optional[SimulatedTimeRef] = None):
+        self.__time_ref = time_ref if time_ref is not None \
+            else SimulatedTimeRef()
+        self.__events: List[_Event] = list()
+        self.__seq = count()
+        self.__running = False
+
+    def __len__(self) -> int:
+        return len(self.__events)
+
+    @property
+    def time_ref(self) -> SimulatedTimeRef:
+        return self.__time_ref
+
+    def schedule(self, time_: float, handler: Callable[..., None], *args):
+        now = self.__time_ref.now()
+        if time_ < now:
+            raise ValueError(
+                f'events cannot be scheduled in the past, but got '
+                f'`{time_}` at `{now}`.')
+        heappush(self.__events, (time_, next(self.__seq), handler, args))
+
+    def schedule_after(self, delay: float, handler: Callable[..., None],
+                       *args):
+        self.schedule(self.__time_ref.now() + delay, handler, *args)
+
+    def run_until(self, time_: float):
+        """Handles the events due by `time_`, including the ones scheduled
+        meanwhile, and advances the clock to `time_`."""
+        if self.__running:
+            # an event handler scheduling and running a nested event is
+            # handled by the outer loop
+            return
+        self.__running = True
+        try:
+            events = self.__events
+            while events and events[0][0] <= time_:
+                event_time, _, handler, args = heappop(events)
+                self.__time_ref.advance(event_time)
+                handler(*args)
+            self.__time_ref.advance(time_)
+        finally:
+            self.__running = False
+
+    def next_active_row(self, row: int, data: LookAheadData) -> int:
+        if not self.__events:
+            return data.n_rows
+        # the first bar at or after the next event
+        return int(np.searchsorted(data.time, self.__events[0][0]))
@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from typing import Callable, NamedTuple, Sequence
+
+import numpy as np
+
+from tmtrader.usecase.round_price import RoundPrice
+
+# columns of the tick counts of bars
+OPEN_TICKS, HIGH_TICKS, LOW_TICKS = range(3)
+
+# the number of bars searched first. It doubles until a hit is found, so
+# that a near hit costs little and a far one costs O(log n) searches.
+_SCAN_SIZE = 64
+
+
+class LookAheadData(NamedTuple):
+    """the whole price data which a stream skipping bars can look ahead"""
+    # 2d-array of tick counts of Open, High, Low and Close
+    ticks: np.ndarray
+    time: np.ndarray
+    rounder: RoundPrice
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.time)
+
+
+class LookAhead(ABC):
+    """Component telling a price stream which bars it can act on, so that
+    the stream skips the bars where nothing can happen."""
+
+    @abstractmethod
+    def next_active_row(self, row: int, data: LookAheadData) -> int:
+        """Returns the first row after `row` where this may act, or
+        `data.n_rows` if it never acts unless another component does."""
+        pass
+
+    def skip(self, n_bars: int):
+        """Called with the number of bars skipped before the next bar is
+        fed."""
+        pass
+
+
+def next_row(look_aheads: Sequence[LookAhead], row: int,
+             data: LookAheadData, end: int) -> int:
+    """Returns the row to feed after `row`, which is the first row where
+    any of `look_aheads` may act, and tells them the bars skipped."""
+    if not look_aheads:
+        return row + 1
+    next_ = min([la.next_active_row(row, data) for la in look_aheads])
+    next_ = min(max(next_, row + 1), end)
+    if next_ > row + 1:
+        [la.skip(next_ - row - 1) for la in look_aheads]
+    return next_
+
+
+def first_index(predicate: Callable[[int, int], np.ndarray], begin: int,
+                end: int) -> int:
+    """Returns the first row in `[begin, end)` where `predicate` is True, or
+    `end`.
+
+    :param predicate: function returning a bool array of the rows in the
+        range given
+    """
+    size = _SCAN_SIZE
+    while begin < end:
+        stop = min(begin + size, end)
+        rows = np.flatnonzero(predicate(begin, stop))
+        if len(rows):
+            return begin + int(rows[0])
+        begin = stop
+        size *= 2
+    return end
+
+
+def first_touch_index(ticks: np.ndarray, prices: Sequence[float],
+                      begin: int, end: int) -> int:
+    """Returns the first row in `[begin, end)` whose range from the low to
+    the high touches any of `prices`, or `end`.
+
+    :param ticks: 2d-array of tick counts of Open, High, Low and Close
+    :param prices: prices in ticks. They may be fractional.
+    """
+    prices = np.sort(np.asarray(prices, dtype=float))
+    if not len(prices):
+        return end
+
+    def touched(first: int, stop: int) -> np.ndarray:
+        # a bar touches a price if a price is in [low, high]
+        lows = np.searchsorted(prices, ticks[first:stop, LOW_TICKS])
+        highs = np.searchsorted(prices, ticks[first:stop, HIGH_TICKS],
+                                side='right')
+        return highs > lows
+
+    return first_index(touched, begin, end)
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 from tmtrader.entity.price import PriceSequence
+from tmtrader.usecase.event_scheduler import EventScheduler
 
 
 class PriceObserver(ABC):
@@ -12,6 +14,7 @@ class PriceObserver(ABC):
 class PriceFeeder(ABC):
     def __init__(self):
         self.__observers = list()
+        self.__scheduler: Optional[EventScheduler] = None
 
     def add_price_observer(self, obs: PriceObserver):
         self.__observers.append(obs)
@@ -19,6 +22,19 @@ class PriceFeeder(ABC):
     def remove_price_observer(self, obs: PriceObserver):
         self.__observers.remove(obs)
 
+    def set_event_scheduler(self, scheduler: EventScheduler):
+        """Delivers every price update as an event of `scheduler` at the time
+        of the latest bar, after the events due before it."""
+        self.__scheduler = scheduler
+
     def _notify_price_update(self, price_sequence_ref: PriceSequence):
+        if self.__scheduler is None:
+            self.__notify(price_sequence_ref)
+            return
+        time_ = float(price_sequence_ref.time[0])
+        self.__scheduler.schedule(time_, self.__notify, price_sequence_ref)
+        self.__scheduler.run_until(time_)
+
+    def __notify(self, price_sequence_ref: PriceSequence):
         [obs.notify_price_update(price_sequence_ref) for obs in
          self.__observers]
@@ -1,5 +1,8 @@
-from decimal import Decimal
+from decimal import ROUND_FLOOR, Decimal
 
+import numpy as np
+
+from tmtrader._typing import ArrayLike
 from tmtrader.config.product_config import ProductConfig
 
 
@@ -8,9 +11,26 @@ class RoundPrice:
         self.__min_frac = product_conf.min_frac
         self.__n_float_digits = product_conf.n_float_digits
 
+    @property
+    def min_frac(self) -> Decimal:
+        return self.__min_frac
+
+    @property
+    def n_float_digits(self) -> int:
+        return self.__n_float_digits
+
     def round2fraction(self, x: Decimal) -> Decimal:
         return round2fraction(x, self.__min_frac, self.__n_float_digits)
 
+    def round2ticks(self, x: ArrayLike) -> np.ndarray:
+        return round2ticks(x, self.__min_frac, self.__n_float_digits)
+
+    def ticks2decimal(self, ticks: int) -> Decimal:
+        return ticks2decimal(ticks, self.__min_frac, self.__n_float_digits)
+
+    def decimal2ticks(self, x: Decimal) -> int:
+        return decimal2ticks(x, self.__min_frac, self.__n_float_digits)
+
 
 def round2fraction(x: Decimal, min_frac: Decimal,
                    n_float_digits: int) -> Decimal:
@@ -32,3 +52,82 @@ def round2fraction(x: Decimal, min_frac: Decimal,
     int_x = int_x + min_frac / 2
     int_rounded = (int_x - int_x % min_frac).to_integral()
     return int_rounded / float_digis
+
+
+def round2ticks(x: ArrayLike, min_frac: Decimal,
+                n_float_digits: int) -> np.ndarray:
+    """
+    calculates the numbers of minmove fractions (ticks) of values rounded
+    (round half up) to the nearest minmove fraction, vectorized.
+    The result is the same as `round2fraction` of `Decimal(x)`.
+    :param x:
+    :param min_frac:
+    :param n_float_digits:
+    :return: int64 array of the same shape as `x`
+
+    >>> round2ticks(np.array([10.3749, 10.375]), Decimal(25), 2)
+    array([41, 42])
+    """
+
+    frac = float(min_frac)
+    x = np.asarray(x, dtype=np.float64)
+    scale = float(10 ** n_float_digits)
+    int_x = x * scale
+    # `int_x` is rounded, so decide the ticks near a rounding boundary by the
+    # exact product `int_x + err`.
+    err = _product_error(x, scale, int_x)
+    ticks = np.rint((int_x + frac / 2) / frac)
+    diff = int_x - (ticks * frac - frac / 2)
+    below = (diff < 0) | ((diff == 0) & (err < 0))
+    return (ticks - below).astype(np.int64)
+
+
+def ticks2decimal(ticks: int, min_frac: Decimal,
+                  n_float_digits: int) -> Decimal:
+    """
+    converts a number of minmove fractions to the price, which is equal to
+    the result of `round2fraction`.
+    :param ticks:
+    :param min_frac:
+    :param n_float_digits:
+    :return:
+
+    >>> ticks2decimal(41, Decimal(25), 2)
+    Decimal('10.25')
+    """
+
+    int_rounded = (Decimal(int(ticks)) * min_frac).to_integral()
+    return int_rounded / 10 ** n_float_digits
+
+
+def decimal2ticks(x: Decimal, min_frac: Decimal, n_float_digits: int) -> int:
+    """
+    calculates the number of minmove fractions of a value rounded (round half
+    up) to the nearest minmove fraction.
+    :param x:
+    :param min_frac:
+    :param n_float_digits:
+    :return:
+
+    >>> decimal2ticks(Decimal('10.3749'), Decimal(25), 2)
+    41
+    >>> decimal2ticks(Decimal('-10.375'), Decimal(25), 2)
+    -41
+    """
+
+    if not isinstance(x, Decimal):
+        x = Decimal(x)
+    int_x = x * 10 ** n_float_digits + min_frac / 2
+    return int((int_x / min_frac).to_integral_value(rounding=ROUND_FLOOR))
+
+
+def _product_error(a: np.ndarray, b: float, p: np.ndarray) -> np.ndarray:
+    # error-free transformation of a product (Dekker): a * b == p + error
+    splitter = 134217729.0  # 2 ** 27 + 1
+    c = splitter * a
+    a_hi = c - (c - a)
+    a_lo = a - a_hi
+    c = splitter * b
+    b_hi = c - (c - b)
+    b_lo = b - b_hi
+    return ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
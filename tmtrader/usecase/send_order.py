@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 
-from tmtrader.entity.order import BasicOrder
+from tmtrader.entity.order import BasicOrder, OrderReplacement
 
 
 class OrderObserver(ABC):
@@ -10,9 +10,23 @@ class OrderObserver(ABC):
         pass
 
 
+class OrderChangeObserver(ABC):
+    """Observer of the cancellations and replacements of open orders, which
+    only the exchange side handles."""
+
+    @abstractmethod
+    def notify_cancel_orders(self, order_ids: List[int]):
+        pass
+
+    @abstractmethod
+    def notify_replace_orders(self, replacements: List[OrderReplacement]):
+        pass
+
+
 class OrderSender(ABC):
     def __init__(self):
         self.__order_observers: List[OrderObserver] = list()
+        self.__order_change_observers: List[OrderChangeObserver] = list()
 
     def add_order_observer(self, observer: OrderObserver):
         self.__order_observers.append(observer)
@@ -20,5 +34,19 @@ class OrderSender(ABC):
     def remove_order_observer(self, observer: OrderObserver):
         self.__order_observers.remove(observer)
 
+    def add_order_change_observer(self, observer: OrderChangeObserver):
+        self.__order_change_observers.append(observer)
+
+    def remove_order_change_observer(self, observer: OrderChangeObserver):
+        self.__order_change_observers.remove(observer)
+
     def _notify_new_orders(self, orders: List[BasicOrder]):
         [obs.notify_new_orders(orders) for obs in self.__order_observers]
+
+    def _notify_cancel_orders(self, order_ids: List[int]):
+        [obs.notify_cancel_orders(order_ids) for obs in
+         self.__order_change_observers]
+
+    def _notify_replace_orders(self, replacements: List[OrderReplacement]):
+        [obs.notify_replace_orders(replacements) for obs in
+         self.__order_change_observers]
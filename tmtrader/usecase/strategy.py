@@ -1,16 +1,99 @@
+import math
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import FrozenSet, NamedTuple, Optional, Sequence
+
+import numpy as np
 
 from tmtrader.controller.position_data_controller import PositionDataRef
 from tmtrader.entity.order import Order
 from tmtrader.entity.position import PositionsRefForClient, empty_positions_ref
 from tmtrader.entity.price import PriceSequence
+from tmtrader.indicator.indicator import IndicatorSpec
+from tmtrader.usecase.look_ahead import first_index
 
 # TODO: set this value at strategy settings
 PRODUCT1 = 0
 
+DEFAULT_LOOKBACK = 1
+
+
+class Schedule(NamedTuple):
+    """Bars on which a strategy needs to run. The default is every bar."""
+    when_flat: bool = True
+    when_in_position: bool = True
+    # run on the first fed bar and every `every_n_bars` bars after it
+    every_n_bars: int = 1
+    # run only on bars whose time, modulo `session_period` if given, is one
+    # of these
+    session_times: Optional[FrozenSet[float]] = None
+    session_period: Optional[float] = None
+    # run only on the first bar of every bar of the timeframe of this period
+    timeframe: Optional[float] = None
+
+    @property
+    def every_bar(self) -> bool:
+        """True if the strategy runs on every bar in its position state"""
+        return self.every_n_bars == 1 and self.session_times is None \
+            and self.timeframe is None
+
+    def is_due(self, n_bars: int, time_: float,
+               last_time: Optional[float]) -> bool:
+        """
+        :param n_bars: the number of bars fed before this bar
+        :param last_time: the time of the previous bar
+        """
+        if n_bars % self.every_n_bars:
+            return False
+        if self.session_times is not None:
+            if self.session_period is not None:
+                time_of_session = time_ % self.session_period
+            else:
+                time_of_session = time_
+            if time_of_session not in self.session_times:
+                return False
+        if self.timeframe is not None and last_time is not None \
+                and math.floor(time_ / self.timeframe) \
+                == math.floor(last_time / self.timeframe):
+            return False
+        return True
+
+    def next_due_row(self, n_bars: int, row: int, time_: np.ndarray) -> int:
+        """Returns the first row after `row` where `is_due` holds if the
+        bars from the next row are fed, or `len(time_)`.
+
+        :param n_bars: the number of bars fed including `row`
+        """
+        def due(first: int, stop: int) -> np.ndarray:
+            # the number of bars fed before each row
+            fed = n_bars + np.arange(first, stop) - row - 1
+            mask = fed % self.every_n_bars == 0
+            if self.session_times is not None:
+                times = time_[first:stop]
+                if self.session_period is not None:
+                    times = times % self.session_period
+                mask &= np.isin(times, list(self.session_times))
+            if self.timeframe is not None:
+                buckets = np.floor(time_[first - 1:stop] / self.timeframe)
+                mask &= buckets[1:] != buckets[:-1]
+            return mask
+
+        return first_index(due, row + 1, len(time_))
+
+
+EVERY_BAR = Schedule()
+
 
 class Strategy(ABC):
+    # The number of bars, including the latest one, that `execute` receives.
+    # Deeper history can still be requested with `PriceSequence.history`.
+    lookback: int = DEFAULT_LOOKBACK
+    # Indicators that `execute` reads with `PriceSequence.indicator`. They are
+    # updated once per bar and shared with the other strategies.
+    indicators: Sequence[IndicatorSpec] = ()
+    # Bars on which `execute` is called. Skipping bars where a strategy has
+    # nothing to do saves the calls, e.g. an exit strategy while flat.
+    schedule: Schedule = EVERY_BAR
+
     @abstractmethod
     def execute(self,
                 d: PriceSequence,
@@ -23,12 +106,14 @@ class BaseStrategy:
                  d: PriceSequence,
                  p: PositionDataRef):
         self.__d = d
-        self.__p = p
-
-    def execute(self, s: Strategy) -> Optional[Order]:
-        if PRODUCT1 in self.__p.positions:
-            positions = self.__p.positions[PRODUCT1]
+        if PRODUCT1 in p.positions:
+            self.__positions = p.positions[PRODUCT1]
         else:
-            positions = empty_positions_ref(PRODUCT1)
+            self.__positions = empty_positions_ref(PRODUCT1)
 
-        return s.execute(self.__d, positions)
+    @property
+    def has_positions(self) -> bool:
+        return self.__positions.has_positions()
+
+    def execute(self, s: Strategy) -> Optional[Order]:
+        return s.execute(self.__d.with_depth(s.lookback), self.__positions)
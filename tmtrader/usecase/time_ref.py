@@ -1,3 +1,4 @@
+import math
 import time
 from abc import ABC, abstractmethod
 
@@ -11,3 +12,21 @@ class TimeRef(ABC):
 class DefaultTimeRef(TimeRef):
     def now(self) -> float:
         return time.time()
+
+
+class SimulatedTimeRef(TimeRef):
+    """Clock of a back test. It is set to the time of the event being
+    processed, so orders are stamped with the time of the bar instead of
+    the wall clock."""
+
+    def __init__(self, time_: float = -math.inf):
+        self.__now = time_
+
+    def now(self) -> float:
+        return self.__now
+
+    def advance(self, time_: float):
+        if time_ < self.__now:
+            raise ValueError(
+                f'time cannot go back, but got `{time_}` at `{self.__now}`.')
+        self.__now = time_
@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from functools import lru_cache
+from typing import List, Optional
+
+from tmtrader._typing import Price
+from tmtrader.entity.trade import Trade
+
+
+# TODO: optimize statistical calculations of trade results
+class TradeStatistics(ABC):
+    """Statistics of the trades of a backtest, shared by the event-driven
+    and the vectorized traders."""
+
+    @abstractmethod
+    def trade_history(self) -> List[Trade]:
+        pass
+
+    @lru_cache
+    def long_trades(self) -> List[Trade]:
+        return [t for t in self.trade_history() if t.is_long]
+
+    @lru_cache
+    def short_trades(self) -> List[Trade]:
+        return [t for t in self.trade_history() if not t.is_long]
+
+    @lru_cache
+    def winning_trades(self) -> List[Trade]:
+        return [t for t in self.trade_history() if t.pl > 0]
+
+    @lru_cache
+    def losing_trades(self) -> List[Trade]:
+        return [t for t in self.trade_history() if t.pl < 0]
+
+    @lru_cache
+    def long_winning_trades(self) -> List[Trade]:
+        return [t for t in self.long_trades() if t.pl > 0]
+
+    @lru_cache
+    def long_losing_trades(self) -> List[Trade]:
+        return [t for t in self.long_trades() if t.pl < 0]
+
+    @lru_cache
+    def short_winning_trades(self) -> List[Trade]:
+        return [t for t in self.short_trades() if t.pl > 0]
+
+    @lru_cache
+    def short_losing_trades(self) -> List[Trade]:
+        return [t for t in self.short_trades() if t.pl < 0]
+
+    @lru_cache
+    def pls(self) -> List[Decimal]:
+        return [t.pl for t in self.trade_history()]
+
+    @lru_cache
+    def total_profit(self) -> Decimal:
+        return self._sum_pl([t.pl for t in self._raw_trades() if t.pl > 0])
+
+    @lru_cache
+    def total_loss(self) -> Decimal:
+        return self._sum_pl([t.pl for t in self._raw_trades() if t.pl < 0])
+
+    @lru_cache
+    def total_pl(self) -> Decimal:
+        return self.total_profit() + self.total_loss()
+
+    @lru_cache
+    def n_wins(self) -> int:
+        return len(self.winning_trades())
+
+    @lru_cache
+    def n_losses(self) -> int:
+        return len(self.losing_trades())
+
+    @lru_cache
+    def n_evens(self) -> int:
+        return self.n_trades() - self.n_wins() - self.n_losses()
+
+    @lru_cache
+    def n_trades(self) -> int:
+        return len(self.trade_history())
+
+    @lru_cache
+    def percent_profitable(self) -> float:
+        return len(self.winning_trades()) / self.n_trades()
+
+    @lru_cache
+    def max_winning_trade(self) -> Optional[Trade]:
+        if self.n_wins():
+            return sorted(self.winning_trades(),
+                          key=lambda t: t.pl, reverse=True)[0]
+        else:
+            return None
+
+    @lru_cache
+    def max_losing_trade(self) -> Optional[Trade]:
+        if self.n_wins():
+            return sorted(self.losing_trades(),
+                          key=lambda t: t.pl)[0]
+        else:
+            return None
+
+    def _raw_trades(self) -> List[Trade]:
+        """trades whose P/L are in the unit that `_sum_pl` sums"""
+        return self.trade_history()
+
+    def _sum_pl(self, pls: List[Price]) -> Decimal:
+        return sum(pls)
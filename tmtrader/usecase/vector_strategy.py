@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional, Sequence
+
+from tmtrader._typing import ArrayLike
+from tmtrader.entity.order import OrderCondition
+
+
+class Signals(NamedTuple):
+    """Entry and exit signals of a strategy over the whole price data.
+
+    Signal arrays have one element per bar, ordered from the oldest bar to
+    the latest bar. A position of one share is entered on the first entry
+    signal while no position is held, and closed on the first exit signal
+    or exit rule after the entry bar.
+
+    An order of a signal is filled on the bar of the signal like the orders
+    of `Strategy` with `nth_bar` 0: a market order at the open, and a limit
+    or stop order at its price if the price is within the range of the bar.
+    A limit or stop order which is not filled on its bar is dropped.
+    """
+    entries: ArrayLike
+    exits: Optional[ArrayLike] = None
+    is_long: bool = True
+    entry_condition: OrderCondition = OrderCondition.MARKET
+    # the price of the limit or stop order of each bar. NaN means no order.
+    entry_prices: Optional[ArrayLike] = None
+    exit_condition: OrderCondition = OrderCondition.MARKET
+    exit_prices: Optional[ArrayLike] = None
+    # Exit rules depending on the entry, closing the position with a market
+    # order filled at the open of the bar after the rule is hit, like
+    # `ExitSellInNBars`. The holding period is measured in the unit of the
+    # `Time` column, and the profit and loss with the close of the bar.
+    exit_in_n_bars: Optional[float] = None
+    target_profit: Optional[float] = None
+    stop_loss: Optional[float] = None
+
+
+class VectorStrategy(ABC):
+    """Strategy computing its signals over the whole price data at once.
+
+    It is run by `VectorBTTrader`, which is much faster than running a
+    `Strategy` bar by bar, but it cannot depend on the positions other than
+    through the exit rules of `Signals`.
+    """
+
+    @abstractmethod
+    def signals(self, columns: Sequence[ArrayLike]) -> Signals:
+        """
+        :param columns: Open, High, Low, Close, Vol and Time columns ordered
+            from the oldest bar to the latest bar
+        """
+        pass
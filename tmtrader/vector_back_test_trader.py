@@ -0,0 +1,57 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from tmtrader._typing import ArrayLike
+from tmtrader.entity.trade import Trade
+from tmtrader.exchange_for_backtest.price_data_index import TIME_COLUMN
+from tmtrader.exchange_for_backtest.vector_broker import resolve_trades
+from tmtrader.indicator.indicator import CLOSE
+from tmtrader.usecase.round_price import RoundPrice
+from tmtrader.usecase.strategy import PRODUCT1
+from tmtrader.usecase.trade_statistics import TradeStatistics
+from tmtrader.usecase.vector_strategy import VectorStrategy
+
+
+class VectorBTTrader(TradeStatistics):
+    """Backtest of a `VectorStrategy` over the whole price data at once.
+
+    It reports the same trades and statistics as `BTTrader` running the
+    equivalent `Strategy` objects, without the per-bar pipeline of the
+    exchange, so it is suited to screening many strategies.
+    """
+
+    def __init__(self, columns: Sequence[ArrayLike], ticks: np.ndarray,
+                 rounder: RoundPrice, first: int = 0,
+                 last: Optional[int] = None):
+        """
+        :param columns: Open, High, Low, Close, Vol and Time columns
+        :param ticks: 2d-array of tick counts of Open, High, Low and Close
+        :param first: the first row to trade
+        :param last: the row after the last row to trade
+        """
+        self.__columns = columns
+        self.__ticks = ticks
+        self.__rounder = rounder
+        self.__first = first
+        self.__last = last
+        self.__strategy: Optional[VectorStrategy] = None
+        self.__trades: List[Trade] = list()
+
+    def set_strategy(self, strategy: VectorStrategy):
+        self.__strategy = strategy
+
+    def start(self):
+        if self.__strategy is None:
+            raise ValueError('No strategy is set. Call `set_strategy` first.')
+        signals = self.__strategy.signals(self.__columns)
+        self.__trades = resolve_trades(signals, self.__ticks,
+                                       self.__columns[CLOSE],
+                                       self.__columns[TIME_COLUMN],
+                                       self.__rounder, PRODUCT1,
+                                       self.__first, self.__last)
+
+    @lru_cache
+    def trade_history(self) -> List[Trade]:
+        return self.__trades